@@ -1,5 +1,34 @@
 from django.contrib import admin
-from .models import Company, CompanyMember
-# Register your models here.
-admin.site.register(Company)
-admin.site.register(CompanyMember)
+from core.admin import EstimatedCountPaginator, LabelRelationsAdmin
+from .models import Company, CompanyMember, CompanyInvitation
+
+
+@admin.register(Company)
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'owner', 'email', 'created_at')
+    list_select_related = ('owner',)
+    search_fields = ('name', 'slug__exact', 'registration_number__exact')
+    autocomplete_fields = ('owner',)
+    date_hierarchy = 'created_at'
+    show_full_result_count = False
+
+
+@admin.register(CompanyMember)
+class CompanyMemberAdmin(LabelRelationsAdmin):
+    list_display = ('user', 'company', 'role', 'is_active', 'created_at')
+    list_select_related = ('user', 'company')
+    list_filter = ('role', 'is_active')
+    search_fields = ('user__email', 'user__last_name', 'company__name')
+    autocomplete_fields = ('company', 'user')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(CompanyInvitation)
+class CompanyInvitationAdmin(admin.ModelAdmin):
+    list_display = ('email', 'company', 'role', 'status', 'expires_at')
+    list_select_related = ('company',)
+    list_filter = ('status', 'role')
+    search_fields = ('email',)
+    autocomplete_fields = ('company',)
+    show_full_result_count = False
@@ -3,6 +3,7 @@ from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
 from django.utils import timezone
+from core.querysets import LabelQuerySet
 from core.storage import CompanyStorage
 import uuid
 
@@ -74,6 +75,10 @@ class Company(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+class CompanyMemberQuerySet(LabelQuerySet):
+    label_relations = ('user', 'company')
+
+
 class CompanyMember(models.Model):
     class Roles(models.TextChoices):
         ADMIN = 'ADMIN', 'Administrator'
@@ -101,6 +106,8 @@ class CompanyMember(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CompanyMemberQuerySet.as_manager()
+
     class Meta:
         unique_together = ['company', 'user']
         
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.chrome import bump_chrome_version
+from subscriptions.models import CompanySubscription
+from .models import Company, CompanyMember
+
+
+@receiver([post_save, post_delete], sender=Company)
+def company_changed(sender, instance, **kwargs):
+    bump_chrome_version(instance.id)
+
+
+@receiver([post_save, post_delete], sender=CompanyMember)
+@receiver([post_save, post_delete], sender=CompanySubscription)
+def company_relation_changed(sender, instance, **kwargs):
+    bump_chrome_version(instance.company_id)
@@ -9,6 +9,7 @@ urlpatterns = [
     path('members/role/<uuid:member_id>/', views.change_member_role, name='change_member_role'),
     path('members/remove/<uuid:member_id>/', views.remove_member, name='remove_member'),
     path('members/invitations/cancel/<uuid:invitation_id>/', views.cancel_invitation, name='cancel_invitation'),
+    path('export/', views.company_export, name='company_export'),
     path('settings/', views.company_settings, name='company_settings'),
     path('settings/tax/add/', views.company_add_tax, name='company_add_tax'),
     path('settings/tax/<uuid:tax_id>/edit/', views.company_edit_tax, name='company_edit_tax'),
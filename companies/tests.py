@@ -1,3 +1,20 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.factories import create_company, seed_portfolio
+from core.testing import QueryBudgetTestCase
+
+
+class CompanyDashboardQueryBudgetTests(QueryBudgetTestCase):
+    """Uzņēmuma paneļa vaicājumu skaits nedrīkst augt līdz ar datu apjomu"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=3, units_per_property=100, months=24, seed=1)
+
+    def setUp(self):
+        self.client.force_login(self.company.owner)
+
+    def test_company_dashboard(self):
+        url = reverse('companies_tenant:company_detail', args=[self.company.slug])
+        self.get_within_budget(self.client, url, 12)
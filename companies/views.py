@@ -6,6 +6,7 @@ from datetime import timedelta
 from .models import Company, CompanyMember, CompanyInvitation
 from .forms import CompanyForm, CompanyInvitationForm, CompanyMemberRoleForm, CompanySettingsForm, TaxForm
 from core.decorators import tenant_required
+from core.exports import export_response, company_export_entries
 from utils.utils import send_company_invitation_email
 from properties.models import Property
 from users.models import User
@@ -228,6 +229,21 @@ def company_detail(request, company_slug):
         'active_page': 'dashboard'  # Norādam, kura navigācijas sadaļa ir aktīva
     })
 
+@login_required
+@tenant_required
+def company_export(request, company_slug):
+    """Lejupielādē visus uzņēmuma dokumentus un problēmu attēlus vienā zip arhīvā"""
+    company = request.tenant
+    
+    # Pārbaudam vai lietotājam ir tiesības
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role='ADMIN').exists()):
+        messages.error(request, "Jums nav tiesību eksportēt uzņēmuma dokumentus.")
+        return redirect('companies_tenant:company_detail', company_slug=company_slug)
+    
+    filename = f"{company.slug}_{timezone.now():%Y%m%d}.zip"
+    return export_response(company_export_entries(company), filename)
+
 @login_required
 @tenant_required
 def company_members(request, company_slug):
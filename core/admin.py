@@ -1,2 +1,64 @@
 from django.contrib import admin
-# Register your models here.
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .querysets import with_label_relations
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Nefiltrētam sarakstam COUNT(*) vietā izmanto PostgreSQL rindu novērtējumu.
+
+    Miljoniem rindu COUNT(*) aizņem sekundes, bet lapošanai pietiek ar
+    pg_class.reltuples. Filtrētiem sarakstiem un mazām tabulām tiek
+    izmantots precīzs skaits.
+    """
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where and connections[queryset.db].vendor == 'postgresql':
+            connection = connections[queryset.db]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return int(row[0])
+        return super().count
+
+
+class LabelRelationsAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin, kas sarakstā un ForeignKey izvēlnēs ielādē __str__ relācijas.
+
+    ChangeList neizsauc list_select_related, ja querysetam jau ir
+    select_related, tāpēc relāciju saraksts tiek pievienots šeit.
+    list_select_related = True ar šo klasi netiek atbalstīts.
+    """
+
+    def get_queryset(self, request):
+        queryset = with_label_relations(super().get_queryset(request))
+        list_select_related = self.get_list_select_related(request)
+        if list_select_related and list_select_related is not True:
+            queryset = queryset.select_related(*list_select_related)
+        return queryset
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if formfield is not None:
+            formfield.queryset = with_label_relations(formfield.queryset)
+        return formfield
+
+
+class TenantModelAdmin(LabelRelationsAdmin):
+    """Bāzes admin TenantModel modeļiem: bez pilnā COUNT(*) un ar company autocomplete"""
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    autocomplete_fields = ('company',)
+    readonly_fields = ('created_at', 'updated_at')
@@ -0,0 +1,33 @@
+"""
+Asinhronie adapteri ASGI skatiem.
+
+Django ORM ir pieejams ar a* metodēm, bet šabloni, formu validācija,
+failu storage (S3) un SMTP ir sinhroni. Tie tiek izpildīti pavedienos,
+lai notikumu cilpa var apkalpot citus pieprasījumus.
+
+DB darbības paliek pieprasījuma pavedienā (thread_sensitive=True).
+Tīri tīkla darbības bez DB (storage, SMTP) tiek izpildītas kopīgajā
+pavedienu pūlā, tāpēc vairākas augšupielādes var notikt paralēli.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+# Šablonu konteksts slinki nolasa request.user, ziņojumus un saistītos objektus
+arender = sync_to_async(render)
+
+
+async def asave_file(field_file, name, content):
+    """Saglabā failu storage, nesaglabājot modeli"""
+    await sync_to_async(field_file.save, thread_sensitive=False)(name, content, save=False)
+
+
+async def asave_files(files):
+    """Paralēli saglabā (field_file, name, content) failus storage"""
+    await asyncio.gather(*(asave_file(field_file, name, content) for field_file, name, content in files))
+
+
+async def asend_message(message, fail_silently=False):
+    """Nosūta EmailMessage; SMTP savienojums netur notikumu cilpu"""
+    return await sync_to_async(message.send, thread_sensitive=False)(fail_silently)
@@ -0,0 +1,35 @@
+"""
+Lapas ietvara (navbar, sidebar) fragmentu kešošanas versijas.
+
+Katram uzņēmumam ir versijas numurs kešatmiņā. Tas tiek palielināts, mainoties
+uzņēmuma iestatījumiem, dalībniekiem vai abonementam, tāpēc visi vecie
+fragmenti automātiski kļūst nederīgi.
+"""
+from django.core.cache import cache
+
+
+def _version_key(company_id):
+    return f"chrome:version:{company_id}"
+
+
+def get_chrome_version(company_id):
+    version = cache.get(_version_key(company_id))
+    if version is None:
+        cache.add(_version_key(company_id), 1, None)
+        version = cache.get(_version_key(company_id), 1)
+    return version
+
+
+def bump_chrome_version(company_id):
+    key = _version_key(company_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def chrome_role(request):
+    """Lietotāja loma uzņēmumā fragmenta atslēgai"""
+    if getattr(request, 'is_company_owner', False):
+        return 'OWNER'
+    return getattr(request, 'company_role', None) or 'NONE'
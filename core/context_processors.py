@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from core.chrome import chrome_role, get_chrome_version
+
+
+def chrome(request):
+    """Mainīgie navbar un sidebar fragmentu kešošanai"""
+    context = {'chrome_cache_timeout': settings.CHROME_CACHE_TIMEOUT}
+    tenant = getattr(request, 'tenant', None)
+    if tenant is not None:
+        context['chrome_role'] = chrome_role(request)
+        context['chrome_version'] = SimpleLazyObject(lambda: get_chrome_version(tenant.id))
+    return context
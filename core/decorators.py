@@ -1,10 +1,19 @@
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
 from django.http import Http404
 
 def tenant_required(view_func):
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if not hasattr(request, 'tenant') or not request.tenant:
+                raise Http404("Company not found")
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
         if not hasattr(request, 'tenant') or not request.tenant:
             raise Http404("Company not found")
         return view_func(request, *args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
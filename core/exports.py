@@ -0,0 +1,156 @@
+import logging
+import os
+import zipfile
+
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from leases.models import LeaseDocument
+from inspections.models import IssueImage
+from core.storage import open_file_chunks
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class _ZipStreamBuffer:
+    """
+    Rakstāms objekts bez seek/tell atbalsta.
+
+    ZipFile to uztver kā neatritināmu straumi un raksta data descriptor
+    ierakstus, tāpēc arhīvu var nodot klientam pa daļām.
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_zip(entries, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Ģenerē zip arhīvu pa gabaliem no (arhīva_nosaukums, FieldFile, datums) ierakstiem.
+
+    Atmiņā vienlaikus glabājas tikai viens faila gabals, pagaidu arhīvs
+    netiek veidots. Faili, kurus neizdodas atvērt, tiek izlaisti; vienādi
+    nosaukumi vienā mapē saņem sufiksu " (2)", " (3)", ...
+    """
+    buffer = _ZipStreamBuffer()
+    used = set()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for arcname, field_file, modified in entries:
+            arcname = _unique_name(arcname, used)
+            try:
+                chunks = open_file_chunks(field_file, chunk_size)
+            except Exception as e:
+                logger.warning("Export: neizdevās atvērt failu %s: %s", field_file.name, e)
+                continue
+
+            zinfo = zipfile.ZipInfo(arcname, date_time=modified.timetuple()[:6])
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(zinfo, mode='w', force_zip64=True) as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def _unique_name(arcname, used):
+    """Arhīvā vēl neizmantots nosaukums: "dokuments.pdf" -> "dokuments (2).pdf" """
+    candidate = arcname
+    folder, name = arcname.rpartition('/')[::2]
+    stem, dot, extension = name.rpartition('.') if '.' in name.lstrip('.') else (name, '', '')
+    number = 2
+    while candidate in used:
+        candidate = f"{folder}/{stem} ({number}){dot}{extension}" if folder else f"{stem} ({number}){dot}{extension}"
+        number += 1
+    used.add(candidate)
+    return candidate
+
+
+def _safe(part):
+    """Viens arhīva ceļa segments - bez atdalītājiem un bez "." / ".." """
+    part = str(part).replace('/', '-').replace('\\', '-').strip()
+    return '_' if not part.strip('.') else part
+
+
+def _unit_folder(unit):
+    return f"{_safe(unit.property.address)}/{_safe(unit.unit_number)}"
+
+
+def _lease_folder(lease):
+    return f"{_unit_folder(lease.unit)}/lease_{lease.id}"
+
+
+def _issue_folder(image):
+    return f"{_unit_folder(image.issue.unit)}/issues/{image.issue_id}"
+
+
+def _document_entries(documents):
+    for document in documents.iterator(chunk_size=200):
+        if not document.document:
+            continue
+        name = _safe(os.path.basename(document.document.name))
+        yield f"{_lease_folder(document.lease)}/{name}", document.document, document.created_at
+
+
+def _image_entries(images):
+    for image in images.iterator(chunk_size=200):
+        if not image.image:
+            continue
+        name = _safe(os.path.basename(image.image.name))
+        yield f"{_issue_folder(image)}/{name}", image.image, image.created_at
+
+
+def _export_entries(documents, images):
+    documents = documents.select_related('lease__unit__property').order_by('lease_id', 'created_at')
+    images = images.select_related('issue__unit__property').order_by('issue_id', 'created_at')
+    yield from _document_entries(documents)
+    yield from _image_entries(images)
+
+
+def lease_export_entries(lease):
+    """Līguma dokumenti un telpas problēmu attēli līguma darbības laikā"""
+    documents = LeaseDocument.objects.filter(lease=lease, company_id=lease.company_id)
+    images = IssueImage.objects.filter(
+        company_id=lease.company_id,
+        issue__unit_id=lease.unit_id,
+        issue__created_at__date__gte=lease.start_date,
+        issue__created_at__date__lte=lease.end_date,
+    )
+    return _export_entries(documents, images)
+
+
+def property_export_entries(property):
+    """Visi īpašuma līgumu dokumenti un problēmu attēli"""
+    documents = LeaseDocument.objects.filter(company_id=property.company_id, lease__unit__property=property)
+    images = IssueImage.objects.filter(company_id=property.company_id, issue__unit__property=property)
+    return _export_entries(documents, images)
+
+
+def company_export_entries(company):
+    """Visi uzņēmuma līgumu dokumenti un problēmu attēli"""
+    documents = LeaseDocument.objects.filter(company=company)
+    images = IssueImage.objects.filter(company=company)
+    return _export_entries(documents, images)
+
+
+def export_response(entries, filename):
+    """Straumēta zip atbilde pārlūkam; pēdiņas un ne-ASCII nosaukumā tiek kodēti (RFC 6266)"""
+    response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, _safe(filename))
+    return response
@@ -0,0 +1,289 @@
+"""
+Sintētisku datu ģenerēšana testiem un veiktspējas mērījumiem.
+
+Visi ieraksti tiek veidoti ar bulk_create, tāpēc modeļu save() loģika
+(piem., rēķina kopsummas pārrēķins) un signāli netiek izsaukti - summas
+tiek aprēķinātas jau šeit, meklēšanas vektori beigās ar vienu UPDATE.
+"""
+import datetime
+import random
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+
+from companies.models import Company, CompanyMember
+from inspections.models import PRIORITY_RANKS, Issue, Maintenance
+from invoices.models import Invoice, InvoiceItem
+from leases.models import Lease
+from properties.models import MeterReading, Property, Unit, UnitMeter
+from reports.sla import rebuild_issue_stats
+from search.documents import DOCUMENTS
+from subscriptions.models import CompanySubscription, SubscriptionPlan
+from users.models import User
+
+BATCH_SIZE = 1000
+
+METER_TYPES = ['water_cold', 'water_hot', 'electricity', 'heating', 'gas']
+
+# Vidējais mēneša patēriņš un tarifs pa skaitītāju veidiem
+METER_USAGE = {
+    'water_cold': (Decimal('4'), Decimal('1.50')),
+    'water_hot': (Decimal('3'), Decimal('5.50')),
+    'electricity': (Decimal('150'), Decimal('0.15')),
+    'heating': (Decimal('0.8'), Decimal('60.00')),
+    'gas': (Decimal('12'), Decimal('0.85')),
+}
+
+
+def _month_start(date, offset):
+    month = date.month - 1 + offset
+    return date.replace(year=date.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def _month_end(date):
+    return _month_start(date, 1) - datetime.timedelta(days=1)
+
+
+def create_user(role, password=None, **kwargs):
+    """Lietotājs ar unikālu lietotājvārdu un e-pastu"""
+    key = uuid.uuid4().hex[:10]
+    kwargs.setdefault('username', f"{role}-{key}")
+    kwargs.setdefault('email', f"{role}-{key}@example.com")
+    kwargs.setdefault('first_name', role.capitalize())
+    kwargs.setdefault('last_name', key)
+    return User.objects.create(
+        role=role,
+        password=make_password(password) if password else make_password(None),
+        **kwargs,
+    )
+
+
+def create_company(name=None, owner=None, plan=None, **kwargs):
+    """Uzņēmums ar aktīvu abonementu, kuram ieslēgtas visas funkcijas"""
+    key = uuid.uuid4().hex[:8]
+    owner = owner or create_user('company_owner')
+    if plan is None:
+        plan, _ = SubscriptionPlan.objects.get_or_create(
+            code='synthetic',
+            defaults={
+                'name': 'Synthetic',
+                'price': Decimal('0'),
+                'max_properties': 100000,
+                'max_units': 1000000,
+                'max_users': 1000,
+                'enable_invoicing': True,
+                'enable_reports': True,
+                'enable_tenant_portal': True,
+                'enable_document_storage': True,
+            },
+        )
+    company = Company.objects.create(
+        name=name or f"Company {key}",
+        slug=kwargs.pop('slug', f"company-{key}"),
+        owner=owner,
+        **kwargs,
+    )
+    today = datetime.date.today()
+    CompanySubscription.objects.create(
+        company=company,
+        plan=plan,
+        status='active',
+        start_date=today.replace(year=today.year - 5),
+        end_date=today.replace(year=today.year + 5),
+    )
+    return company
+
+
+def add_member(company, role=CompanyMember.Roles.MANAGER, user=None):
+    user = user or create_user('manager')
+    CompanyMember.objects.create(company=company, user=user, role=role)
+    return user
+
+
+def seed_portfolio(company, properties=2, units_per_property=100, months=24,
+                   meters_per_unit=2, occupancy=0.9, issues_per_property=10, seed=None):
+    """
+    Aizpilda uzņēmumu ar īpašumiem, telpām, īrniekiem, līgumiem,
+    skaitītāju rādījumiem un rēķiniem par pēdējiem `months` mēnešiem.
+
+    Atgriež izveidoto ierakstu skaitu pa modeļiem.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    first_month = _month_start(today, -months)
+    password = make_password(None)
+
+    property_objs = [
+        Property(
+            company=company,
+            address=f"Synthetic iela {i + 1}, Rīga",
+            total_area=Decimal(units_per_property * 60),
+            building_type='apartment_building',
+            floor_count=max(1, units_per_property // 4),
+        )
+        for i in range(properties)
+    ]
+    Property.objects.bulk_create(property_objs, batch_size=BATCH_SIZE)
+
+    units, tenants, leases = [], [], []
+    for prop in property_objs:
+        for n in range(units_per_property):
+            rented = rng.random() < occupancy
+            unit = Unit(
+                company=company,
+                property=prop,
+                unit_number=str(n + 1),
+                floor=n // 4 + 1,
+                area=Decimal(rng.randint(30, 90)),
+                rooms=rng.randint(1, 4),
+                unit_type='apartment',
+                status='rented' if rented else 'available',
+            )
+            units.append(unit)
+            if rented:
+                key = uuid.uuid4().hex[:10]
+                tenant = User(
+                    username=f"tenant-{key}",
+                    email=f"tenant-{key}@example.com",
+                    first_name='Tenant',
+                    last_name=key,
+                    role='tenant',
+                    password=password,
+                )
+                tenants.append(tenant)
+                leases.append(Lease(
+                    company=company,
+                    unit=unit,
+                    tenant=tenant,
+                    start_date=first_month,
+                    end_date=today.replace(year=today.year + 1),
+                    rent_amount=Decimal(rng.randint(250, 900)),
+                    security_deposit=Decimal(500),
+                    status='active',
+                ))
+    Unit.objects.bulk_create(units, batch_size=BATCH_SIZE)
+    User.objects.bulk_create(tenants, batch_size=BATCH_SIZE)
+    Lease.objects.bulk_create(leases, batch_size=BATCH_SIZE)
+
+    meters = [
+        UnitMeter(
+            company=company,
+            unit=unit,
+            meter_type=meter_type,
+            meter_number=f"{unit.unit_number}-{meter_type}",
+            tariff=METER_USAGE[meter_type][1],
+        )
+        for unit in units
+        for meter_type in METER_TYPES[:meters_per_unit]
+    ]
+    UnitMeter.objects.bulk_create(meters, batch_size=BATCH_SIZE)
+
+    tenant_by_unit = {lease.unit_id: lease.tenant for lease in leases}
+    readings = []
+    for meter in meters:
+        usage = METER_USAGE[meter.meter_type][0]
+        value = Decimal(rng.randint(100, 5000))
+        for month in range(months + 1):
+            value += (usage * Decimal(rng.uniform(0.5, 1.5))).quantize(Decimal('0.01'))
+            readings.append(MeterReading(
+                company=company,
+                meter=meter,
+                reading=value,
+                reading_date=_month_start(first_month, month) + datetime.timedelta(days=rng.randint(0, 4)),
+                submitted_by=tenant_by_unit.get(meter.unit_id),
+                is_verified=month < months,
+            ))
+    MeterReading.objects.bulk_create(readings, batch_size=BATCH_SIZE)
+
+    invoices, items = [], []
+    for lease in leases:
+        for month in range(months):
+            period_start = _month_start(first_month, month)
+            issue_date = period_start + datetime.timedelta(days=4)
+            due_date = issue_date + datetime.timedelta(days=14)
+            if due_date >= today:
+                status = 'sent'
+            else:
+                status = 'paid' if rng.random() < 0.95 else 'overdue'
+            utilities = Decimal(rng.randint(20, 120))
+            invoice = Invoice(
+                company=company,
+                lease=lease,
+                number=f"{period_start:%Y-%m}-{len(invoices) + 1:05d}",
+                issue_date=issue_date,
+                period_start=period_start,
+                period_end=_month_end(period_start),
+                due_date=due_date,
+                subtotal_amount=lease.rent_amount + utilities,
+                total_amount=lease.rent_amount + utilities,
+                status=status,
+                is_sent=True,
+                paid_date=datetime.datetime.combine(
+                    due_date, datetime.time(12), tzinfo=datetime.timezone.utc
+                ) if status == 'paid' else None,
+            )
+            invoices.append(invoice)
+            items.append(InvoiceItem(
+                company=company, invoice=invoice, description='Īres maksa',
+                quantity=1, unit_price=lease.rent_amount, amount=lease.rent_amount, type='rent',
+            ))
+            items.append(InvoiceItem(
+                company=company, invoice=invoice, description='Komunālie maksājumi',
+                quantity=1, unit_price=utilities, amount=utilities, type='utility',
+            ))
+    Invoice.objects.bulk_create(invoices, batch_size=BATCH_SIZE)
+    InvoiceItem.objects.bulk_create(items, batch_size=BATCH_SIZE)
+
+    issues, maintenance = [], []
+    technician = company.owner
+    for prop in property_objs:
+        prop_units = [unit for unit in units if unit.property_id == prop.id]
+        for _ in range(issues_per_property):
+            unit = rng.choice(prop_units)
+            resolved = rng.random() < 0.7
+            issue = Issue(
+                company=company,
+                unit=unit,
+                reported_by=tenant_by_unit.get(unit.id) or company.owner,
+                issue_type='plumbing',
+                priority=rng.choice(['low', 'medium', 'high']),
+                status='resolved' if resolved else 'reported',
+                description='Synthetic issue',
+            )
+            issues.append(issue)
+            if resolved:
+                completed = datetime.datetime.combine(
+                    _month_start(first_month, rng.randint(0, months - 1)),
+                    datetime.time(12), tzinfo=datetime.timezone.utc,
+                )
+                maintenance.append(Maintenance(
+                    company=company,
+                    issue=issue,
+                    assigned_to=technician,
+                    scheduled_date=completed,
+                    completed_date=completed,
+                    description='Synthetic maintenance',
+                    cost=Decimal(rng.randint(20, 400)),
+                    status='completed',
+                    priority_rank=PRIORITY_RANKS[issue.priority],
+                ))
+    Issue.objects.bulk_create(issues, batch_size=BATCH_SIZE)
+    Maintenance.objects.bulk_create(maintenance, batch_size=BATCH_SIZE)
+
+    for document in DOCUMENTS.values():
+        document.reindex(document.model.objects.filter(company=company))
+    rebuild_issue_stats([company])
+
+    return {
+        'properties': len(property_objs),
+        'units': len(units),
+        'tenants': len(tenants),
+        'leases': len(leases),
+        'meters': len(meters),
+        'readings': len(readings),
+        'invoices': len(invoices),
+        'invoice_items': len(items),
+        'issues': len(issues),
+        'maintenance': len(maintenance),
+    }
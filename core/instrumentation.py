@@ -0,0 +1,228 @@
+import bisect
+import contextvars
+import threading
+import time
+
+# Histogrammu augšējās robežas; pēdējais grozs ir viss, kas lielāks
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+QUERY_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+SIZE_BUCKETS_KB = [1, 10, 50, 100, 500, 1000, 5000]
+
+# Pašreizējā pieprasījuma mērījumi; None, ja pieprasījums netiek mērīts
+current_request = contextvars.ContextVar('instrumentation_request', default=None)
+
+
+class RequestMetrics:
+    """Viena pieprasījuma mērījumi"""
+
+    def __init__(self, profile_templates=False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # Ligzdotu backend renderēšanu dziļums; laiks tiek pieskaitīts tikai ārējai
+        self.template_depth = 0
+        # Šablona nosaukums -> [reizes, kopējais laiks, laiks bez iekļautajiem šabloniem]
+        self.templates = {} if profile_templates else None
+        self.template_stack = []
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self, count):
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            'avg': round(self.total / count, 2) if count else 0,
+            'max': round(self.max, 2),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class ViewStats:
+    """Apkopoti mērījumi vienam URL nosaukumam"""
+
+    def __init__(self):
+        self.count = 0
+        self.over_budget = 0
+        self.latency = Histogram(LATENCY_BUCKETS_MS)
+        self.db_time = Histogram(LATENCY_BUCKETS_MS)
+        self.template_time = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS_KB)
+        self.templates = {}
+
+    def add_templates(self, templates):
+        for name, (count, total, own) in templates.items():
+            stats = self.templates.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += count
+            stats[1] += total
+            stats[2] += own
+
+    def templates_as_dict(self):
+        ordered = sorted(self.templates.items(), key=lambda item: item[1][2], reverse=True)
+        return {
+            name: {
+                'renders': count,
+                'total_ms': round(total * 1000, 2),
+                'self_ms': round(own * 1000, 2),
+                'self_ms_per_request': round(own * 1000 / self.count, 2) if self.count else 0,
+            }
+            for name, (count, total, own) in ordered
+        }
+
+    def as_dict(self):
+        data = {
+            'count': self.count,
+            'over_budget': self.over_budget,
+            'latency_ms': self.latency.as_dict(self.count),
+            'db_time_ms': self.db_time.as_dict(self.count),
+            'template_time_ms': self.template_time.as_dict(self.count),
+            'queries': self.queries.as_dict(self.count),
+            'response_kb': self.size.as_dict(self.count),
+        }
+        if self.templates:
+            data['templates'] = self.templates_as_dict()
+        return data
+
+
+class MetricsRegistry:
+    """Procesa atmiņā glabātas histogrammas pa URL nosaukumiem"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, latency_ms, metrics, size_bytes, over_budget):
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = ViewStats()
+            stats.count += 1
+            stats.over_budget += int(over_budget)
+            stats.latency.add(latency_ms)
+            stats.db_time.add(metrics.db_time * 1000)
+            stats.template_time.add(metrics.template_time * 1000)
+            stats.queries.add(metrics.queries)
+            stats.size.add(size_bytes / 1024)
+            if metrics.templates:
+                stats.add_templates(metrics.templates)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._views.items())}
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+
+registry = MetricsRegistry()
+
+
+def query_timer(execute, sql, params, many, context):
+    """connection.execute_wrapper, kas skaita vaicājumus un to laiku"""
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+_template_patch_lock = threading.Lock()
+_template_patched = False
+
+
+def install_template_timer():
+    """
+    Mēra Django šablonu renderēšanas laiku.
+
+    Tiek aplauzta backend Template.render metode, ko izsauc render() un
+    render_to_string(); iekļautie šabloni tiek ieskaitīti vecāka laikā.
+    render_to_string() cita šablona renderēšanas laikā (piem., template
+    tagā) netiek pieskaitīts otrreiz.
+    """
+    global _template_patched
+    with _template_patch_lock:
+        if _template_patched:
+            return
+        from django.template.backends.django import Template
+
+        original_render = Template.render
+
+        def render(self, context=None, request=None):
+            metrics = current_request.get()
+            if metrics is None:
+                return original_render(self, context, request)
+            metrics.template_depth += 1
+            start = time.perf_counter()
+            try:
+                return original_render(self, context, request)
+            finally:
+                metrics.template_depth -= 1
+                if not metrics.template_depth:
+                    metrics.template_time += time.perf_counter() - start
+
+        Template.render = render
+        _template_patched = True
+
+
+_profiler_patch_lock = threading.Lock()
+_profiler_patched = False
+
+
+def install_template_profiler():
+    """
+    Mēra katra šablona un {% include %} renderēšanas laiku.
+
+    Tiek aplauzta django.template.base.Template.render, ko izsauc gan
+    backend, gan include tags. Pašlaiks (self) neietver iekļauto šablonu
+    laiku; {% extends %} vecāks tiek ieskaitīts bērna šablonā.
+    """
+    global _profiler_patched
+    with _profiler_patch_lock:
+        if _profiler_patched:
+            return
+        from django.template.base import Template
+
+        original_render = Template.render
+
+        def render(self, context):
+            metrics = current_request.get()
+            if metrics is None or metrics.templates is None:
+                return original_render(self, context)
+            metrics.template_stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original_render(self, context)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = metrics.template_stack.pop()
+                if metrics.template_stack:
+                    metrics.template_stack[-1] += elapsed
+                name = self.origin.template_name or self.name or '<string>'
+                stats = metrics.templates.setdefault(name, [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] += elapsed - children
+
+        Template.render = render
+        _profiler_patched = True
+
+
+def top_templates(metrics, limit=5):
+    """Šabloni ar lielāko pašlaiku pieprasījumā"""
+    ordered = sorted(metrics.templates.items(), key=lambda item: item[1][2], reverse=True)
+    return ', '.join(f"{name}={own * 1000:.1f}ms" for name, (_, _, own) in ordered[:limit])
@@ -0,0 +1,97 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from core.management.commands.run_benchmark import percentile
+
+
+class Command(BaseCommand):
+    help = 'Mēra datubāzes savienojuma izmaksas vienam pieprasījumam: jauns savienojums pret pašreizējiem iestatījumiem'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Simulēto pieprasījumu skaits katrā režīmā')
+        parser.add_argument('--queries', type=int, default=5, help='Vaicājumu skaits vienā pieprasījumā')
+        parser.add_argument('--database', default='default')
+
+    def simulate(self, alias, requests, queries):
+        """
+        Atkārto Django pieprasījuma ciklu: request_started -> vaicājumi -> request_finished.
+
+        Signāli izsauc close_old_connections, tāpēc savienojums tiek aizvērts,
+        paturēts vai atgriezts pūlā tieši tāpat kā īstā pieprasījumā.
+        Savienojumu skaits ir faktiskie savienojumi ar serveri: pūla režīmā
+        connection_created tiek izsaukts katrai paņemšanai no pūla, tāpēc
+        tad tiek izmantota pūla statistika.
+        """
+        connection = connections[alias]
+        pool = getattr(connection, 'pool', None)
+        pool_connects = pool.get_stats().get('connections_num', 0) if pool is not None else 0
+        connects = 0
+
+        def count_connect(sender, connection, **kwargs):
+            nonlocal connects
+            if connection.alias == alias:
+                connects += 1
+
+        connection_created.connect(count_connect)
+        timings = []
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    for _ in range(queries):
+                        cursor.execute('SELECT 1')
+                        cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection_created.disconnect(count_connect)
+            connection.close()
+        if pool is not None:
+            connects = pool.get_stats().get('connections_num', 0) - pool_connects
+        return timings, connects
+
+    def report(self, label, timings, connects):
+        self.stdout.write(
+            f"{label:<28}{statistics.mean(timings):>9.2f}{percentile(timings, 50):>9.2f}"
+            f"{percentile(timings, 95):>9.2f}{percentile(timings, 99):>9.2f}{connects:>10}"
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        settings_dict = connection.settings_dict
+        pool = settings_dict['OPTIONS'].get('pool')
+        configured = (
+            f"pool {pool}" if pool else
+            f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}, health checks={settings_dict['CONN_HEALTH_CHECKS']}"
+        )
+
+        self.stdout.write(f"{connection.vendor} {settings_dict.get('HOST') or 'local'}: {options['requests']} pieprasījumi, "
+                          f"{options['queries']} vaicājumi katrā")
+        self.stdout.write(f"Pašreizējie iestatījumi: {configured}\n")
+        self.stdout.write(f"{'režīms':<28}{'vid. ms':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'savienoj.':>10}")
+
+        # Bez pastāvīgiem savienojumiem un bez pūla - katrs pieprasījums atver jaunu savienojumu
+        original = settings_dict['CONN_MAX_AGE'], settings_dict['OPTIONS'].pop('pool', None)
+        connection.close()
+        settings_dict['CONN_MAX_AGE'] = 0
+        try:
+            timings, connects = self.simulate(alias, options['requests'], options['queries'])
+        finally:
+            settings_dict['CONN_MAX_AGE'] = original[0]
+            if original[1] is not None:
+                settings_dict['OPTIONS']['pool'] = original[1]
+        fresh = statistics.mean(timings)
+        self.report('jauns savienojums', timings, connects)
+
+        timings, connects = self.simulate(alias, options['requests'], options['queries'])
+        self.report('pašreizējie iestatījumi', timings, connects)
+
+        saved = fresh - statistics.mean(timings)
+        self.stdout.write(self.style.SUCCESS(f"\nIetaupījums uz pieprasījumu: {saved:.2f} ms"))
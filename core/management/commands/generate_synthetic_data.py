@@ -0,0 +1,53 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.factories import create_company, seed_portfolio
+
+
+class Command(BaseCommand):
+    help = 'Ģenerē sintētiskus uzņēmumus ar īpašumiem, līgumiem, rādījumiem un rēķiniem slodzes testiem'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=1, help='Uzņēmumu skaits')
+        parser.add_argument('--properties', type=int, default=5, help='Īpašumu skaits uzņēmumā')
+        parser.add_argument('--units', type=int, default=40, help='Vidējais telpu skaits īpašumā')
+        parser.add_argument('--meters', type=int, default=2, help='Skaitītāju skaits telpā (1-5)')
+        parser.add_argument('--months', type=int, default=24, help='Rādījumu un rēķinu vēsture mēnešos')
+        parser.add_argument('--occupancy', type=float, default=0.9, help='Izīrēto telpu īpatsvars (0-1)')
+        parser.add_argument('--issues', type=int, default=10, help='Problēmu ziņojumu skaits īpašumā')
+        parser.add_argument('--seed', type=int, default=42, help='Nejaušo skaitļu sēkla atkārtojamiem datiem')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        started = time.monotonic()
+        totals = {}
+
+        for i in range(options['companies']):
+            company_started = time.monotonic()
+            company = create_company(name=f"Synthetic {options['seed']}-{i + 1}")
+            # Uzņēmumi atšķiras pēc izmēra, lai sadalījums būtu tuvāks reālajam
+            units = max(1, int(rng.gauss(options['units'], options['units'] * 0.25)))
+            counts = seed_portfolio(
+                company,
+                properties=options['properties'],
+                units_per_property=units,
+                months=options['months'],
+                meters_per_unit=max(1, min(options['meters'], 5)),
+                occupancy=options['occupancy'],
+                issues_per_property=options['issues'],
+                seed=rng.randint(0, 2 ** 32),
+            )
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+            self.stdout.write(
+                f"[{i + 1}/{options['companies']}] {company.slug} (owner: {company.owner.username}): "
+                + ", ".join(f"{key} {value}" for key, value in counts.items())
+                + f" - {time.monotonic() - company_started:.1f}s"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Gatavs {time.monotonic() - started:.1f}s: "
+            + ", ".join(f"{key} {value}" for key, value in totals.items())
+        ))
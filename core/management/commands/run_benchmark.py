@@ -0,0 +1,131 @@
+import json
+import math
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from companies.models import Company
+from invoices.models import Invoice
+from leases.models import Lease
+from properties.models import Property, Unit
+
+
+def percentile(values, percent):
+    """Percentile pēc tuvākā ranga metodes"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def benchmark_urls(company):
+    """Galvenie skati, ko mēra: (nosaukums, URL, 'owner' vai 'tenant')"""
+    slug = company.slug
+    prop = Property.objects.filter(company=company).order_by('created_at').first()
+    unit = Unit.objects.filter(company=company).order_by('created_at').first()
+    lease = Lease.objects.filter(company=company, status='active', tenant__isnull=False).order_by('created_at').first()
+    invoice = Invoice.objects.filter(company=company).order_by('-issue_date').first()
+    if not (prop and unit and lease and invoice):
+        raise CommandError(f"Uzņēmumam '{slug}' nav pietiekami daudz datu (palaidiet generate_synthetic_data)")
+
+    return [
+        ('company_detail', reverse('companies_tenant:company_detail', args=[slug]), 'owner'),
+        ('property_list', reverse('properties:property_list', args=[slug]), 'owner'),
+        ('property_detail', reverse('properties:property_detail', args=[slug, prop.id]), 'owner'),
+        ('unit_detail', reverse('properties:unit_detail', args=[slug, unit.property_id, unit.id]), 'owner'),
+        ('lease_list', reverse('leases:lease_list', args=[slug]), 'owner'),
+        ('invoice_list', reverse('invoices:invoice_list', args=[slug]), 'owner'),
+        ('invoice_detail', reverse('invoices:invoice_detail', args=[slug, invoice.id]), 'owner'),
+        ('meter_readings', reverse('properties:company_meter_readings', args=[slug]), 'owner'),
+        ('company_issues', reverse('inspections:company_issues', args=[slug]), 'owner'),
+        ('reports', reverse('reports:report_overview', args=[slug]), 'owner'),
+        ('tenant_dashboard', reverse('tenant_portal:dashboard'), 'tenant'),
+        ('tenant_invoices', reverse('tenant_portal:tenant_invoices'), 'tenant'),
+    ], lease.tenant
+
+
+class Command(BaseCommand):
+    help = 'Mēra galveno skatu latentumu (p50/p95/p99) un vaicājumu skaitu ar Django test client'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='Uzņēmuma slug (noklusējums: uzņēmums ar visvairāk telpām)')
+        parser.add_argument('--iterations', type=int, default=20, help='Pieprasījumu skaits katram URL')
+        parser.add_argument('--warmup', type=int, default=2, help='Neuzskaitītie sākuma pieprasījumi katram URL')
+        parser.add_argument('--only', help='Mērīt tikai norādītos skatus (ar komatu atdalīti nosaukumi)')
+        parser.add_argument('--save', help='Saglabāt rezultātus JSON failā')
+        parser.add_argument('--compare', help='Salīdzināt ar iepriekš saglabātu JSON failu')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations jābūt vismaz 1")
+        if options['warmup'] < 0:
+            raise CommandError("--warmup nevar būt negatīvs")
+
+        if options['company']:
+            company = Company.objects.filter(slug=options['company']).first()
+        else:
+            company = Company.objects.annotate(unit_count=Count('unit')).order_by('-unit_count').first()
+        if not company:
+            raise CommandError("Uzņēmums nav atrasts")
+
+        urls, tenant = benchmark_urls(company)
+        if options['only']:
+            only = set(options['only'].split(','))
+            urls = [url for url in urls if url[0] in only]
+
+        clients = {'owner': Client(), 'tenant': Client()}
+        clients['owner'].force_login(company.owner)
+        clients['tenant'].force_login(tenant)
+
+        self.stdout.write(f"{company.name} ({company.slug}), {options['iterations']} pieprasījumi katram URL\n")
+        results = {}
+        for name, url, role in urls:
+            client = clients[role]
+            for _ in range(options['warmup']):
+                client.get(url)
+
+            latencies, queries = [], []
+            status_code = None
+            for _ in range(options['iterations']):
+                with CaptureQueriesContext(connection) as context:
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                queries.append(len(context.captured_queries))
+                status_code = response.status_code
+
+            results[name] = {
+                'url': url,
+                'status': status_code,
+                'p50': round(percentile(latencies, 50), 2),
+                'p95': round(percentile(latencies, 95), 2),
+                'p99': round(percentile(latencies, 99), 2),
+                'queries': round(statistics.mean(queries), 1),
+                'size': len(response.content),
+            }
+
+        baseline = {}
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)['results']
+
+        self.stdout.write(f"{'skats':<18}{'status':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'vaic.':>8}{'KB':>9}")
+        for name, row in results.items():
+            line = (
+                f"{name:<18}{row['status']:>7}{row['p50']:>10.1f}{row['p95']:>10.1f}"
+                f"{row['p99']:>10.1f}{row['queries']:>8}{row['size'] / 1024:>9.1f}"
+            )
+            before = baseline.get(name)
+            if before:
+                line += f"   p95 {row['p95'] - before['p95']:+.1f} ms, vaic. {row['queries'] - before['queries']:+.1f}"
+            self.stdout.write(line)
+
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({'company': company.slug, 'iterations': options['iterations'], 'results': results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Rezultāti saglabāti {options['save']}"))
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from invoices.models import Invoice
+from leases.models import Lease
+from properties.models import Unit, UnitMeter
+
+
+def sweep_invoices(today, dry_run=False):
+    """Nosūtītie rēķini pēc apmaksas termiņa -> overdue"""
+    invoices = Invoice.objects.filter(status='sent', due_date__lt=today)
+    if dry_run:
+        return invoices.count()
+    # WHERE nosacījums tiek pārbaudīts atkārtoti rindas atjaunošanas brīdī,
+    # tāpēc paralēli palaists process to pašu rēķinu neatjaunos otrreiz
+    return invoices.update(status='overdue', updated_at=timezone.now())
+
+
+def sweep_meters(today, dry_run=False):
+    """Aktīvie skaitītāji pēc expire_date -> expired"""
+    meters = UnitMeter.objects.filter(status='active', expire_date__lt=today)
+    if dry_run:
+        return meters.count()
+    return meters.update(status='expired', updated_at=timezone.now())
+
+
+def sweep_leases(today, dry_run=False):
+    """
+    Aktīvie līgumi pēc end_date -> expired, telpa tiek atbrīvota.
+
+    Telpa kļūst brīva tikai tad, ja tā bija izīrēta un tai nav cita
+    aktīva līguma. Rindas tiek bloķētas ar SKIP LOCKED, lai paralēli
+    palaisti procesi neapstrādātu vienus un tos pašus līgumus.
+    """
+    leases = Lease.objects.filter(status='active', end_date__lt=today)
+    other_active = Lease.objects.filter(unit=OuterRef('pk'), status='active', end_date__gte=today)
+    if dry_run:
+        units = Unit.objects.filter(id__in=leases.values('unit_id'), status='rented').exclude(Exists(other_active))
+        return leases.count(), units.count()
+
+    now = timezone.now()
+    with transaction.atomic():
+        expired = list(
+            leases.select_for_update(skip_locked=True).values_list('id', 'unit_id')
+        )
+        if not expired:
+            return 0, 0
+        lease_ids = [lease_id for lease_id, _ in expired]
+        unit_ids = {unit_id for _, unit_id in expired}
+
+        lease_count = Lease.objects.filter(id__in=lease_ids, status='active').update(status='expired', updated_at=now)
+
+        unit_count = Unit.objects.filter(
+            id__in=unit_ids, status='rented',
+        ).exclude(Exists(other_active)).update(status='available', updated_at=now)
+
+    return lease_count, unit_count
+
+
+class Command(BaseCommand):
+    help = 'Atjaunina novecojušos rēķinu, skaitītāju un līgumu statusus (palaist periodiski)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Tikai parādīt, cik ierakstu tiktu atjaunoti')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        dry_run = options['dry_run']
+
+        invoices = sweep_invoices(today, dry_run)
+        meters = sweep_meters(today, dry_run)
+        leases, units = sweep_leases(today, dry_run)
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(f"{prefix}Rēķini -> overdue: {invoices}")
+        self.stdout.write(f"{prefix}Skaitītāji -> expired: {meters}")
+        self.stdout.write(f"{prefix}Līgumi -> expired: {leases}")
+        self.stdout.write(self.style.SUCCESS(f"{prefix}Atbrīvotas telpas: {units}"))
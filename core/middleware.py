@@ -1,5 +1,19 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.http import Http404
+from django.utils.deprecation import MiddlewareMixin
+from whitenoise.middleware import WhiteNoiseMiddleware
 from companies.models import Company, CompanyMember
+from core import instrumentation
+
+instrumentation_logger = logging.getLogger('core.instrumentation')
 
 # class TenantMiddleware:
 #     def __init__(self, get_response):
@@ -38,11 +52,9 @@ from companies.models import Company, CompanyMember
 #         response = self.get_response(request)
 #         return response
 
-class TenantMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
+class TenantMiddleware(MiddlewareMixin):
+    # MiddlewareMixin ļauj darboties gan WSGI, gan ASGI režīmā bez pārslēgšanās uz sinhrono ķēdi
+    def process_request(self, request):
         company_slug = None
         
         # Mēģinam iegūt company_slug no URL
@@ -57,7 +69,7 @@ class TenantMiddleware:
                 # Pārbaudam vai lietotājs ir pieteicies un ir saistīts ar šo company
                 if request.user.is_authenticated:
                     # Inicializējam noklusējuma vērtības
-                    request.is_company_owner = request.tenant.owner == request.user
+                    request.is_company_owner = request.tenant.owner_id == request.user.pk
                     request.company_role = None
                     request.is_company_admin = False
                     request.is_company_manager = False
@@ -90,15 +102,9 @@ class TenantMiddleware:
                 request.tenant = None
         else:
             request.tenant = None
-        
-        response = self.get_response(request)
-        return response
     
-class SubscriptionCheckMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
+class SubscriptionCheckMiddleware(MiddlewareMixin):
+    def process_request(self, request):
         # Izpildās pirms skata
         
         # Ja ir aktīvs tenant un lietotājs ir pieteicies
@@ -110,7 +116,102 @@ class SubscriptionCheckMiddleware:
             
             # Pievienojam dažas izmantotas metodes
             request.can_use_invoicing = subscription and subscription.is_active() and subscription.plan.enable_invoicing
+            request.can_use_reports = subscription and subscription.is_active() and subscription.plan.enable_reports
             # ... citas pārbaudes
-        
-        response = self.get_response(request)
-        return response
\ No newline at end of file
+
+
+class InstrumentationMiddleware:
+    """
+    Mēra vaicājumu skaitu, DB laiku, šablonu laiku un atbildes izmēru pa URL nosaukumiem.
+
+    Ieslēdzams ar INSTRUMENTATION_ENABLED. Tiek mērīta INSTRUMENTATION_SAMPLE_RATE
+    daļa pieprasījumu; rezultāti pieejami /_instrumentation/ (tikai staff) vai žurnālā.
+    Ar TEMPLATE_PROFILING tiek mērīts arī katrs šablons un {% include %}.
+    Middleware ir tikai sinhrons, tāpēc ASGI režīmā to ieslēgt tikai diagnostikai.
+    """
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        self.query_budget = settings.INSTRUMENTATION_QUERY_BUDGET
+        self.log_requests = settings.INSTRUMENTATION_LOG_REQUESTS
+        self.profile_templates = settings.TEMPLATE_PROFILING
+        instrumentation.install_template_timer()
+        if self.profile_templates:
+            instrumentation.install_template_profiler()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        metrics = instrumentation.RequestMetrics(self.profile_templates)
+        token = instrumentation.current_request.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(instrumentation.query_timer))
+                response = self.get_response(request)
+        finally:
+            instrumentation.current_request.reset(token)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+        if response.streaming:
+            size = int(response.get('Content-Length', 0))
+        else:
+            size = len(response.content)
+        over_budget = metrics.queries > self.query_budget
+
+        instrumentation.registry.record(view_name, latency_ms, metrics, size, over_budget)
+
+        if over_budget:
+            instrumentation_logger.warning(
+                "Query budget exceeded: %s %s view=%s queries=%d budget=%d db=%.1fms",
+                request.method, request.path, view_name, metrics.queries, self.query_budget,
+                metrics.db_time * 1000,
+            )
+        elif self.log_requests:
+            instrumentation_logger.info(
+                "%s %s view=%s status=%d time=%.1fms queries=%d db=%.1fms templates=%.1fms size=%d",
+                request.method, request.path, view_name, response.status_code, latency_ms,
+                metrics.queries, metrics.db_time * 1000, metrics.template_time * 1000, size,
+            )
+        if self.log_requests and metrics.templates:
+            instrumentation_logger.info(
+                "%s %s templates: %s", request.method, request.path, instrumentation.top_templates(metrics),
+            )
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, kas atbalsta arī ASGI.
+
+    Oriģinālais WhiteNoiseMiddleware ir tikai sinhrons, tāpēc ASGI režīmā
+    katrs pieprasījums aizņemtu pavedienu visu asinhronā skata izpildes laiku.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
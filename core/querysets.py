@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class LabelQuerySet(models.QuerySet):
+    """
+    QuerySet, kas zina, kuras relācijas izmanto modeļa __str__.
+
+    Izvēlnēs, admin sarakstos un žurnālos objekts tiek pārvērsts tekstā
+    katrai rindai; bez select_related tas nozīmē 2-3 papildu vaicājumus
+    uz rindu.
+    """
+    label_relations = ()
+
+    def with_label_relations(self):
+        return self.select_related(*self.label_relations)
+
+
+def with_label_relations(queryset):
+    """Pielieto with_label_relations(), ja modeļa QuerySet to atbalsta"""
+    if isinstance(queryset, LabelQuerySet):
+        return queryset.with_label_relations()
+    return queryset
@@ -1,5 +1,6 @@
 from django.conf import settings
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
 
 class MediaStorage(S3Boto3Storage):
     location = 'media'  # Bāzes direktorija S3 bucket
@@ -20,6 +21,34 @@ class IssueImageStorage(MediaStorage):
     # Location netiek norādīts, lai varētu pilnībā izmantot
     # get_report_Issue_image_upload_path funkciju
 
+class InvoicePdfStorage(MediaStorage):
+    """Storage klase rēķinu PDF failiem"""
+    # Faila nosaukums ir satura hash, tāpēc to drīkst pārrakstīt
+    file_overwrite = True
+
 class ProfileImageStorage(MediaStorage):
     """Storage klase lietotāju profila attēliem"""
-    location = 'media/profile_images'  # Šeit varam norādīt direktoriju
\ No newline at end of file
+    location = 'media/profile_images'  # Šeit varam norādīt direktoriju
+
+def open_file_chunks(field_file, chunk_size=64 * 1024):
+    """
+    Atver failu no storage un atgriež iteratoru pa gabaliem.
+
+    S3 gadījumā lasām tieši no objekta straumes, lai fails netiktu
+    pilnībā lejupielādēts atmiņā vai pagaidu failā.
+    Fails tiek atvērts uzreiz, tāpēc kļūda (piem., trūkstošs fails)
+    rodas pirms pirmā gabala nolasīšanas.
+    """
+    storage = field_file.storage
+    if isinstance(storage, S3Boto3Storage):
+        key = storage._normalize_name(clean_name(field_file.name))
+        body = storage.bucket.Object(key).get()['Body']
+        return body.iter_chunks(chunk_size)
+
+    source = storage.open(field_file.name, 'rb')
+
+    def _chunks():
+        with source:
+            yield from source.chunks(chunk_size)
+
+    return _chunks()
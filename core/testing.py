@@ -0,0 +1,28 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetTestCase(TestCase):
+    """TestCase ar vaicājumu budžeta pārbaudi skatiem"""
+
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        """Kļūda, ja blokā izpildīto SQL vaicājumu skaits pārsniedz budžetu"""
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f"{executed} vaicājumi pārsniedz budžetu {budget}:\n{queries}")
+
+    def get_within_budget(self, client, url, budget):
+        """GET pieprasījums, kuram jāatgriež 200 un jāiekļaujas budžetā"""
+        with self.assertQueryBudget(budget):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
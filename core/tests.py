@@ -1,3 +1,217 @@
-from django.test import TestCase
+import datetime
+import time
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template import engines
+from django.template.loader import render_to_string
+from django.template.loaders.cached import Loader as CachedLoader
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import instrumentation
+from .factories import add_member, create_company, create_user, seed_portfolio
+from companies.models import Company
+from invoices.models import Invoice
+from leases.models import Lease
+from properties.models import Unit, UnitMeter
+
+from .testing import QueryBudgetTestCase
+
+
+class LabelRelationsTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=15, months=1, occupancy=1, seed=5)
+        add_member(cls.company)
+        cls.admin_user = create_user('manager', is_staff=True, is_superuser=True)
+
+    def test_labels_use_one_query(self):
+        leases = Lease.objects.filter(company=self.company).with_label_relations()
+        with self.assertQueryBudget(1):
+            labels = [str(lease) for lease in leases]
+        self.assertEqual(len(labels), Lease.objects.count())
+
+    def test_admin_queries_do_not_grow_with_rows(self):
+        self.client.force_login(self.admin_user)
+        lease = Lease.objects.first()
+        for url in [
+            reverse('admin:leases_lease_changelist'),
+            reverse('admin:leases_lease_change', args=[lease.pk]),
+            reverse('admin:invoices_invoice_changelist'),
+            reverse('admin:properties_unit_changelist'),
+            reverse('admin:companies_companymember_changelist'),
+        ]:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLess(len(context.captured_queries), 15, url)
+
+    def test_every_model_admin_renders(self):
+        self.client.force_login(self.admin_user)
+        for model, model_admin in admin.site._registry.items():
+            info = (model._meta.app_label, model._meta.model_name)
+            obj = model._default_manager.first()
+            urls = [reverse('admin:%s_%s_changelist' % info), reverse('admin:%s_%s_add' % info)]
+            if obj is not None:
+                urls.append(reverse('admin:%s_%s_change' % info, args=[obj.pk]))
+            for url in urls:
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, {'q': 'a'} if url == urls[0] and model_admin.search_fields else {})
+                self.assertEqual(response.status_code, 200, url)
+                self.assertLess(len(context.captured_queries), 20, url)
+
+
+class TemplateLoaderTests(SimpleTestCase):
+    def test_templates_are_cached(self):
+        loaders = engines['django'].engine.template_loaders
+        self.assertEqual(len(loaders), 1)
+        self.assertIsInstance(loaders[0], CachedLoader)
+
+
+class RunBenchmarkTests(SimpleTestCase):
+    def test_iterations_must_be_positive(self):
+        with self.assertRaisesMessage(CommandError, '--iterations'):
+            call_command('run_benchmark', iterations=0)
+        with self.assertRaisesMessage(CommandError, '--warmup'):
+            call_command('run_benchmark', warmup=-1)
+
+
+class TemplateTimerTests(SimpleTestCase):
+    def test_nested_renders_are_counted_once(self):
+        instrumentation.install_template_timer()
+        engine = engines['django']
+        inner = engine.from_string('iekšējais')
+
+        def render_inner():
+            time.sleep(0.05)
+            return inner.render()
+
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation.current_request.set(metrics)
+        try:
+            start = time.perf_counter()
+            engine.from_string('{{ inner }}').render({'inner': render_inner})
+            elapsed = time.perf_counter() - start
+        finally:
+            instrumentation.current_request.reset(token)
+
+        self.assertGreaterEqual(metrics.template_time, 0.05)
+        self.assertLessEqual(metrics.template_time, elapsed)
+        self.assertEqual(metrics.template_depth, 0)
+
+
+class ChromeCacheTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+
+    def setUp(self):
+        cache.clear()
+
+    def load_company(self):
+        # name un logo ir atlikti - kešatmiņas garām tie jāielādē ar vaicājumiem
+        return Company.objects.defer('name', 'logo').get(pk=self.company.pk)
+
+    def render_sidebar(self, company=None):
+        company = company or self.load_company()
+        request = RequestFactory().get('/')
+        request.user = self.company.owner
+        request.tenant = company
+        request.is_company_owner = True
+        request.company_role = None
+        request.can_use_reports = False
+        return render_to_string('partials/sidebar.html', {'company': company, 'active_page': 'dashboard'},
+                                request=request)
+
+    def test_sidebar_hit_needs_no_queries(self):
+        company = self.load_company()
+        with self.assertQueryBudget(2) as context:
+            self.render_sidebar(company)
+        self.assertGreater(len(context.captured_queries), 0)
+
+        company = self.load_company()
+        with self.assertQueryBudget(0):
+            self.render_sidebar(company)
+
+    def test_company_change_invalidates_fragments(self):
+        self.render_sidebar()
+        Company.objects.filter(pk=self.company.pk).update(name='Bez signāla')
+        self.assertNotIn('Bez signāla', self.render_sidebar())
+
+        company = Company.objects.get(pk=self.company.pk)
+        company.name = 'Jaunais nosaukums'
+        company.save()
+        self.assertIn('Jaunais nosaukums', self.render_sidebar())
+
+    def test_navbar_is_cached_per_role(self):
+        request = RequestFactory().get('/')
+        request.user = self.company.owner
+        render_to_string('partials/navbar.html', {'user': request.user}, request=request)
+        key = make_template_fragment_key('navbar', [True, self.company.owner.role])
+        self.assertIsNotNone(cache.get(key))
+
+
+class SweepStatusesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=3, months=1, meters_per_unit=1,
+                       occupancy=1, issues_per_property=0, seed=31)
+        today = timezone.localdate()
+        cls.yesterday = today - datetime.timedelta(days=1)
+        cls.leases = list(Lease.objects.filter(company=cls.company).order_by('unit_id'))
+        cls.units = [lease.unit for lease in cls.leases]
+
+        # Pirmajai un otrajai telpai līgums beidzies, otrajai ir arī jauns aktīvs līgums
+        Lease.objects.filter(pk__in=[cls.leases[0].pk, cls.leases[1].pk]).update(end_date=cls.yesterday)
+        Lease.objects.create(company=cls.company, unit=cls.units[1], tenant=cls.leases[1].tenant,
+                             start_date=today, end_date=today.replace(year=today.year + 1), status='active',
+                             rent_amount=Decimal('400'), security_deposit=Decimal('400'))
+
+        invoices = list(Invoice.objects.filter(company=cls.company).order_by('id')[:3])
+        Invoice.objects.filter(company=cls.company).update(status='paid', due_date=cls.yesterday)
+        Invoice.objects.filter(pk=invoices[0].pk).update(status='sent')
+        Invoice.objects.filter(pk=invoices[1].pk).update(status='sent', due_date=today)
+        cls.invoices = invoices
+
+        cls.meters = list(UnitMeter.objects.filter(company=cls.company).order_by('id')[:2])
+        UnitMeter.objects.filter(pk=cls.meters[0].pk).update(status='active', expire_date=cls.yesterday)
+        UnitMeter.objects.filter(pk=cls.meters[1].pk).update(status='active', expire_date=today)
+
+    def sweep(self, *args):
+        out = StringIO()
+        call_command('sweep_statuses', *args, stdout=out)
+        return out.getvalue()
+
+    def statuses(self, model, objects):
+        status = dict(model.objects.filter(pk__in=[obj.pk for obj in objects]).values_list('pk', 'status'))
+        return [status[obj.pk] for obj in objects]
+
+    def test_dry_run_changes_nothing(self):
+        out = self.sweep('--dry-run')
+        self.assertIn('[dry-run] Rēķini -> overdue: 1', out)
+        self.assertIn('[dry-run] Līgumi -> expired: 2', out)
+        self.assertIn('[dry-run] Atbrīvotas telpas: 1', out)
+        self.assertEqual(self.statuses(Lease, self.leases), ['active'] * 3)
+
+    def test_sweep_expires_only_stale_rows(self):
+        out = self.sweep()
+        self.assertIn('Skaitītāji -> expired: 1', out)
+
+        self.assertEqual(self.statuses(Lease, self.leases), ['expired', 'expired', 'active'])
+        self.assertEqual(self.statuses(Unit, self.units), ['available', 'rented', 'rented'])
+        self.assertEqual(self.statuses(Invoice, self.invoices), ['overdue', 'sent', 'paid'])
+        self.assertEqual(self.statuses(UnitMeter, self.meters), ['expired', 'active'])
+
+        # Atkārtota palaišana neko nemaina
+        self.assertIn('Atbrīvotas telpas: 0', self.sweep())
+        self.assertEqual(self.statuses(Lease, self.leases), ['expired', 'expired', 'active'])
@@ -1,3 +1,13 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from core import instrumentation
 
-# Create your views here.
+
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def instrumentation_stats(request):
+    """Šī procesa instrumentācijas histogrammas JSON formātā; POST notīra datus"""
+    if request.method == 'POST':
+        instrumentation.registry.reset()
+    return JsonResponse(instrumentation.registry.snapshot(), json_dumps_params={'indent': 2})
@@ -1,3 +1,59 @@
 from django.contrib import admin
+from core.admin import TenantModelAdmin
+from search.admin import SearchVectorAdminMixin
+from .models import Inspection, Issue, IssueImage, Maintenance
 
-# Register your models here.
+
+@admin.register(Inspection)
+class InspectionAdmin(TenantModelAdmin):
+    list_display = ('unit', 'inspection_type', 'status', 'scheduled_date', 'inspector')
+    list_select_related = ('unit__property', 'inspector')
+    list_filter = ('status', 'inspection_type')
+    search_fields = ('unit__unit_number', 'unit__property__address')
+    autocomplete_fields = ('company', 'unit', 'inspector')
+    date_hierarchy = 'scheduled_date'
+
+
+class IssueImageInline(admin.TabularInline):
+    model = IssueImage
+    fields = ('image', 'uploaded_by', 'created_at')
+    readonly_fields = ('created_at',)
+    autocomplete_fields = ('uploaded_by',)
+    extra = 0
+
+
+@admin.register(Issue)
+class IssueAdmin(SearchVectorAdminMixin, TenantModelAdmin):
+    list_display = ('unit', 'issue_type', 'priority', 'status', 'reported_by', 'created_at')
+    list_select_related = ('unit__property', 'reported_by')
+    list_filter = ('status', 'priority', 'issue_type')
+    search_fields = ('description', 'unit__unit_number', 'unit__property__address')
+    autocomplete_fields = ('company', 'inspection', 'unit', 'reported_by', 'resolved_by')
+    date_hierarchy = 'created_at'
+    inlines = [IssueImageInline]
+
+    def save_formset(self, request, form, formset, change):
+        # Inline attēliem company tiek ņemts no problēmas
+        for instance in formset.save(commit=False):
+            instance.company_id = form.instance.company_id
+            instance.save()
+        for obj in formset.deleted_objects:
+            obj.delete()
+
+
+@admin.register(IssueImage)
+class IssueImageAdmin(TenantModelAdmin):
+    list_display = ('issue', 'uploaded_by', 'created_at')
+    list_select_related = ('issue', 'uploaded_by')
+    autocomplete_fields = ('company', 'issue', 'uploaded_by')
+    date_hierarchy = 'created_at'
+
+
+@admin.register(Maintenance)
+class MaintenanceAdmin(TenantModelAdmin):
+    list_display = ('issue', 'assigned_to', 'status', 'scheduled_date', 'completed_date', 'cost')
+    list_select_related = ('issue', 'assigned_to')
+    list_filter = ('status',)
+    search_fields = ('description', 'assigned_to__email', 'assigned_to__last_name')
+    autocomplete_fields = ('company', 'issue', 'assigned_to')
+    date_hierarchy = 'scheduled_date'
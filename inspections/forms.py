@@ -1,15 +1,16 @@
 # forms.py
 from django import forms
-from .models import Maintenance
+from .models import Maintenance, maintenance_assignees
 from users.models import User
-from companies.models import CompanyMember
+from search.autocomplete import selected_choice, user_label
 
 class MaintenanceAssignForm(forms.ModelForm):
     class Meta:
         model = Maintenance
         fields = ['assigned_to', 'scheduled_date', 'description', 'cost']
         widgets = {
-            'assigned_to': forms.Select(attrs={'class': 'form-select'}),
+            # Izpildītājs tiek izvēlēts ar autocomplete (search:autocomplete 'assignees')
+            'assigned_to': forms.HiddenInput(),
             'scheduled_date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
             'cost': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
@@ -19,27 +20,15 @@ class MaintenanceAssignForm(forms.ModelForm):
         company = kwargs.pop('company', None)
         super().__init__(*args, **kwargs)
         
-        # Atlasam tikai konkrētā uzņēmuma lietotājus
+        # Tikai uzņēmuma tehniķi un menedžeri; bez uzņēmuma izvēle nav iespējama
         if company:
-            # Ietver uzņēmuma īpašnieku
-            company_users = [company.owner]
-            
-            # Ietver uzņēmuma dalībniekus
-            company_members = CompanyMember.objects.filter(
-                company=company, 
-                is_active=True
-            ).select_related('user')
-            
-            for member in company_members:
-                company_users.append(member.user)
-            
-            # Uztaisam unikālu sarakstu
-            company_users = list(set(company_users))
-            
-            # Iestatām izvēles
-            self.fields['assigned_to'].queryset = User.objects.filter(
-                id__in=[user.id for user in company_users]
-            )
+            self.fields['assigned_to'].queryset = maintenance_assignees(company)
         else:
-            # Ja nav norādīts uzņēmums, atlasām visus lietotājus (var noderēt testēšanai)
-            self.fields['assigned_to'].queryset = User.objects.all()
\ No newline at end of file
+            self.fields['assigned_to'].queryset = User.objects.none()
+        # Bez izpildītāja darbs nonāk tehniķu rindā
+        self.fields['assigned_to'].required = False
+
+    @property
+    def assignee_choice(self):
+        """Izvēlētais izpildītājs autocomplete laukam, piem., pēc kļūdainas iesniegšanas"""
+        return selected_choice(self.fields['assigned_to'].queryset, self['assigned_to'].value(), user_label)
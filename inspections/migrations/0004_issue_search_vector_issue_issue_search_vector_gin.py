@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('inspections', '0003_alter_issueimage_image'),
+        ('properties', '0004_unitmeter_tariff'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='issue_search_vector_gin'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('inspections', '0004_issue_search_vector_issue_issue_search_vector_gin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='maintenance',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='assigned_maintenance', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='maintenance',
+            index=models.Index(fields=['assigned_to', 'status', 'scheduled_date'], name='maintenance_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenance',
+            index=models.Index(condition=models.Q(('assigned_to__isnull', True), ('status', 'scheduled')), fields=['company', 'created_at'], name='maintenance_queue_idx'),
+        ),
+    ]
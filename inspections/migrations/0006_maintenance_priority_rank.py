@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_priority_rank(apps, schema_editor):
+    Maintenance = apps.get_model('inspections', 'Maintenance')
+    for priority, rank in {'critical': 0, 'high': 1, 'medium': 2}.items():
+        Maintenance.objects.filter(issue__priority=priority).update(priority_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('inspections', '0005_alter_maintenance_assigned_to_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='maintenance',
+            name='maintenance_queue_idx',
+        ),
+        migrations.AddField(
+            model_name='maintenance',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=3, editable=False),
+        ),
+        migrations.RunPython(fill_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='maintenance',
+            index=models.Index(condition=models.Q(('assigned_to__isnull', True), ('status', 'scheduled')), fields=['company', 'priority_rank', 'created_at'], name='maintenance_queue_idx'),
+        ),
+    ]
@@ -1,7 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from companies.models import CompanyMember
 from core.models import TenantModel
 from core.storage import IssueImageStorage
 
+# Remonta darbus var piešķirt tikai tehniķiem un menedžeriem
+MAINTENANCE_ASSIGNEE_ROLES = [CompanyMember.Roles.TECHNICIAN, CompanyMember.Roles.MANAGER]
+
+# Problēmas statusi pēc atrisināšanas un remontdarbi, kas vēl nav pabeigti
+RESOLVED_STATUSES = ['resolved', 'closed']
+OPEN_MAINTENANCE_STATUSES = ['scheduled', 'in_progress']
+
+# Problēmas prioritāte -> secība tehniķu darbu rindā (0 - steidzamākā)
+PRIORITY_RANKS = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+
+def maintenance_assignees(company):
+    """Uzņēmuma aktīvie dalībnieki, kuriem var piešķirt remonta darbus"""
+    return get_user_model().objects.filter(
+        company_memberships__company=company,
+        company_memberships__is_active=True,
+        company_memberships__role__in=MAINTENANCE_ASSIGNEE_ROLES,
+    )
+
 
 def get_report_Issue_image_upload_path(instance, filename):
     company_id = instance.company_id  # Izmantojam _id, lai piekļūtu tieši foreign key vērtībai
@@ -74,6 +97,19 @@ class Issue(TenantModel):
     )
     estimated_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     show_estimated_cost = models.BooleanField(default=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='issue_search_vector_gin')]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if not adding and (update_fields is None or 'priority' in update_fields):
+            # Mainot prioritāti, darbu rindas secība jāatjauno arī remonta darbiem
+            rank = PRIORITY_RANKS[self.priority]
+            self.maintenance_records.exclude(priority_rank=rank).update(priority_rank=rank)
 
 class IssueImage(TenantModel):
     image = models.ImageField(upload_to=get_report_Issue_image_upload_path, storage=IssueImageStorage(), max_length=255)
@@ -86,7 +122,9 @@ class IssueImage(TenantModel):
     
 class Maintenance(TenantModel):
     issue = models.ForeignKey(Issue, on_delete=models.CASCADE, related_name='maintenance_records')
-    assigned_to = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='assigned_maintenance')
+    # Tukšs - darbs gaida tehniķu rindā (inspections.queue)
+    assigned_to = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='assigned_maintenance',
+                                    null=True, blank=True)
     scheduled_date = models.DateTimeField()
     completed_date = models.DateTimeField(null=True, blank=True)
     description = models.TextField()
@@ -97,4 +135,20 @@ class Maintenance(TenantModel):
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled')
     ])
-    notes = models.TextField(blank=True)
\ No newline at end of file
+    notes = models.TextField(blank=True)
+    # Problēmas prioritātes kopija, lai rindas secību nodrošinātu indekss
+    priority_rank = models.PositiveSmallIntegerField(default=PRIORITY_RANKS['low'], editable=False)
+
+    class Meta:
+        indexes = [
+            # Tehniķa "mani darbi" saraksts
+            models.Index(fields=['assigned_to', 'status', 'scheduled_date'], name='maintenance_assignee_idx'),
+            # Nepiešķirto darbu rinda prioritātes un vecuma secībā
+            models.Index(fields=['company', 'priority_rank', 'created_at'], name='maintenance_queue_idx',
+                         condition=models.Q(assigned_to__isnull=True, status='scheduled')),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.priority_rank = PRIORITY_RANKS[self.issue.priority]
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Tehniķu darbu rinda.
+
+Nepiešķirtie ieplānotie remonta darbi (assigned_to IS NULL) tiek izsniegti
+ar SELECT ... FOR UPDATE SKIP LOCKED: vienlaicīgi pieprasījumi izlaiž jau
+bloķētās rindas, tāpēc tehniķi negaida cits uz citu un viens darbs netiek
+piešķirts diviem.
+"""
+from django.db import transaction
+
+from .models import OPEN_MAINTENANCE_STATUSES, Issue, Maintenance
+
+# Darbi, kas parādās tehniķa sarakstā
+ACTIVE_JOB_STATUSES = OPEN_MAINTENANCE_STATUSES
+
+
+def job_queue(company):
+    """
+    Nepiešķirtie darbi prioritātes un vecuma secībā.
+
+    Secība sakrīt ar daļējo indeksu maintenance_queue_idx
+    (company, priority_rank, created_at), tāpēc nākamā darba izvēlei
+    nav jākārto visa rinda.
+    """
+    return Maintenance.objects.filter(
+        company=company, status='scheduled', assigned_to__isnull=True
+    ).order_by('priority_rank', 'created_at')
+
+
+def claim_next_job(company, technician):
+    """Piešķir tehniķim nākamo darbu no rindas; None, ja rinda ir tukša"""
+    with transaction.atomic():
+        job = job_queue(company).select_for_update(skip_locked=True, of=('self',)).first()
+        if job is None:
+            return None
+        job.assigned_to = technician
+        job.save(update_fields=['assigned_to', 'updated_at'])
+        Issue.objects.filter(pk=job.issue_id, status='reported').update(status='assigned')
+    return job
+
+
+def technician_jobs(company, technician):
+    """Tehniķa aktīvie darbi (indekss assigned_to, status, scheduled_date)"""
+    return Maintenance.objects.filter(
+        company=company, assigned_to=technician, status__in=ACTIVE_JOB_STATUSES
+    ).select_related('issue__unit__property').order_by('scheduled_date')
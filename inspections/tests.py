@@ -1,3 +1,178 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from companies.models import CompanyMember
+from core.factories import add_member, create_company, seed_portfolio
+from core.testing import QueryBudgetTestCase
+
+from reports.models import IssueDailyStats
+
+from .forms import MaintenanceAssignForm
+from .models import Issue, Maintenance
+from .queue import job_queue
+from .transitions import resolve_issues
+
+
+class MaintenanceAssignTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=20, months=1, occupancy=1,
+                       issues_per_property=1, seed=6)
+        cls.manager = add_member(cls.company)
+        cls.technician = add_member(cls.company, role=CompanyMember.Roles.TECHNICIAN)
+        cls.member = add_member(cls.company, role=CompanyMember.Roles.MEMBER)
+        cls.outsider = add_member(create_company(), role=CompanyMember.Roles.TECHNICIAN)
+        cls.issue = Issue.objects.filter(company=cls.company).first()
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def test_only_company_technicians_and_managers_are_assignable(self):
+        form = MaintenanceAssignForm(company=self.company)
+        self.assertQuerySetEqual(form.fields['assigned_to'].queryset, [self.manager, self.technician],
+                                 ordered=False)
+        self.assertFalse(MaintenanceAssignForm().fields['assigned_to'].queryset.exists())
+
+    def test_form_page_does_not_list_users(self):
+        url = reverse('inspections:assign_maintenance', args=[self.company.slug, self.issue.id])
+        response = self.get_within_budget(self.client, url, 12)
+        self.assertNotContains(response, self.member.email)
+
+        response = self.client.get(reverse('search:autocomplete', args=[self.company.slug, 'assignees']),
+                                   {'q': self.technician.last_name})
+        self.assertEqual([r['id'] for r in response.json()['results']], [str(self.technician.id)])
+
+    def test_assign_rejects_users_outside_scope(self):
+        url = reverse('inspections:assign_maintenance', args=[self.company.slug, self.issue.id])
+        data = {'scheduled_date': '2026-01-10T10:00', 'description': 'Nomainīt blīvi', 'cost': '20'}
+        for user in (self.member, self.outsider):
+            response = self.client.post(url, {**data, 'assigned_to': user.id})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('assigned_to', response.context['form'].errors)
+
+        response = self.client.post(url, {**data, 'assigned_to': self.technician.id})
+        self.assertRedirects(response, reverse('inspections:issue_detail', args=[self.company.slug, self.issue.id]))
+        self.assertTrue(Maintenance.objects.filter(issue=self.issue, assigned_to=self.technician).exists())
+
+
+class TechnicianQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=5, months=1, occupancy=1,
+                       issues_per_property=3, seed=7)
+        cls.technician = add_member(cls.company, role=CompanyMember.Roles.TECHNICIAN)
+        cls.member = add_member(cls.company, role=CompanyMember.Roles.MEMBER)
+        issues = list(Issue.objects.filter(company=cls.company).order_by('created_at')[:3])
+        for issue, priority in zip(issues, ['low', 'critical', 'medium']):
+            issue.priority, issue.status = priority, 'reported'
+            issue.save(update_fields=['priority', 'status'])
+        cls.jobs = {
+            priority: Maintenance.objects.create(company=cls.company, issue=issue, status='scheduled',
+                                                 scheduled_date=timezone.now(), description=priority)
+            for issue, priority in zip(issues, ['low', 'critical', 'medium'])
+        }
+
+    def setUp(self):
+        self.client.force_login(self.technician)
+
+    def claim(self):
+        response = self.client.post(reverse('inspections:claim_job', args=[self.company.slug]) + '?format=json')
+        return response.status_code, response.json().get('job')
+
+    def test_jobs_are_claimed_by_priority_once(self):
+        claimed = [self.claim()[1]['description'] for _ in range(3)]
+        self.assertEqual(claimed, ['critical', 'medium', 'low'])
+        self.assertEqual(self.claim(), (200, None))
+        self.assertEqual(Maintenance.objects.filter(assigned_to=self.technician).count(), 3)
+        self.assertEqual(Issue.objects.get(pk=self.jobs['critical'].issue_id).status, 'assigned')
+
+    def test_priority_change_reorders_queue(self):
+        issue = Issue.objects.get(pk=self.jobs['low'].issue_id)
+        issue.priority = 'critical'
+        issue.save()
+        self.assertEqual(list(job_queue(self.company).values_list('description', flat=True)),
+                         ['low', 'critical', 'medium'])
+
+    def test_my_jobs_and_status_updates(self):
+        self.claim()
+        job = self.jobs['critical']
+        url = reverse('inspections:technician_job_list', args=[self.company.slug])
+        data = self.client.get(url, {'format': 'json'}).json()
+        self.assertEqual((data['queue_count'], [j['id'] for j in data['jobs']]), (2, [str(job.id)]))
+
+        self.client.post(reverse('inspections:update_job_status', args=[self.company.slug, job.id]),
+                         {'status': 'completed'})
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(self.client.get(url, {'format': 'json'}).json()['jobs'], [])
+
+    def test_other_roles_cannot_claim(self):
+        self.client.force_login(self.member)
+        status, _ = self.claim()
+        self.assertEqual(status, 403)
+        self.assertFalse(Maintenance.objects.filter(assigned_to__isnull=False, description='critical').exists())
+
+
+class BulkIssueStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=5, months=1, occupancy=1,
+                       issues_per_property=3, seed=9)
+        cls.manager = add_member(cls.company)
+        cls.issues = list(Issue.objects.filter(company=cls.company).order_by('created_at'))
+        Issue.objects.filter(company=cls.company).update(status='assigned', priority='high')
+        Maintenance.objects.filter(company=cls.company).delete()
+        for issue in cls.issues:
+            for status in ['scheduled', 'in_progress', 'cancelled']:
+                Maintenance.objects.create(company=cls.company, issue=issue, status=status, cost=10,
+                                           scheduled_date=timezone.now(), description=status)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def test_selected_issues_and_open_maintenance_updated_in_two_statements(self):
+        selected = [issue.id for issue in self.issues[:2]]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(resolve_issues(self.company, selected, 'resolved', self.manager), 2)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "inspections_')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(Issue.objects.filter(id__in=selected, status='resolved', resolved_by=self.manager).count(), 2)
+        self.assertEqual(self.issues[2].maintenance_records.filter(status='completed').count(), 0)
+        self.assertEqual(
+            sorted(Maintenance.objects.filter(issue_id__in=selected).values_list('description', 'status')),
+            [('cancelled', 'cancelled')] * 2 + [('in_progress', 'completed')] * 2 + [('scheduled', 'completed')] * 2,
+        )
+
+        stats = IssueDailyStats.objects.get(company=self.company, date=timezone.localdate(), priority='high')
+        self.assertEqual((stats.resolved, stats.maintenance_cost), (2, 40))
+
+    def test_bulk_action_keeps_filters(self):
+        url = reverse('inspections:bulk_update_issue_status', args=[self.company.slug])
+        response = self.client.post(url, {'issues': [self.issues[0].id], 'status': 'closed', 'query': 'priority=high'})
+        self.assertRedirects(response, reverse('inspections:company_issues', args=[self.company.slug])
+                             + '?priority=high')
+        self.assertEqual(Issue.objects.get(pk=self.issues[0].pk).status, 'closed')
+
+    def test_closing_keeps_resolution_and_skips_closed(self):
+        issue = self.issues[0]
+        url = reverse('inspections:update_issue_status', args=[self.company.slug, issue.id])
+        self.client.post(url, {'status': 'resolved'})
+        resolved_date = Issue.objects.get(pk=issue.pk).resolved_date
+
+        bulk_url = reverse('inspections:bulk_update_issue_status', args=[self.company.slug])
+        self.client.post(bulk_url, {'issues': [issue.id], 'status': 'closed'})
+        self.client.post(bulk_url, {'issues': [issue.id], 'status': 'resolved'})
+        issue.refresh_from_db()
+        self.assertEqual((issue.status, issue.resolved_date), ('closed', resolved_date))
+        self.assertEqual(IssueDailyStats.objects.get(company=self.company, priority='high',
+                                                     date=timezone.localdate()).resolved, 1)
+
+        response = self.client.post(bulk_url, {'issues': ['nav-uuid'], 'status': 'closed'})
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,67 @@
+"""
+Problēmu statusa pārejas.
+
+Atlasītās problēmas un visi to nepabeigtie remontdarbi tiek atjaunināti ar
+diviem UPDATE vaicājumiem vienā transakcijā - neatkarīgi no problēmu skaita.
+Izmaiņas tiek pieskaitītas arī SLA dienas kopsavilkumam (reports.sla).
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from reports.sla import record_issues_resolved, record_maintenance_completed
+from .models import OPEN_MAINTENANCE_STATUSES, RESOLVED_STATUSES, Issue, Maintenance
+
+# Mērķa statuss -> statusi, no kuriem pāreja ir atļauta
+ISSUE_TRANSITIONS = {
+    'resolved': ['reported', 'assigned', 'in_progress'],
+    'closed': ['reported', 'assigned', 'in_progress', 'resolved'],
+}
+
+
+def resolve_issues(company, issue_ids, status, user):
+    """
+    Atzīmē problēmas kā atrisinātas vai slēgtas un pabeidz to atvērtos remontdarbus.
+
+    Problēmas, kuras jau ir mērķa statusā (vai slēgtas), tiek izlaistas.
+    Jau atrisinātām problēmām slēdzot saglabājas sākotnējais atrisināšanas
+    laiks un izpildītājs. Atgriež mainīto problēmu skaitu.
+    """
+    if status not in ISSUE_TRANSITIONS:
+        raise ValueError(f"Nederīgs statuss: {status}")
+
+    now = timezone.now()
+    with transaction.atomic():
+        issues = list(Issue.objects.select_for_update(of=('self',)).select_related('unit').filter(
+            company=company, pk__in=issue_ids, status__in=ISSUE_TRANSITIONS[status],
+        ).only('id', 'company', 'priority', 'status', 'created_at', 'resolved_date', 'unit__property'))
+        if not issues:
+            return 0
+        ids = [issue.pk for issue in issues]
+        maintenance = list(Maintenance.objects.select_for_update(of=('self',)).filter(
+            issue_id__in=ids, status__in=OPEN_MAINTENANCE_STATUSES, cost__isnull=False,
+        ).only('id', 'issue_id', 'cost'))
+
+        Issue.objects.filter(pk__in=ids).update(
+            status=status,
+            resolved_date=Case(When(status__in=RESOLVED_STATUSES, then=F('resolved_date')), default=Value(now)),
+            resolved_by=Case(When(status__in=RESOLVED_STATUSES, then=F('resolved_by')), default=Value(user.pk)),
+            updated_at=now,
+        )
+        Maintenance.objects.filter(issue_id__in=ids, status__in=OPEN_MAINTENANCE_STATUSES).update(
+            status='completed', completed_date=now, updated_at=now,
+        )
+
+        newly_resolved = [issue for issue in issues if issue.status not in RESOLVED_STATUSES]
+        # Atkārtoti atvērtai problēmai saglabājies iepriekšējais atrisināšanas laiks
+        previous = {issue.pk: issue.resolved_date for issue in newly_resolved if issue.resolved_date}
+        for issue in newly_resolved:
+            issue.resolved_date = now
+        record_issues_resolved(newly_resolved, previous)
+
+        issues_by_id = {issue.pk: issue for issue in issues}
+        for record in maintenance:
+            record.issue = issues_by_id[record.issue_id]
+            record.completed_date = now
+        record_maintenance_completed(maintenance)
+    return len(issues)
@@ -4,7 +4,11 @@ from . import views
 app_name = 'inspections'
 urlpatterns = [
     path('issues/', views.company_issues, name='company_issues'),
+    path('issues/bulk-status/', views.bulk_update_issue_status, name='bulk_update_issue_status'),
     path('issues/<uuid:pk>/', views.issue_detail, name='issue_detail'),
     path('issues/<uuid:pk>/update-status/', views.update_issue_status, name='update_issue_status'),
     path('issues/<uuid:pk>/assign-maintenance/', views.assign_maintenance, name='assign_maintenance'),
+    path('jobs/', views.technician_job_list, name='technician_job_list'),
+    path('jobs/claim/', views.claim_job, name='claim_job'),
+    path('jobs/<uuid:pk>/status/', views.update_job_status, name='update_job_status'),
 ]
\ No newline at end of file
@@ -1,12 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.utils import timezone
 from django.core.paginator import Paginator
-from .models import Issue
+from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+from .models import Issue, Maintenance, MAINTENANCE_ASSIGNEE_ROLES
+from .queue import ACTIVE_JOB_STATUSES, claim_next_job, job_queue, technician_jobs
+from .transitions import ISSUE_TRANSITIONS, resolve_issues
 from properties.models import Unit, Property
 from .forms import MaintenanceAssignForm
 from core.decorators import tenant_required
+from search.autocomplete import selected_choice
+from reports.sla import record_maintenance_completed
 
 @login_required
 @tenant_required
@@ -28,24 +37,17 @@ def company_issues(request, company_slug):
         'reported_by',
     ).order_by('-created_at')
     
-    # Get properties for filter - IZMAINĪTĀ RINDA
-    properties = Property.objects.filter(company=company)
-    
     # Apply filters
     property_id = request.GET.get('property')
+    unit_id = request.GET.get('unit')
     status = request.GET.get('status')
     priority = request.GET.get('priority')
     issue_type = request.GET.get('type')
     
     if property_id:
         issues = issues.filter(unit__property_id=property_id)
-        # Get units for selected property
-        units = Unit.objects.filter(property_id=property_id, company=company)
-        unit_id = request.GET.get('unit')
-        if unit_id:
-            issues = issues.filter(unit_id=unit_id)
-    else:
-        units = None
+    if unit_id:
+        issues = issues.filter(unit_id=unit_id)
         
     if status:
         issues = issues.filter(status=status)
@@ -59,14 +61,21 @@ def company_issues(request, company_slug):
     page = request.GET.get('page')
     issues = paginator.get_page(page)
     
+    # Filtros tiek ielādēti tikai izvēlētie ieraksti; pārējos piedāvā autocomplete
+    property_choice = selected_choice(Property.objects.filter(company=company), property_id, lambda p: p.address)
+    unit_choice = selected_choice(
+        Unit.objects.filter(company=company).select_related('property'), unit_id,
+        lambda u: u.unit_number if property_choice else f"{u.property.address} - {u.unit_number}"
+    )
+    
     return render(request, 'inspections/company_issues.html', {
         'issues': issues,
         'company': company,
-        'properties': properties,
-        'units': units,
+        'property_choice': property_choice,
+        'unit_choice': unit_choice,
         'filters': {
             'property_id': property_id,
-            'unit_id': unit_id if 'unit_id' in locals() else None,
+            'unit_id': unit_id,
             'status': status,
             'priority': priority,
             'type': issue_type
@@ -119,23 +128,51 @@ def update_issue_status(request, company_slug, pk):
             # Pāradresējam uz maintenance assign formu
             return redirect('inspections:assign_maintenance', company_slug=company_slug, pk=pk)
             
-        elif new_status in ['resolved', 'closed']:
-            issue.status = new_status
-            issue.resolved_by = request.user
-            issue.resolved_date = timezone.now()
-            issue.save()
-            
-            # Ja ir saistīts maintenance ieraksts, atjauninām arī to
-            maintenance = issue.maintenance_records.first()
-            if maintenance:
-                maintenance.status = 'completed'
-                maintenance.completed_date = timezone.now()
-                maintenance.save()
+        elif new_status in ISSUE_TRANSITIONS:
+            resolve_issues(company, [issue.pk], new_status, request.user)
+            issue.refresh_from_db(fields=['status'])
             
             messages.success(request, f'Problēma atzīmēta kā {issue.get_status_display()}')
             
     return redirect('inspections:issue_detail', company_slug=company_slug, pk=pk)
 
+@login_required
+@tenant_required
+@require_POST
+def bulk_update_issue_status(request, company_slug):
+    """Atzīmē vairākas atlasītās problēmas kā atrisinātas vai slēgtas"""
+    company = request.tenant
+    
+    # Pārbaudam vai lietotājam ir tiesības
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību mainīt problēmas statusu.")
+        return redirect('companies_tenant:company_detail', company_slug=company_slug)
+    
+    # Atgriežamies uz sarakstu ar tiem pašiem filtriem
+    list_url = reverse('inspections:company_issues', args=[company_slug])
+    query = request.POST.get('query')
+    if query:
+        list_url = f"{list_url}?{query}"
+    
+    new_status = request.POST.get('status')
+    issue_ids = request.POST.getlist('issues')
+    if new_status not in ISSUE_TRANSITIONS or not issue_ids:
+        messages.error(request, "Izvēlieties problēmas un jauno statusu.")
+        return redirect(list_url)
+    
+    try:
+        count = resolve_issues(company, issue_ids, new_status, request.user)
+    except ValidationError:
+        messages.error(request, "Nederīga problēmu izvēle.")
+        return redirect(list_url)
+    
+    skipped = len(set(issue_ids)) - count
+    messages.success(request, f"Statuss mainīts {count} problēmām.")
+    if skipped:
+        messages.info(request, f"{skipped} problēmas jau bija šajā statusā vai netika atrastas.")
+    return redirect(list_url)
+
 @login_required
 @tenant_required
 def assign_maintenance(request, company_slug, pk):
@@ -158,11 +195,14 @@ def assign_maintenance(request, company_slug, pk):
             maintenance.status = 'scheduled'
             maintenance.save()
             
-            # Atjauninām issue statusu
-            issue.status = 'assigned'
-            issue.save()
-            
-            messages.success(request, 'Remonta uzdevums veiksmīgi piešķirts.')
+            if maintenance.assigned_to:
+                # Atjauninām issue statusu
+                issue.status = 'assigned'
+                issue.save()
+                messages.success(request, 'Remonta uzdevums veiksmīgi piešķirts.')
+            else:
+                # Darbu paņems pirmais brīvais tehniķis
+                messages.success(request, 'Remonta uzdevums pievienots tehniķu rindai.')
             return redirect('inspections:issue_detail', company_slug=company_slug, pk=pk)
     else:
         # Priekšaizpildām description ar issue info
@@ -175,4 +215,99 @@ def assign_maintenance(request, company_slug, pk):
         'issue': issue,
         'company': company,
         'active_page': 'issues'
-    })
\ No newline at end of file
+    })
+
+
+def _job_as_dict(job):
+    return {
+        'id': str(job.id),
+        'issue_id': str(job.issue_id),
+        'address': f"{job.issue.unit.property.address} - {job.issue.unit.unit_number}",
+        'priority': job.issue.priority,
+        'status': job.status,
+        'scheduled_date': job.scheduled_date.isoformat(),
+        'description': job.description,
+    }
+
+
+@login_required
+@tenant_required
+def technician_job_list(request, company_slug):
+    """Tehniķa aktīvie remonta darbi; ar ?format=json atgriež JSON"""
+    company = request.tenant
+
+    if request.company_role not in MAINTENANCE_ASSIGNEE_ROLES:
+        messages.error(request, "Darbu rinda ir pieejama tikai tehniķiem un menedžeriem.")
+        return redirect('companies_tenant:company_detail', company_slug=company_slug)
+
+    jobs = technician_jobs(company, request.user)
+    queue_count = job_queue(company).count()
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'queue_count': queue_count,
+            'jobs': [_job_as_dict(job) for job in jobs],
+        })
+
+    return render(request, 'inspections/technician_jobs.html', {
+        'company': company,
+        'jobs': jobs,
+        'queue_count': queue_count,
+        'active_page': 'jobs',
+    })
+
+
+@login_required
+@tenant_required
+@require_POST
+def claim_job(request, company_slug):
+    """Paņem nākamo darbu no rindas; ar ?format=json atgriež JSON"""
+    company = request.tenant
+    wants_json = request.GET.get('format') == 'json'
+
+    if request.company_role not in MAINTENANCE_ASSIGNEE_ROLES:
+        if wants_json:
+            return JsonResponse({'error': 'Nav tiesību'}, status=403)
+        messages.error(request, "Darbu rinda ir pieejama tikai tehniķiem un menedžeriem.")
+        return redirect('companies_tenant:company_detail', company_slug=company_slug)
+
+    job = claim_next_job(company, request.user)
+
+    if wants_json:
+        if job is None:
+            return JsonResponse({'job': None})
+        job = Maintenance.objects.select_related('issue__unit__property').get(pk=job.pk)
+        return JsonResponse({'job': _job_as_dict(job)})
+
+    if job is None:
+        messages.info(request, "Rindā nav neviena darba.")
+    else:
+        messages.success(request, "Jums piešķirts nākamais darbs.")
+    return redirect('inspections:technician_job_list', company_slug=company_slug)
+
+
+@login_required
+@tenant_required
+@require_POST
+def update_job_status(request, company_slug, pk):
+    """Tehniķis atzīmē savu darbu kā uzsāktu vai pabeigtu"""
+    company = request.tenant
+    job = get_object_or_404(Maintenance.objects.select_related('issue__unit'), id=pk, company=company,
+                            assigned_to=request.user, status__in=ACTIVE_JOB_STATUSES)
+
+    new_status = request.POST.get('status')
+    if new_status == 'in_progress':
+        job.status = new_status
+        job.save(update_fields=['status', 'updated_at'])
+        messages.success(request, "Darbs atzīmēts kā uzsākts.")
+    elif new_status == 'completed':
+        with transaction.atomic():
+            job.status = new_status
+            job.completed_date = timezone.now()
+            job.save(update_fields=['status', 'completed_date', 'updated_at'])
+            record_maintenance_completed([job])
+        messages.success(request, "Darbs atzīmēts kā pabeigts.")
+    else:
+        messages.error(request, "Nederīgs statuss.")
+
+    return redirect('inspections:technician_job_list', company_slug=company_slug)
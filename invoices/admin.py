@@ -1,3 +1,48 @@
 from django.contrib import admin
+from core.admin import TenantModelAdmin
+from search.admin import SearchVectorAdminMixin
+from .models import Tax, Invoice, InvoiceItem
 
-# Register your models here.
+
+@admin.register(Tax)
+class TaxAdmin(TenantModelAdmin):
+    list_display = ('name', 'code', 'rate', 'category', 'company', 'is_default')
+    list_select_related = ('company',)
+    list_filter = ('category', 'is_default')
+    search_fields = ('name', 'code')
+
+
+class InvoiceItemInline(admin.TabularInline):
+    model = InvoiceItem
+    fields = ('description', 'type', 'quantity', 'unit_price', 'tax', 'tax_amount', 'amount')
+    autocomplete_fields = ('tax',)
+    extra = 0
+
+
+@admin.register(Invoice)
+class InvoiceAdmin(SearchVectorAdminMixin, TenantModelAdmin):
+    list_display = ('number', 'lease', 'issue_date', 'due_date', 'total_amount', 'status')
+    list_select_related = ('lease__unit__property', 'lease__tenant')
+    list_filter = ('status', 'is_sent')
+    search_fields = ('number', 'lease__tenant__email', 'lease__tenant__last_name')
+    autocomplete_fields = ('company', 'lease')
+    readonly_fields = TenantModelAdmin.readonly_fields + ('pdf_hash',)
+    date_hierarchy = 'issue_date'
+    inlines = [InvoiceItemInline]
+
+    def save_formset(self, request, form, formset, change):
+        # Pozīcijām company tiek ņemts no rēķina
+        for instance in formset.save(commit=False):
+            instance.company_id = form.instance.company_id
+            instance.save()
+        for obj in formset.deleted_objects:
+            obj.delete()
+
+
+@admin.register(InvoiceItem)
+class InvoiceItemAdmin(TenantModelAdmin):
+    list_display = ('description', 'invoice', 'type', 'amount', 'tax')
+    list_select_related = ('invoice__lease__unit__property', 'invoice__lease__tenant', 'tax')
+    list_filter = ('type',)
+    search_fields = ('invoice__number__exact',)
+    autocomplete_fields = ('company', 'invoice', 'tax')
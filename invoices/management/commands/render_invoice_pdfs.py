@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def _init_worker():
+    """
+    Sagatavo darba procesu vienreiz pirms pirmā uzdevuma.
+
+    Django tiek inicializēts, PDF šablons nokompilēts un fonts reģistrēts,
+    lai katrs rēķins netērētu laiku šo darbību atkārtošanai.
+    """
+    import django
+    django.setup()
+
+    from django.template.loader import get_template
+    from invoices.pdf import PDF_TEMPLATE, _register_fonts
+
+    get_template(PDF_TEMPLATE)
+    _register_fonts()
+
+
+def _render_batch(invoice_ids, force):
+    """Renderē rēķinu grupu darba procesā un atgriež rezultātus"""
+    from django.db.models import Prefetch
+    from invoices.models import Invoice, InvoiceItem
+    from invoices.pdf import get_invoice_pdf, invoice_content_hash
+
+    invoices = Invoice.objects.filter(id__in=invoice_ids).select_related(
+        'company', 'lease__tenant', 'lease__unit__property'
+    ).prefetch_related(
+        Prefetch('items', queryset=InvoiceItem.objects.order_by('created_at'))
+    )
+
+    results = []
+    for invoice in invoices:
+        items = list(invoice.items.all())
+        try:
+            if not force and invoice.pdf_file and invoice.pdf_hash == invoice_content_hash(invoice, items):
+                results.append((invoice.number, 'cached', None))
+                continue
+            if force:
+                invoice.pdf_hash = ''
+            get_invoice_pdf(invoice, items)
+            results.append((invoice.number, 'rendered', None))
+        except Exception as e:
+            results.append((invoice.number, 'error', str(e)))
+
+    connections.close_all()
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Ģenerē uzņēmuma rēķinu PDF failus vairākos procesos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('company', help='Uzņēmuma slug')
+        parser.add_argument('--period', help='Rēķinu periods formātā YYYY-MM')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Darba procesu skaits (noklusējums: CPU kodolu skaits)')
+        parser.add_argument('--batch-size', type=int, default=20,
+                            help='Rēķinu skaits vienā uzdevumā')
+        parser.add_argument('--force', action='store_true',
+                            help='Pārģenerēt arī tos PDF, kuri jau ir aktuāli')
+
+    def handle(self, *args, **options):
+        from companies.models import Company
+        from invoices.models import Invoice
+
+        try:
+            company = Company.objects.get(slug=options['company'])
+        except Company.DoesNotExist:
+            raise CommandError(f"Uzņēmums '{options['company']}' nav atrasts")
+
+        invoices = Invoice.objects.filter(company=company)
+        if options['period']:
+            try:
+                period = datetime.strptime(options['period'], '%Y-%m')
+            except ValueError:
+                raise CommandError("Periodam jābūt formātā YYYY-MM")
+            invoices = invoices.filter(period_start__year=period.year, period_start__month=period.month)
+
+        invoice_ids = list(invoices.order_by('number').values_list('id', flat=True))
+        total = len(invoice_ids)
+        if not total:
+            self.stdout.write("Nav rēķinu, ko ģenerēt")
+            return
+
+        batch_size = max(options['batch_size'], 1)
+        batches = [invoice_ids[i:i + batch_size] for i in range(0, total, batch_size)]
+        workers = max(1, min(options['workers'], len(batches)))
+
+        self.stdout.write(f"{company.name}: {total} rēķini, {workers} procesi")
+
+        # Darba procesi neizmanto vecāka DB savienojumus
+        connections.close_all()
+
+        counts = {'rendered': 0, 'cached': 0, 'error': 0}
+        done = 0
+        started = time.monotonic()
+
+        # spawn, jo boto3 klienti un DB savienojumi nav droši pēc fork
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+            futures = [executor.submit(_render_batch, batch, options['force']) for batch in batches]
+            for future in as_completed(futures):
+                results = future.result()
+                for number, status, error in results:
+                    counts[status] += 1
+                    if error:
+                        self.stderr.write(f"Rēķins {number}: {error}")
+                done += len(results)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"[{done}/{total}] {done / elapsed:.1f} rēķini/s")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Gatavs {elapsed:.1f}s: ģenerēti {counts['rendered']}, "
+            f"aktuāli {counts['cached']}, kļūdas {counts['error']}"
+        ))
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:07
+
+import core.storage
+import invoices.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0003_invoice_subtotal_amount_invoice_tax_amount_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='pdf_file',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=core.storage.InvoicePdfStorage(), upload_to=invoices.models.get_invoice_pdf_upload_path),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='pdf_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
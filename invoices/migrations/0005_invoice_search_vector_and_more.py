@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('invoices', '0004_invoice_pdf_file_invoice_pdf_hash'),
+        ('leases', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='invoice_search_vector_gin'),
+        ),
+    ]
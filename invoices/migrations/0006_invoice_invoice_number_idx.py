@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('invoices', '0005_invoice_search_vector_and_more'),
+        ('leases', '0002_lease_search_vector_lease_lease_search_vector_gin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['number'], name='invoice_number_idx'),
+        ),
+    ]
@@ -1,9 +1,22 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from core.models import TenantModel
+from core.querysets import LabelQuerySet
+from core.storage import InvoicePdfStorage
 from django.utils import timezone
 from leases.models import Lease
 from decimal import Decimal
 
+
+def get_invoice_pdf_upload_path(instance, filename):
+    return f'company/{instance.company_id}/invoices/{instance.id}/{filename}'
+
+
+class InvoiceQuerySet(LabelQuerySet):
+    label_relations = ('lease__unit__property', 'lease__tenant')
+
+
 class Tax(TenantModel):
     """Nodokļu definīcijas, ko var pielietot rēķinu pozīcijām"""
     name = models.CharField(max_length=100)  # Piem., "PVN", "Elektroenerģijas nodoklis"
@@ -52,6 +65,19 @@ class Invoice(TenantModel):
     sent_date = models.DateTimeField(null=True, blank=True)
     paid_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)  # Piezīmes rēķinam
+    # Kešotais PDF - faila nosaukums un pdf_hash ir rēķina satura hash
+    pdf_file = models.FileField(upload_to=get_invoice_pdf_upload_path, storage=InvoicePdfStorage(), max_length=255, blank=True, null=True)
+    pdf_hash = models.CharField(max_length=64, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = InvoiceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='invoice_search_vector_gin'),
+            # Rēķina meklēšana pēc precīza numura (admin pozīcijas)
+            models.Index(fields=['number'], name='invoice_number_idx'),
+        ]
     
     def __str__(self):
         return f"Rēķins Nr.{self.number} ({self.lease})"
@@ -0,0 +1,186 @@
+import base64
+import functools
+import hashlib
+import io
+import json
+import logging
+import mimetypes
+import os
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+PDF_TEMPLATE = 'invoices/invoice_pdf.html'
+# Jāpalielina, mainot PDF šablonu, lai vecie kešotie faili tiktu pārģenerēti
+PDF_LAYOUT_VERSION = 1
+PDF_FONT_FAMILY = 'InvoiceFont'
+
+
+class InvoicePdfError(Exception):
+    """PDF ģenerēšanas kļūda"""
+
+
+def invoice_pdf_filename(invoice):
+    return f"Rekins_{invoice.number}.pdf"
+
+
+def invoice_content_hash(invoice, items):
+    """
+    Aprēķina rēķina satura hash no visiem PDF redzamajiem datiem.
+
+    Mainoties pozīcijām, statusam, summām vai uzņēmuma/īrnieka datiem,
+    mainās arī hash, tāpēc vecais kešotais PDF vairs netiek izmantots.
+    """
+    company = invoice.company
+    lease = invoice.lease
+    tenant = lease.tenant
+    payload = {
+        'layout': PDF_LAYOUT_VERSION,
+        'invoice': [
+            invoice.number, invoice.status, invoice.issue_date, invoice.due_date,
+            invoice.period_start, invoice.period_end, invoice.subtotal_amount,
+            invoice.tax_amount, invoice.total_amount, invoice.notes,
+        ],
+        'items': [
+            [item.id, item.description, item.quantity, item.unit_price, item.amount, item.tax_amount]
+            for item in items
+        ],
+        'company': [company.id, company.updated_at],
+        'unit': [lease.unit.property.address, lease.unit.unit_number],
+        'tenant': [tenant.id, tenant.updated] if tenant else None,
+    }
+    data = json.dumps(payload, default=str, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _logo_data_uri(company):
+    """Logo kā data URI, lai PDF renderētājam nav jāveic HTTP pieprasījums"""
+    if not company.logo:
+        return None
+    try:
+        with company.logo.open('rb') as logo:
+            content = logo.read()
+    except Exception as e:
+        logger.warning("Invoice PDF: neizdevās nolasīt logo %s: %s", company.logo.name, e)
+        return None
+    mime_type = mimetypes.guess_type(company.logo.name)[0] or 'image/png'
+    return f"data:{mime_type};base64,{base64.b64encode(content).decode('ascii')}"
+
+
+@functools.lru_cache(maxsize=None)
+def _register_fonts():
+    """
+    Reģistrē TTF fontu ar latviešu burtiem reportlab un xhtml2pdf.
+
+    Atgriež fonta saimes nosaukumu vai None, ja fonts nav atrasts.
+    Tiek izsaukts vienreiz procesā.
+    """
+    from reportlab.lib.fonts import addMapping
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from xhtml2pdf import default
+
+    regular = settings.INVOICE_PDF_FONT
+    bold = settings.INVOICE_PDF_FONT_BOLD
+    if not regular or not os.path.exists(regular):
+        logger.warning("Invoice PDF: fonts %s nav atrasts, tiks izmantots Helvetica", regular)
+        return None
+    if not bold or not os.path.exists(bold):
+        bold = regular
+
+    pdfmetrics.registerFont(TTFont(PDF_FONT_FAMILY, regular))
+    pdfmetrics.registerFont(TTFont(f"{PDF_FONT_FAMILY}-Bold", bold))
+    addMapping(PDF_FONT_FAMILY, 0, 0, PDF_FONT_FAMILY)
+    addMapping(PDF_FONT_FAMILY, 0, 1, PDF_FONT_FAMILY)
+    addMapping(PDF_FONT_FAMILY, 1, 0, f"{PDF_FONT_FAMILY}-Bold")
+    addMapping(PDF_FONT_FAMILY, 1, 1, f"{PDF_FONT_FAMILY}-Bold")
+    default.DEFAULT_FONT[PDF_FONT_FAMILY.lower()] = PDF_FONT_FAMILY
+    return PDF_FONT_FAMILY
+
+
+def render_invoice_pdf(invoice, items):
+    """Renderē rēķina PDF un atgriež to kā bytes"""
+    from xhtml2pdf import pisa
+
+    html = get_template(PDF_TEMPLATE).render({
+        'invoice': invoice,
+        'items': items,
+        'company': invoice.company,
+        'logo_data_uri': _logo_data_uri(invoice.company),
+        'font_family': _register_fonts(),
+    })
+    result = io.BytesIO()
+    status = pisa.CreatePDF(html, dest=result, encoding='utf-8')
+    if status.err:
+        raise InvoicePdfError(f"Neizdevās izveidot PDF rēķinam {invoice.number}")
+    return result.getvalue()
+
+
+def _read_cached_pdf(invoice, content_hash):
+    """Kešotais PDF vai None, ja hash nesakrīt vai fails nav pieejams"""
+    if not invoice.pdf_file or invoice.pdf_hash != content_hash:
+        return None
+    try:
+        with invoice.pdf_file.open('rb') as cached:
+            return cached.read()
+    except Exception as e:
+        logger.warning("Invoice PDF: kešotais fails %s nav pieejams: %s", invoice.pdf_file.name, e)
+        return None
+
+
+def _store_pdf(invoice, content_hash, pdf):
+    """Saglabā PDF storage ar satura hash kā faila nosaukumu un dzēš veco failu"""
+    from .models import Invoice
+
+    old_name = invoice.pdf_file.name if invoice.pdf_file else None
+    invoice.pdf_file.save(f"{content_hash}.pdf", ContentFile(pdf), save=False)
+    invoice.pdf_hash = content_hash
+    # Neizmantojam save(), lai neatjauninātu updated_at un citus laukus
+    Invoice.objects.filter(pk=invoice.pk).update(pdf_file=invoice.pdf_file.name, pdf_hash=content_hash)
+
+    if old_name and old_name != invoice.pdf_file.name:
+        try:
+            invoice.pdf_file.storage.delete(old_name)
+        except Exception as e:
+            logger.warning("Invoice PDF: neizdevās dzēst veco failu %s: %s", old_name, e)
+
+
+def get_invoice_pdf(invoice, items=None):
+    """
+    Atgriež rēķina PDF no kešatmiņas vai renderē un saglabā jaunu.
+
+    PDF tiek glabāts storage ar satura hash kā faila nosaukumu. Ja hash
+    sakrīt ar saglabāto, tiek nolasīts esošais fails bez renderēšanas.
+    """
+    if items is None:
+        items = invoice.items.order_by('created_at')
+    items = list(items)
+    content_hash = invoice_content_hash(invoice, items)
+
+    pdf = _read_cached_pdf(invoice, content_hash)
+    if pdf is None:
+        pdf = render_invoice_pdf(invoice, items)
+        _store_pdf(invoice, content_hash, pdf)
+    return pdf
+
+
+async def aget_invoice_pdf(invoice, items=None):
+    """
+    get_invoice_pdf asinhronajiem skatiem.
+
+    Rēķinam jābūt ielādētam ar company, lease, lease__unit__property un
+    lease__tenant. Storage lasīšana un renderēšana notiek pavedienos.
+    """
+    if items is None:
+        items = [item async for item in invoice.items.order_by('created_at')]
+    content_hash = invoice_content_hash(invoice, items)
+
+    pdf = await sync_to_async(_read_cached_pdf, thread_sensitive=False)(invoice, content_hash)
+    if pdf is None:
+        pdf = await sync_to_async(render_invoice_pdf)(invoice, items)
+        await sync_to_async(_store_pdf)(invoice, content_hash, pdf)
+    return pdf
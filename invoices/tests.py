@@ -1,3 +1,105 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core import mail
+from django.core.files.storage import InMemoryStorage
 from django.test import TestCase
+from django.urls import reverse
+
+from core.factories import create_company, create_user, seed_portfolio
+from core.testing import QueryBudgetTestCase
+
+from . import pdf as invoice_pdf
+from .models import Invoice, InvoiceItem
+
+
+class InvoiceListQueryBudgetTests(QueryBudgetTestCase):
+    """Rēķinu saraksta vaicājumu skaits nedrīkst augt līdz ar datu apjomu"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=100, months=24, seed=1)
+        # Cita uzņēmuma dati nedrīkst ietekmēt rezultātu
+        seed_portfolio(create_company(), properties=1, units_per_property=20, months=6, seed=2)
+
+    def setUp(self):
+        self.client.force_login(self.company.owner)
+
+    def test_invoice_list(self):
+        url = reverse('invoices:invoice_list', args=[self.company.slug])
+        self.get_within_budget(self.client, url, 10)
+
+    def test_invoice_list_filtered(self):
+        url = reverse('invoices:invoice_list', args=[self.company.slug])
+        self.get_within_budget(self.client, f"{url}?status=overdue", 10)
+
+
+class InvoicePdfTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=1, months=1, meters_per_unit=0,
+                       occupancy=1, issues_per_property=0, seed=15)
+        cls.invoice = Invoice.objects.get(company=cls.company)
+        Invoice.objects.filter(pk=cls.invoice.pk).update(status='draft', is_sent=False, sent_date=None)
+        cls.tenant = cls.invoice.lease.tenant
+
+    def setUp(self):
+        # PDF faili tiek glabāti atmiņā, nevis S3
+        field = Invoice._meta.get_field('pdf_file')
+        original = field.storage
+        field.storage = InMemoryStorage()
+        self.addCleanup(setattr, field, 'storage', original)
+        self.render = mock.patch.object(invoice_pdf, 'render_invoice_pdf', wraps=invoice_pdf.render_invoice_pdf)
+        self.rendered = self.render.start()
+        self.addCleanup(self.render.stop)
+
+    def load(self):
+        return Invoice.objects.select_related(
+            'company', 'lease', 'lease__tenant', 'lease__unit', 'lease__unit__property'
+        ).get(pk=self.invoice.pk)
+
+    def test_pdf_is_cached_until_content_changes(self):
+        first = invoice_pdf.get_invoice_pdf(self.load())
+        self.assertEqual(invoice_pdf.get_invoice_pdf(self.load()), first)
+        self.assertEqual(self.rendered.call_count, 1)
+        old_name = self.load().pdf_file.name
+
+        invoice = self.load()
+        InvoiceItem.objects.create(company=self.company, invoice=invoice, description='Remontdarbi',
+                                   quantity=1, unit_price=Decimal('30.00'), amount=Decimal('30.00'))
+        invoice.update_total()
+        invoice_pdf.get_invoice_pdf(self.load())
+
+        self.assertEqual(self.rendered.call_count, 2)
+        invoice = self.load()
+        self.assertNotEqual(invoice.pdf_file.name, old_name)
+        self.assertEqual(invoice.pdf_hash, invoice_pdf.invoice_content_hash(invoice, invoice.items.order_by('created_at')))
+        self.assertFalse(invoice.pdf_file.storage.exists(old_name))
+
+    def test_sent_pdf_shows_sent_status(self):
+        self.client.force_login(self.company.owner)
+        self.client.post(reverse('invoices:invoice_send', args=[self.company.slug, self.invoice.id]))
+
+        invoice = self.load()
+        self.assertEqual(invoice.status, 'sent')
+        (attachment_name, attachment, _), = mail.outbox[0].attachments
+        # Pielikums ir renderēts jau ar nosūtīta rēķina statusu un ir kešotais PDF
+        self.assertEqual(invoice.pdf_hash, invoice_pdf.invoice_content_hash(invoice, invoice.items.order_by('created_at')))
+        with invoice.pdf_file.open('rb') as cached:
+            self.assertEqual(cached.read(), attachment)
+        self.assertEqual(self.rendered.call_count, 1)
+
+    def test_tenant_pdf_access(self):
+        url = reverse('tenant_portal:tenant_invoice_pdf', args=[self.invoice.id])
+        self.client.force_login(self.tenant)
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+        self.client.force_login(create_user('tenant'))
+        self.assertEqual(self.client.get(url).status_code, 404)
 
-# Create your tests here.
+        self.client.force_login(self.company.owner)
+        self.assertRedirects(self.client.get(url), reverse('users:home'), fetch_redirect_response=False)
@@ -1,4 +1,6 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.http import HttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
@@ -7,9 +9,12 @@ from django.conf import settings
 from core.decorators import tenant_required
 from .models import Invoice, InvoiceItem
 from .forms import InvoiceForm
+from .pdf import InvoicePdfError, get_invoice_pdf, invoice_pdf_filename
 from leases.models import Lease
 from inspections.models import Maintenance
-from properties.models import UnitMeter, MeterReading
+from properties.allocation import pending_allocations
+from properties.models import UnitMeter, UnitCostAllocation
+from properties.tariffs import meter_charges
 import datetime
 from decimal import Decimal
 from utils.utils import get_previous_month
@@ -125,46 +130,13 @@ def invoice_create(request, company_slug, lease_id):
         'unit_price': lease.rent_amount
     })
     
-    # 2. Komunālo pakalpojumu maksājumi - aprēķinām no skaitītāju rādījumiem
+    # 2. Komunālo pakalpojumu maksājumi - aprēķinām no skaitītāju rādījumiem;
+    # patēriņš tiek sadalīts pa uzņēmuma tarifu periodiem
     active_meters = UnitMeter.objects.filter(
         unit=lease.unit,
         status='active'
     )
-    
-    for meter in active_meters:
-        # Atrodam pēdējos divus rādījumus, lai aprēķinātu patēriņu
-        readings = MeterReading.objects.filter(
-            meter=meter
-        ).order_by('-reading_date')[:2]
-        
-        if len(readings) >= 2:
-            # Aprēķinam patēriņu (jaunākais rādījums - vecākais rādījums)
-            consumption = readings[0].reading - readings[1].reading
-            
-            # Izmantojam tarifu no mērītāja datu bāzes, ar noklusējuma vērtībām, ja tarifs nav iestatīts
-            tariff = meter.tariff
-            
-            # Ja tarifs nav iestatīts, izmantojam noklusējuma vērtības
-            if tariff == 0:
-                default_tariffs = {
-                    'water_cold': Decimal('1.20'),
-                    'water_hot': Decimal('4.50'),
-                    'gas': Decimal('0.65'),
-                    'electricity': Decimal('0.15'),
-                    'heating': Decimal('60.00')
-                }
-                tariff = default_tariffs.get(meter.meter_type, Decimal('0.00'))
-            
-            if consumption > 0:
-                amount = consumption * tariff
-                
-                meter_type_display = meter.get_meter_type_display()
-                
-                items_to_include.append({
-                    'description': f"{meter_type_display} patēriņš: {consumption} vienības ({readings[1].reading_date.strftime('%d.%m.%Y')} - {readings[0].reading_date.strftime('%d.%m.%Y')})",
-                    'quantity': consumption,
-                    'unit_price': tariff
-                })
+    items_to_include.extend(meter_charges(company.id, active_meters))
     
     # 3. Remontdarbi, kas veikti šajā mēnesī un ir par maksu
     maintenance_works = Maintenance.objects.filter(
@@ -182,6 +154,17 @@ def invoice_create(request, company_slug, lease_id):
             'unit_price': work.cost
         })
     
+    # 4. Ēkas skaitītāju izmaksu daļa, kas vēl nav iekļauta rēķinā
+    for allocation in pending_allocations(lease.unit, since=lease.start_date):
+        record = allocation.building_consumption
+        items_to_include.append({
+            'description': f"{record.get_meter_type_display()} (ēkas skaitītājs): {allocation.consumption} vienības ({record.period_start.strftime('%d.%m.%Y')} - {record.period_end.strftime('%d.%m.%Y')})",
+            'quantity': 1,
+            'unit_price': allocation.amount,
+            'type': 'utility',
+            'allocation_id': allocation.pk,
+        })
+    
     if request.method == 'POST':
         form = InvoiceForm(request.POST)
         
@@ -228,6 +211,23 @@ def invoice_create(request, company_slug, lease_id):
                         
                         invoice.number = f"{current_year}-{current_month:02d}-{month_invoice_count+1:04d}"
                         
+                        # Ēkas izmaksu daļa tiek iekļauta tikai vienā rēķinā: rindas tiek bloķētas līdz
+                        # transakcijas beigām, un citā rēķinā jau iekļautās daļas tiek izlaistas
+                        allocation_ids = [item['allocation_id'] for item in selected_items if item.get('allocation_id')]
+                        if allocation_ids:
+                            billed = dict(UnitCostAllocation.objects.select_for_update().filter(
+                                pk__in=allocation_ids
+                            ).values_list('pk', 'invoice_item_id'))
+                            pending = [item for item in selected_items
+                                       if billed.get(item.get('allocation_id')) is None]
+                            skipped = len(selected_items) - len(pending)
+                            if skipped:
+                                selected_items = pending
+                                if not selected_items:
+                                    messages.error(request, "Atlasītās ēkas izmaksas jau ir iekļautas citā rēķinā.")
+                                    return redirect('invoices:invoice_create', company_slug=company_slug, lease_id=lease.id)
+                                messages.warning(request, f"{skipped} ēkas izmaksu pozīcijas jau ir iekļautas citā rēķinā un netika pievienotas.")
+                        
                         # Aprēķinam kopējo summu
                         total_amount = Decimal('0.00')
                         
@@ -258,9 +258,15 @@ def invoice_create(request, company_slug, lease_id):
                                 description=item_data['description'],
                                 quantity=quantity,
                                 unit_price=unit_price,
-                                amount=amount
+                                amount=amount,
+                                type=item_data.get('type', 'standard')
                             )
                             item.save()
+                            
+                            if item_data.get('allocation_id'):
+                                UnitCostAllocation.objects.filter(
+                                    pk=item_data['allocation_id']
+                                ).update(invoice_item=item)
                         
                         messages.success(request, f"Rēķins Nr. {invoice.number} veiksmīgi izveidots.")
                         return redirect('invoices:invoice_detail', company_slug=company_slug, pk=invoice.id)
@@ -458,18 +464,19 @@ def invoice_edit(request, company_slug, pk):
 
 @login_required
 @tenant_required
-def invoice_send(request, company_slug, pk):
+async def invoice_send(request, company_slug, pk):
     """Nosūta rēķinu īrniekam uz e-pastu"""
     company = request.tenant
+    user = await request.auser()
     
     # Pārbaudam vai lietotājam ir tiesības
-    if not (request.user == company.owner or request.user.company_memberships.filter(
-            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+    if not (company.owner_id == user.pk or await user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).aexists()):
         messages.error(request, "Jums nav tiesību nosūtīt rēķinus.")
         return redirect('invoices:invoice_list', company_slug=company_slug)
     
-    invoice = get_object_or_404(Invoice.objects.select_related(
-        'lease', 'lease__tenant', 'lease__unit', 'lease__unit__property'
+    invoice = await aget_object_or_404(Invoice.objects.select_related(
+        'company', 'lease', 'lease__tenant', 'lease__unit', 'lease__unit__property'
     ), id=pk, company=company)
     
     # Pārbaudam vai rēķinu vēl var nosūtīt
@@ -486,16 +493,19 @@ def invoice_send(request, company_slug, pk):
     tenant = invoice.lease.tenant
     view_url = f"{settings.SITE_URL}/tenant/invoices/{invoice.id}/"
     
+    # Statuss tiek mainīts pirms PDF renderēšanas, lai pielikumā būtu nosūtīta rēķina statuss
+    previous = {'status': invoice.status, 'is_sent': invoice.is_sent, 'sent_date': invoice.sent_date}
+    await sync_to_async(invoice.send_to_tenant)()
+    
     try:
-        # Izmantojam jauno funkciju no utils
-        from utils.utils import send_invoice_email
-        send_invoice_email(invoice, tenant, company, view_url)
-        
-        # Atjauninam rēķina statusu
-        invoice.send_to_tenant()
+        # PDF renderēšana un SMTP sūtīšana notiek pavedienos, neaizturot ASGI workeri
+        from utils.utils import asend_invoice_email
+        await asend_invoice_email(invoice, tenant, company, view_url)
         
         messages.success(request, f"Rēķins Nr. {invoice.number} veiksmīgi nosūtīts uz {tenant.email}.")
     except Exception as e:
+        # E-pasts nav nosūtīts - atjaunojam iepriekšējo statusu
+        await Invoice.objects.filter(pk=invoice.pk).aupdate(**previous)
         messages.error(request, f"Kļūda sūtot e-pastu: {str(e)}")
     
     return redirect('invoices:invoice_detail', company_slug=company_slug, pk=pk)
@@ -560,7 +570,7 @@ def invoice_cancel(request, company_slug, pk):
 @login_required
 @tenant_required
 def invoice_print(request, company_slug, pk):
-    """Rēķina izdruka/PDF skats"""
+    """Rēķina PDF skats (kešots storage)"""
     company = request.tenant
     
     # Vispārējas atļaujas pārbaude
@@ -569,7 +579,7 @@ def invoice_print(request, company_slug, pk):
     
     # Meklējam rēķinu
     invoice = get_object_or_404(Invoice.objects.select_related(
-        'lease', 'lease__unit', 'lease__tenant', 'lease__unit__property'
+        'company', 'lease', 'lease__unit', 'lease__tenant', 'lease__unit__property'
     ), id=pk, company=company)
     
     # Papildu piekļuves pārbaude īrniekam
@@ -582,11 +592,12 @@ def invoice_print(request, company_slug, pk):
         else:
             return redirect('companies_tenant:company_detail', company_slug=company_slug)
     
-    # Iegūstam rēķina pozīcijas
-    items = invoice.items.all()
+    try:
+        pdf = get_invoice_pdf(invoice)
+    except InvoicePdfError as e:
+        messages.error(request, str(e))
+        return redirect('invoices:invoice_detail', company_slug=company_slug, pk=pk)
     
-    return render(request, 'invoices/invoice_print.html', {
-        'invoice': invoice,
-        'items': items,
-        'company': company
-    })
\ No newline at end of file
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="{invoice_pdf_filename(invoice)}"'
+    return response
\ No newline at end of file
@@ -1,3 +1,33 @@
 from django.contrib import admin
+from core.admin import TenantModelAdmin
+from search.admin import SearchVectorAdminMixin
+from .models import Lease, LeaseBilling, LeaseDocument
 
-# Register your models here.
+
+@admin.register(Lease)
+class LeaseAdmin(SearchVectorAdminMixin, TenantModelAdmin):
+    list_display = ('__str__', 'status', 'start_date', 'end_date', 'rent_amount')
+    list_select_related = ('unit__property', 'tenant')
+    list_filter = ('status',)
+    search_fields = ('tenant__email', 'tenant__last_name', 'unit__unit_number', 'unit__property__address')
+    autocomplete_fields = ('company', 'unit', 'tenant')
+    date_hierarchy = 'start_date'
+
+
+@admin.register(LeaseBilling)
+class LeaseBillingAdmin(TenantModelAdmin):
+    list_display = ('lease', 'period_start', 'period_end', 'total_amount', 'due_date', 'status')
+    list_select_related = ('lease__unit__property', 'lease__tenant')
+    list_filter = ('status',)
+    search_fields = ('lease__tenant__email', 'lease__unit__property__address')
+    autocomplete_fields = ('company', 'lease')
+    date_hierarchy = 'period_start'
+
+
+@admin.register(LeaseDocument)
+class LeaseDocumentAdmin(TenantModelAdmin):
+    list_display = ('title', 'document_type', 'lease', 'created_at')
+    list_select_related = ('lease__unit__property', 'lease__tenant')
+    list_filter = ('document_type',)
+    search_fields = ('title', 'lease__tenant__email')
+    autocomplete_fields = ('company', 'lease')
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('leases', '0001_initial'),
+        ('properties', '0004_unitmeter_tariff'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lease',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='lease',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lease_search_vector_gin'),
+        ),
+    ]
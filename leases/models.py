@@ -1,6 +1,18 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 import uuid
 from core.models import TenantModel
+from core.querysets import LabelQuerySet
+
+
+class LeaseQuerySet(LabelQuerySet):
+    label_relations = ('unit__property', 'tenant')
+
+
+class LeaseBillingQuerySet(LabelQuerySet):
+    label_relations = ('lease__unit__property', 'lease__tenant')
+
 
 class Lease(TenantModel):
     unit = models.ForeignKey('properties.Unit', on_delete=models.CASCADE, related_name='leases')
@@ -21,6 +33,13 @@ class Lease(TenantModel):
         ('terminated', 'Terminated'),
         ('expired', 'Expired')
     ])
+    # Pilnteksta meklēšana pēc īrnieka vārda un e-pasta
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = LeaseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='lease_search_vector_gin')]
     
     def __str__(self):
         tenant_name = self.tenant.get_full_name() if self.tenant else "Nav īrnieka"
@@ -43,6 +62,8 @@ class LeaseBilling(TenantModel):
         ('overdue', 'Overdue'),
         ('cancelled', 'Cancelled')
     ])
+
+    objects = LeaseBillingQuerySet.as_manager()
     
     def __str__(self):
         return f"Rēķins {self.lease} ({self.period_start} - {self.period_end})"
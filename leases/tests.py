@@ -1,3 +1,63 @@
-from django.test import TestCase
+import io
+import zipfile
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.factories import create_company, seed_portfolio
+from properties.models import Property, Unit
+
+from .models import Lease, LeaseDocument
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class LeaseExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=1, months=1, meters_per_unit=0,
+                       occupancy=1, issues_per_property=0, seed=14)
+        cls.lease = Lease.objects.get(company=cls.company)
+        # Ceļa segmenti ".." nedrīkst nonākt arhīvā
+        Property.objects.filter(company=cls.company).update(address='..')
+        Unit.objects.filter(company=cls.company).update(unit_number='.')
+
+    def setUp(self):
+        self.client.force_login(self.company.owner)
+
+    def add_document(self, path, content):
+        name = default_storage.save(path, ContentFile(content))
+        return LeaseDocument.objects.create(company=self.company, lease=self.lease, document=name,
+                                            document_type='contract', title='Līgums')
+
+    def exported(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        return {name: archive.read(name) for name in archive.namelist()}
+
+    def test_lease_export_streams_unique_safe_entries(self):
+        self.add_document('lease_documents/a/contract.pdf', b'first')
+        self.add_document('lease_documents/b/contract.pdf', b'second')
+
+        entries = self.exported(reverse('leases:lease_export', args=[self.company.slug, self.lease.id]))
+        folder = f"_/_/lease_{self.lease.id}"
+        self.assertEqual(entries, {f"{folder}/contract.pdf": b'first', f"{folder}/contract (2).pdf": b'second'})
+        self.assertFalse(any('..' in name.split('/') for name in entries))
+
+    def test_lease_export_filename_is_encoded(self):
+        Unit.objects.filter(pk=self.lease.unit_id).update(unit_number='Ā"1;/x')
+        response = self.client.get(reverse('leases:lease_export', args=[self.company.slug, self.lease.id]))
+        self.assertEqual(response['Content-Disposition'],
+                         f"attachment; filename*=utf-8''lease_%C4%80%221%3B-x_{self.lease.start_date:%Y%m%d}.zip")
+
+    def test_property_export_includes_lease_documents(self):
+        self.add_document('lease_documents/c/annex.pdf', b'annex')
+        property = Property.objects.get(company=self.company)
+        entries = self.exported(reverse('properties:property_export', args=[self.company.slug, property.id]))
+        self.assertEqual(list(entries.values()), [b'annex'])
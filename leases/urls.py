@@ -9,4 +9,5 @@ urlpatterns = [
     path('<uuid:pk>/edit/', views.lease_edit, name='lease_edit'),
     path('<uuid:pk>/terminate/', views.lease_terminate, name='lease_terminate'),
     path('<uuid:pk>/delete/', views.lease_delete, name='lease_delete'),
+    path('<uuid:pk>/export/', views.lease_export, name='lease_export'),
 ]
\ No newline at end of file
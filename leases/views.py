@@ -12,6 +12,9 @@ from properties.models import Unit, Property
 from tenant_portal.models import TenantInvitation
 from utils.utils import send_lease_invitation_email
 from core.decorators import tenant_required
+from core.exports import export_response, lease_export_entries
+from search.autocomplete import selected_choice, user_label
+from users.models import User
 
 @login_required
 @tenant_required
@@ -28,6 +31,7 @@ def company_lease_list(request, company_slug):
     status = request.GET.get('status')
     property_id = request.GET.get('property')
     unit_id = request.GET.get('unit')
+    tenant_id = request.GET.get('tenant')
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     
@@ -45,6 +49,8 @@ def company_lease_list(request, company_slug):
         leases = leases.filter(unit__property_id=property_id)
     if unit_id:
         leases = leases.filter(unit_id=unit_id)
+    if tenant_id:
+        leases = leases.filter(tenant_id=tenant_id)
     if date_from:
         leases = leases.filter(start_date__gte=date_from)
     if date_to:
@@ -55,18 +61,23 @@ def company_lease_list(request, company_slug):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Iegūstam unikālos īpašumus priekš filtra - izmantojam filtru pēc company
-    properties = Property.objects.filter(company=company)
+    # Filtros tiek ielādēti tikai izvēlētie ieraksti; pārējos piedāvā autocomplete
+    property_choice = selected_choice(Property.objects.filter(company=company), property_id, lambda p: p.address)
+    tenant_choice = selected_choice(
+        User.objects.filter(leases__company=company).distinct(), tenant_id, user_label
+    )
     
     return render(request, 'leases/lease_list.html', {
         'company': company,
         'page_obj': page_obj,
-        'properties': properties,
+        'property_choice': property_choice,
+        'tenant_choice': tenant_choice,
         'active_page': 'tenant_leases',  # Mainām uz 'leases' tā vietā, lai lietotu 'properties'
         'filters': {
             'status': status,
             'property_id': property_id,
             'unit_id': unit_id,
+            'tenant_id': tenant_id,
             'date_from': date_from,
             'date_to': date_to
         }
@@ -261,6 +272,22 @@ def lease_delete(request, company_slug, pk):
         'active_page': 'tenant_leases'
     })
 
+@login_required
+@tenant_required
+def lease_export(request, company_slug, pk):
+    """Lejupielādē visus līguma dokumentus un problēmu attēlus vienā zip arhīvā"""
+    company = request.tenant
+    lease = get_object_or_404(Lease.objects.select_related('unit'), id=pk, company=company)
+    
+    # Pārbaudam tiesības
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību eksportēt šī līguma dokumentus.")
+        return redirect('leases:lease_detail', company_slug=company_slug, pk=pk)
+    
+    filename = f"lease_{lease.unit.unit_number}_{lease.start_date:%Y%m%d}.zip"
+    return export_response(lease_export_entries(lease), filename)
+
 
 def lease_invitation(request, token):
     invitation = get_object_or_404(
@@ -1,5 +1,76 @@
 from django.contrib import admin
-from .models import Property, Unit
-# Register your models here.
-admin.site.register(Property)
-admin.site.register(Unit)
+from core.admin import TenantModelAdmin
+from search.admin import SearchVectorAdminMixin
+from .models import BuildingConsumption, Property, Tariff, Unit, UnitCostAllocation, UnitMeter, MeterReading
+
+
+@admin.register(Property)
+class PropertyAdmin(SearchVectorAdminMixin, TenantModelAdmin):
+    list_display = ('address', 'company', 'building_type', 'floor_count', 'manager')
+    list_select_related = ('company', 'manager')
+    list_filter = ('building_type',)
+    search_fields = ('address', 'cadastral_number')
+    autocomplete_fields = ('company', 'manager')
+
+
+@admin.register(Unit)
+class UnitAdmin(SearchVectorAdminMixin, TenantModelAdmin):
+    list_display = ('unit_number', 'property', 'unit_type', 'status', 'area')
+    list_select_related = ('property',)
+    list_filter = ('status', 'unit_type')
+    search_fields = ('unit_number', 'property__address')
+    autocomplete_fields = ('company', 'property')
+
+
+@admin.register(UnitMeter)
+class UnitMeterAdmin(TenantModelAdmin):
+    list_display = ('meter_number', 'meter_type', 'unit', 'status', 'expire_date')
+    list_select_related = ('unit__property',)
+    list_filter = ('meter_type', 'status')
+    search_fields = ('meter_number', 'unit__unit_number', 'unit__property__address')
+    autocomplete_fields = ('company', 'unit')
+
+
+@admin.register(MeterReading)
+class MeterReadingAdmin(TenantModelAdmin):
+    list_display = ('meter', 'reading', 'reading_date', 'is_verified', 'is_estimated', 'anomaly', 'submitted_by')
+    list_select_related = ('meter', 'submitted_by')
+    list_filter = ('is_verified', 'is_estimated', 'anomaly', 'meter__meter_type')
+    readonly_fields = ('anomaly', 'anomaly_score')
+    # Visiem meklēšanas laukiem ir pg_trgm indeksi (meter_number_trgm, unit_number_trgm, property_address_trgm):
+    # meklēšana atlasa skaitītājus mazajās tabulās, rādījumi tiek atlasīti pa meter_id indeksu
+    search_fields = ('meter__meter_number', 'meter__unit__unit_number', 'meter__unit__property__address')
+    autocomplete_fields = ('company', 'meter', 'submitted_by', 'verified_by')
+    date_hierarchy = 'reading_date'
+
+
+class UnitCostAllocationInline(admin.TabularInline):
+    model = UnitCostAllocation
+    fields = ('unit', 'metered_consumption', 'consumption', 'amount', 'invoice_item')
+    # Sadalījumu aprēķina properties.allocation, tāpēc admin tikai rāda rezultātu
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BuildingConsumption)
+class BuildingConsumptionAdmin(TenantModelAdmin):
+    list_display = ('property', 'meter_type', 'period_start', 'period_end', 'consumption', 'amount', 'method',
+                    'allocated_at')
+    list_select_related = ('property',)
+    list_filter = ('meter_type', 'method')
+    search_fields = ('property__address',)
+    autocomplete_fields = ('company', 'property')
+    date_hierarchy = 'period_end'
+    inlines = [UnitCostAllocationInline]
+
+
+@admin.register(Tariff)
+class TariffAdmin(TenantModelAdmin):
+    list_display = ('meter_type', 'price', 'valid_from', 'valid_to', 'company')
+    list_select_related = ('company',)
+    list_filter = ('meter_type',)
+    autocomplete_fields = ('company',)
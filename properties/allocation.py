@@ -0,0 +1,160 @@
+"""
+Ēkas skaitītāju patēriņa sadale pa telpām.
+
+Visas ēkas telpas un to skaitītāju patēriņš tiek nolasīti ar diviem
+vaicājumiem, sadale tiek aprēķināta vienā piegājienā pār visām telpām,
+un rezultāts tiek saglabāts ar vienu bulk ierakstu. Summas tiek noapaļotas
+ar lielākā atlikuma metodi, tāpēc telpu daļu summa precīzi sakrīt ar ēkas
+rēķinu.
+"""
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BUILDING_METER_TYPES, BuildingConsumption, MeterReading, Unit, UnitCostAllocation, UnitMeter
+
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+
+
+def distribute(total, weights):
+    """
+    Sadala total proporcionāli svariem, noapaļojot līdz centiem.
+
+    Katra daļa tiek noapaļota uz leju, un atlikušie centi tiek piešķirti
+    daļām ar lielāko noapaļošanas atlikumu - daļu summa vienmēr ir total.
+    """
+    weight_sum = sum(weights, ZERO)
+    if not weight_sum:
+        return [ZERO] * len(weights)
+    total = total.quantize(CENT)
+    exact = [total * weight / weight_sum for weight in weights]
+    shares = [value.quantize(CENT, rounding=ROUND_DOWN) for value in exact]
+    remaining = int((total - sum(shares, ZERO)) / CENT)
+    by_remainder = sorted(range(len(shares)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in by_remainder[:remaining]:
+        shares[i] += CENT
+    return shares
+
+
+def metered_consumption(property_id, meter_types, start, end):
+    """
+    Telpu skaitītāju patēriņš periodā: {unit_id: Decimal}, viens vaicājums visai ēkai.
+
+    Sākuma rādījums ir pēdējais līdz perioda sākumam vai, ja skaitītājs
+    uzstādīts perioda laikā, pirmais periodā. Nomainītu skaitītāju patēriņš
+    tiek saskaitīts.
+    """
+    readings = MeterReading.objects.filter(meter=OuterRef('pk')).order_by()
+
+    def reading(queryset, *ordering):
+        return Subquery(queryset.order_by(*ordering).values('reading')[:1])
+
+    meters = UnitMeter.objects.filter(unit__property_id=property_id, meter_type__in=meter_types).annotate(
+        start_reading=Coalesce(
+            reading(readings.filter(reading_date__lte=start), '-reading_date', '-created_at'),
+            reading(readings.filter(reading_date__gt=start, reading_date__lte=end), 'reading_date', 'created_at'),
+        ),
+        end_reading=reading(readings.filter(reading_date__lte=end), '-reading_date', '-created_at'),
+    ).values_list('unit_id', 'start_reading', 'end_reading')
+
+    consumption = defaultdict(lambda: ZERO)
+    for unit_id, start_reading, end_reading in meters:
+        if start_reading is not None and end_reading is not None and end_reading >= start_reading:
+            consumption[unit_id] += end_reading - start_reading
+    return dict(consumption)
+
+
+def unit_shares(record, areas, metered):
+    """
+    Katras telpas patēriņa daļa (nenoapaļota) pēc ieraksta sadales metodes.
+
+    areas un metered ir vienāda garuma saraksti telpu secībā; metered
+    vērtība ir None, ja telpai nav skaitītāja rādījumu.
+    """
+    total = record.consumption
+    measured = [value or ZERO for value in metered]
+    area_sum = sum(areas, ZERO)
+    measured_sum = sum(measured, ZERO)
+
+    def by_area(amount):
+        return [amount * area / area_sum if area_sum else ZERO for area in areas]
+
+    if record.method == BuildingConsumption.Methods.SUBMETER and measured_sum:
+        return [total * value / measured_sum for value in measured]
+    if record.method == BuildingConsumption.Methods.HYBRID and measured_sum:
+        difference = total - measured_sum
+        if difference < 0:
+            # Telpu skaitītāji rāda vairāk par ēkas skaitītāju - samazinām proporcionāli
+            return [total * value / measured_sum for value in measured]
+        return [value + share for value, share in zip(measured, by_area(difference))]
+    # Pēc platības; arī tad, ja telpām nav neviena skaitītāja rādījuma
+    return by_area(total)
+
+
+def allocate(records):
+    """
+    Sadala ēkas patēriņa ierakstus pa visām ēkas telpām un saglabā UnitCostAllocation.
+
+    Ieraksti, kuru daļas jau iekļautas rēķinos, netiek pārrēķināti.
+    Atgriež sadalīto ierakstu skaitu.
+    """
+    records = list(records)
+    invoiced = set(UnitCostAllocation.objects.filter(
+        building_consumption__in=records, invoice_item__isnull=False,
+    ).values_list('building_consumption_id', flat=True))
+    records = [record for record in records if record.pk not in invoiced]
+    if not records:
+        return 0
+
+    units_by_property = {}
+    allocations = []
+    for record in records:
+        units = units_by_property.get(record.property_id)
+        if units is None:
+            units = list(Unit.objects.filter(property_id=record.property_id).order_by('unit_number').values_list(
+                'id', 'area', 'company_id'
+            ))
+            units_by_property[record.property_id] = units
+        if not units:
+            continue
+
+        metered = {}
+        if record.method != BuildingConsumption.Methods.AREA:
+            metered = metered_consumption(record.property_id, BUILDING_METER_TYPES[record.meter_type],
+                                          record.period_start, record.period_end)
+        metered_values = [metered.get(unit_id) for unit_id, _, _ in units]
+        shares = unit_shares(record, [area for _, area, _ in units], metered_values)
+
+        consumption = distribute(record.consumption, shares)
+        amounts = distribute(record.amount, shares)
+        allocations.extend(
+            UnitCostAllocation(
+                company_id=company_id, building_consumption=record, unit_id=unit_id,
+                metered_consumption=value, consumption=unit_consumption, amount=amount,
+            )
+            for (unit_id, _, company_id), value, unit_consumption, amount
+            in zip(units, metered_values, consumption, amounts)
+        )
+
+    with transaction.atomic():
+        UnitCostAllocation.objects.filter(building_consumption__in=records).delete()
+        UnitCostAllocation.objects.bulk_create(allocations)
+        BuildingConsumption.objects.filter(pk__in=[record.pk for record in records]).update(
+            allocated_at=timezone.now()
+        )
+    return len(records)
+
+
+def pending_allocations(unit, since=None):
+    """Telpas sadalītās ēkas izmaksas, kas vēl nav iekļautas rēķinā"""
+    allocations = UnitCostAllocation.objects.filter(
+        unit=unit, invoice_item__isnull=True, amount__gt=0,
+    ).select_related('building_consumption').order_by('building_consumption__period_end')
+    if since:
+        allocations = allocations.filter(building_consumption__period_end__gte=since)
+    return allocations
@@ -0,0 +1,109 @@
+"""
+Skaitītāju rādījumu anomāliju noteikšana.
+
+Katram rādījumam patēriņš kopš iepriekšējā rādījuma tiek pārrēķināts uz
+mēnesi un salīdzināts ar skaitītāja pēdējo mēnešu patēriņa mediānu un MAD
+(median absolute deviation). Atzīmēti tiek samazinājušies rādījumi un
+patēriņa lēcieni; neverificēti atzīmētie rādījumi veido pārbaudes rindu.
+
+Atzīmēti un neverificēti rādījumi netiek izmantoti kā bāze nākamajiem,
+tāpēc viena kļūdaina ievade neatzīmē arī nākamo pareizo rādījumu.
+Aprēķinātie rādījumi (properties.estimates) netiek vērtēti.
+"""
+import statistics
+from collections import deque
+from itertools import groupby
+
+from .models import MeterReading
+
+WINDOW = 12  # Cik iepriekšējo patēriņa periodu ņem vērā
+MIN_HISTORY = 3  # Mazāk periodu - lēcienus nevērtē
+THRESHOLD = 3.5  # Novirze MAD vienībās, virs kuras patēriņš ir lēciens
+MAD_SCALE = 1.4826  # MAD -> standartnovirze normālam sadalījumam
+MIN_SPREAD = 0.1  # Izkliede vismaz 10% no mediānas - stabilam patēriņam MAD ir tuvu nullei
+BATCH_SIZE = 1000
+HISTORY_LIMIT = 2 * WINDOW + 1
+
+
+def _score(rates, rate):
+    median = statistics.median(rates)
+    mad = statistics.median(abs(value - median) for value in rates)
+    spread = max(mad * MAD_SCALE, abs(median) * MIN_SPREAD, 1e-6)
+    return round((rate - median) / spread, 1)
+
+
+def scan(series):
+    """
+    Rādījumu virkne hronoloģiskā secībā: [(reading, reading_date, is_verified)] -> [(anomaly, score)].
+    """
+    results = []
+    baseline = None
+    rates = deque(maxlen=WINDOW)
+    for reading, reading_date, is_verified in series:
+        anomaly, score, rate = '', None, None
+        if baseline is not None:
+            base_reading, base_date = baseline
+            if reading < base_reading:
+                anomaly = MeterReading.Anomalies.DECREASE
+            else:
+                rate = float(reading - base_reading) * 30 / max((reading_date - base_date).days, 1)
+                if len(rates) >= MIN_HISTORY:
+                    score = _score(rates, rate)
+                    if score > THRESHOLD:
+                        anomaly = MeterReading.Anomalies.SPIKE
+        results.append((anomaly, score))
+
+        if not anomaly or is_verified:
+            # Verificēts samazinājums (piem., skaitītāja nomaiņa) sāk jaunu bāzi bez patēriņa perioda
+            if rate is not None:
+                rates.append(rate)
+            baseline = (reading, reading_date)
+    return results
+
+
+def flag_reading(reading):
+    """
+    Novērtē jaunu rādījumu pret skaitītāja vēsturi (viens vaicājums) un aizpilda anomaly laukus.
+
+    Rādījums netiek saglabāts - to dara izsaucējs.
+    """
+    history = MeterReading.objects.filter(meter_id=reading.meter_id, reading_date__lte=reading.reading_date,
+                                          is_estimated=False)
+    if reading.pk:
+        history = history.exclude(pk=reading.pk)
+    history = list(history.order_by('-reading_date', '-created_at').values_list(
+        'reading', 'reading_date', 'is_verified'
+    )[:HISTORY_LIMIT])
+    history.reverse()
+
+    reading.anomaly, reading.anomaly_score = scan(history + [(reading.reading, reading.reading_date, False)])[-1]
+    return reading.anomaly
+
+
+def detect_anomalies(company, meters=None):
+    """
+    Pārvērtē visus uzņēmuma (vai norādīto skaitītāju) rādījumus.
+
+    Rādījumi tiek nolasīti ar vienu vaicājumu pa skaitītājiem, un saglabāti
+    tiek tikai mainītie. Atgriež atzīmēto rādījumu skaitu.
+    """
+    readings = MeterReading.objects.filter(company=company, is_estimated=False)
+    if meters is not None:
+        readings = readings.filter(meter__in=meters)
+    readings = readings.order_by('meter_id', 'reading_date', 'created_at').values_list(
+        'meter_id', 'id', 'reading', 'reading_date', 'is_verified', 'anomaly', 'anomaly_score'
+    )
+
+    changed = []
+    flagged = 0
+    for _, rows in groupby(readings.iterator(chunk_size=BATCH_SIZE), key=lambda row: row[0]):
+        rows = list(rows)
+        results = scan([(reading, reading_date, is_verified) for _, _, reading, reading_date, is_verified, _, _ in rows])
+        for row, (anomaly, score) in zip(rows, results):
+            if anomaly:
+                flagged += 1
+            if (anomaly, score) != (row[5], row[6]):
+                changed.append(MeterReading(pk=row[1], anomaly=anomaly, anomaly_score=score))
+
+    MeterReading.objects.bulk_update(changed, ['anomaly', 'anomaly_score'], batch_size=BATCH_SIZE)
+    return flagged
@@ -0,0 +1,119 @@
+"""
+Aprēķinātie skaitītāju rādījumi periodiem bez iesniegta rādījuma.
+
+Skaitītāja faktiskais patēriņš tiek sadalīts pa kalendāra mēnešiem, un
+trūkstošā perioda patēriņš tiek aprēķināts ar katra mēneša vidējo dienas
+patēriņu (sezonālais vidējais). Aprēķinātais rādījums tiek atzīmēts ar
+is_estimated; kad pienāk faktiskais rādījums, nākamais rēķins ietver
+starpību starp abiem (properties.tariffs.meter_charges).
+"""
+import calendar
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from itertools import groupby, pairwise
+
+from .models import MeterReading, UnitMeter
+
+CENT = Decimal('0.01')
+ONE_DAY = datetime.timedelta(days=1)
+HISTORY_DAYS = 2 * 365  # Sezonālajam profilam pietiek ar diviem gadiem
+BATCH_SIZE = 1000
+
+
+def month_period(month):
+    """Kalendāra mēneša pirmā un pēdējā diena"""
+    first = month.replace(day=1)
+    return first, first.replace(day=calendar.monthrange(first.year, first.month)[1])
+
+
+def _month_chunks(start, end):
+    """Dienas (start, end] pa kalendāra mēnešiem: [(month, days)]"""
+    day = start + ONE_DAY
+    while day <= end:
+        month_end = day.replace(day=calendar.monthrange(day.year, day.month)[1])
+        chunk_end = min(month_end, end)
+        yield day.month, (chunk_end - day).days + 1
+        day = chunk_end + ONE_DAY
+
+
+def seasonal_profile(readings):
+    """
+    Faktiskie rādījumi [(reading, reading_date)] hronoloģiski -> ({month: dienas patēriņš}, vidējais dienas patēriņš).
+
+    Ja vēsturē nav neviena patēriņa perioda, vidējais ir None.
+    """
+    totals, days = defaultdict(float), defaultdict(int)
+    for (previous, previous_date), (reading, reading_date) in pairwise(readings):
+        span = (reading_date - previous_date).days
+        if span <= 0 or reading < previous:
+            continue
+        rate = float(reading - previous) / span
+        for month, count in _month_chunks(previous_date, reading_date):
+            totals[month] += rate * count
+            days[month] += count
+
+    if not days:
+        return {}, None
+    overall = sum(totals.values()) / sum(days.values())
+    return {month: totals[month] / days[month] for month in days}, overall
+
+
+def estimate_consumption(profile, overall, start, end):
+    """Patēriņš dienām (start, end]; mēnešiem bez vēstures izmanto vidējo"""
+    total = sum(profile.get(month, overall) * count for month, count in _month_chunks(start, end))
+    return Decimal(total).quantize(CENT)
+
+
+def estimate_readings(company, period_start, period_end, meters=None):
+    """
+    Izveido aprēķinātus rādījumus period_end datumā aktīvajiem skaitītājiem bez rādījuma periodā.
+
+    Visu skaitītāju vēsture tiek nolasīta ar vienu vaicājumu, un rādījumi
+    tiek saglabāti ar vienu bulk ierakstu. Skaitītāji ar mazāk nekā diviem
+    faktiskiem rādījumiem tiek izlaisti. Atgriež izveidoto rādījumu skaitu.
+    """
+    active_meters = UnitMeter.objects.filter(company=company, status='active')
+    if meters is not None:
+        active_meters = active_meters.filter(pk__in=[getattr(meter, 'pk', meter) for meter in meters])
+
+    readings = MeterReading.objects.filter(
+        meter__in=active_meters,
+        reading_date__gt=period_start - datetime.timedelta(days=HISTORY_DAYS),
+        reading_date__lte=period_end,
+    ).order_by('meter_id', 'reading_date', 'created_at').values_list(
+        'meter_id', 'reading', 'reading_date', 'is_estimated'
+    )
+
+    estimates = []
+    for meter_id, rows in groupby(readings.iterator(chunk_size=BATCH_SIZE), key=lambda row: row[0]):
+        rows = list(rows)
+        if rows[-1][2] >= period_start:
+            continue  # Periodā jau ir rādījums
+        actual = [(reading, reading_date) for _, reading, reading_date, is_estimated in rows if not is_estimated]
+        profile, overall = seasonal_profile(actual)
+        if overall is None:
+            continue
+
+        _, base, base_date, _ = rows[-1]
+        estimates.append(MeterReading(
+            company_id=company.pk, meter_id=meter_id, reading_date=period_end, is_estimated=True,
+            reading=base + estimate_consumption(profile, overall, base_date, period_end),
+            notes=f"Aprēķināts pēc patēriņa vēstures kopš {base_date.strftime('%d.%m.%Y')}",
+        ))
+
+    MeterReading.objects.bulk_create(estimates, batch_size=BATCH_SIZE)
+    return len(estimates)
+
+
+def reconcile_estimates(reading):
+    """
+    Faktiskais rādījums aizstāj tā skaitītāja aprēķinātos rādījumus no tā datuma.
+
+    Agrākie aprēķinātie rādījumi paliek - nākamais rēķins ietver starpību
+    starp aprēķināto un faktisko rādījumu. Atgriež dzēsto rādījumu skaitu.
+    """
+    deleted, _ = MeterReading.objects.filter(
+        meter_id=reading.meter_id, is_estimated=True, reading_date__gte=reading.reading_date,
+    ).delete()
+    return deleted
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Property, Unit, UnitMeter, MeterReading
+from .models import BuildingConsumption, Property, Tariff, Unit, UnitMeter, MeterReading
+from .tariffs import DEFAULT_TARIFFS
 import datetime
 
 class PropertyForm(forms.ModelForm):
@@ -79,15 +80,8 @@ class UnitMeterForm(forms.ModelForm):
                 
         # Pievienojam noklusējuma tarifus atkarībā no mērītāja tipa
         if not self.instance.pk and self.instance.meter_type:
-            default_tariffs = {
-                'water_cold': 1.20,
-                'water_hot': 4.50,
-                'gas': 0.65,
-                'electricity': 0.15,
-                'heating': 60.00
-            }
-            if self.instance.meter_type in default_tariffs:
-                self.fields['tariff'].initial = default_tariffs[self.instance.meter_type]
+            if self.instance.meter_type in DEFAULT_TARIFFS:
+                self.fields['tariff'].initial = DEFAULT_TARIFFS[self.instance.meter_type]
 
 class MeterReadingForm(forms.ModelForm):
     class Meta:
@@ -119,8 +113,10 @@ class MeterReadingForm(forms.ModelForm):
         reading_date = cleaned_data.get('reading_date')
         
         if reading is not None and reading_date and self.meter:
+            # Aprēķinātie rādījumi netiek ņemti vērā - faktiskais rādījums tos koriģē
             # Atrodam jaunākos rādījumus pirms šī datuma
             newer_readings = self.meter.readings.filter(
+                is_estimated=False,
                 reading_date__gt=reading_date
             ).order_by('reading_date')
             
@@ -131,6 +127,7 @@ class MeterReadingForm(forms.ModelForm):
             
             # Atrodam vecākos rādījumus pēc šī datuma
             older_readings = self.meter.readings.filter(
+                is_estimated=False,
                 reading_date__lt=reading_date
             ).order_by('-reading_date')
             
@@ -139,4 +136,82 @@ class MeterReadingForm(forms.ModelForm):
                 if reading < first_older.reading:
                     self.add_error('reading', f"Rādījums nevar būt mazāks par iepriekšējo rādījumu ({first_older.reading} no {first_older.reading_date})")
         
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+
+class BuildingConsumptionForm(forms.ModelForm):
+    class Meta:
+        model = BuildingConsumption
+        fields = ['meter_type', 'period_start', 'period_end', 'consumption', 'amount', 'method', 'notes']
+        widgets = {
+            'meter_type': forms.Select(attrs={'class': 'form-select'}),
+            'period_start': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'period_end': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'consumption': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0'}),
+            'amount': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0'}),
+            'method': forms.Select(attrs={'class': 'form-select'}),
+            'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        self.property = kwargs.pop('property', None)
+        super().__init__(*args, **kwargs)
+
+        # Piedāvājam tikai tos ēkas skaitītājus, kas īpašumam ir atzīmēti
+        if self.property:
+            self.fields['meter_type'].choices = [
+                (value, label) for value, label in self.fields['meter_type'].choices
+                if value and getattr(self.property, f'has_building_{value}_meter')
+            ]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        period_start = cleaned_data.get('period_start')
+        period_end = cleaned_data.get('period_end')
+        meter_type = cleaned_data.get('meter_type')
+
+        if period_start and period_end and period_end < period_start:
+            self.add_error('period_end', "Perioda beigām jābūt pēc sākuma datuma")
+        for field in ('consumption', 'amount'):
+            value = cleaned_data.get(field)
+            if value is not None and value < 0:
+                self.add_error(field, "Vērtība nevar būt negatīva")
+
+        if self.property and period_start and meter_type and BuildingConsumption.objects.filter(
+                property=self.property, meter_type=meter_type, period_start=period_start).exists():
+            self.add_error('period_start', "Šim skaitītājam par šo periodu patēriņš jau ir ievadīts")
+        return cleaned_data
+
+
+class TariffForm(forms.ModelForm):
+    class Meta:
+        model = Tariff
+        fields = ['meter_type', 'price', 'valid_from', 'valid_to', 'notes']
+        widgets = {
+            'meter_type': forms.Select(attrs={'class': 'form-select'}),
+            'price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0'}),
+            'valid_from': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'valid_to': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'notes': forms.TextInput(attrs={'class': 'form-control'}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        self.company = kwargs.pop('company', None)
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        meter_type = cleaned_data.get('meter_type')
+        price = cleaned_data.get('price')
+        valid_from = cleaned_data.get('valid_from')
+        valid_to = cleaned_data.get('valid_to')
+
+        if price is not None and price < 0:
+            self.add_error('price', "Tarifs nevar būt negatīvs")
+        if valid_from and valid_to and valid_to < valid_from:
+            self.add_error('valid_to', "Beigu datumam jābūt pēc sākuma datuma")
+        if self.company and meter_type and valid_from and Tariff.objects.filter(
+                company=self.company, meter_type=meter_type, valid_from=valid_from
+        ).exclude(pk=self.instance.pk).exists():
+            self.add_error('valid_from', "Šim skaitītāja veidam no šī datuma tarifs jau ir noteikts")
+        return cleaned_data
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from companies.models import Company
+from properties.anomalies import detect_anomalies
+
+
+class Command(BaseCommand):
+    help = 'Pārvērtē skaitītāju rādījumus un atzīmē aizdomīgos pārbaudei (pirmā aizpilde vai pēc importa)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='Tikai norādītā uzņēmuma slug')
+
+    def handle(self, *args, **options):
+        companies = Company.objects.all()
+        if options['company']:
+            companies = companies.filter(slug=options['company'])
+            if not companies.exists():
+                raise CommandError(f"Uzņēmums '{options['company']}' nav atrasts")
+
+        flagged = sum(detect_anomalies(company) for company in companies.iterator())
+        self.stdout.write(self.style.SUCCESS(f"Atzīmēti {flagged} rādījumi pārbaudei"))
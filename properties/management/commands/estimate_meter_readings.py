@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from companies.models import Company
+from properties.estimates import estimate_readings, month_period
+
+
+class Command(BaseCommand):
+    help = 'Aprēķina rādījumus aktīvajiem skaitītājiem, kuriem mēnesī nav iesniegts rādījums'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='Tikai norādītā uzņēmuma slug')
+        parser.add_argument('--period', help='Mēnesis formātā YYYY-MM (noklusēti - iepriekšējais mēnesis)')
+
+    def handle(self, *args, **options):
+        if options['period']:
+            try:
+                month = datetime.strptime(options['period'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError("Periodam jābūt formātā YYYY-MM")
+        else:
+            month = timezone.localdate().replace(day=1) - timedelta(days=1)
+        period_start, period_end = month_period(month)
+        if period_end >= timezone.localdate():
+            raise CommandError("Rādījumus var aprēķināt tikai beigušamies mēnesim")
+
+        companies = Company.objects.all()
+        if options['company']:
+            companies = companies.filter(slug=options['company'])
+            if not companies.exists():
+                raise CommandError(f"Uzņēmums '{options['company']}' nav atrasts")
+
+        created = sum(estimate_readings(company, period_start, period_end) for company in companies.iterator())
+        self.stdout.write(self.style.SUCCESS(
+            f"Aprēķināti {created} rādījumi par {period_start.strftime('%m.%Y')}"
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:37
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('properties', '0005_property_search_vector_unit_search_vector_and_more'),
+        ('search', '0001_pg_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('address'), name='gin_trgm_ops'), name='property_address_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('unit_number'), name='gin_trgm_ops'), name='unit_number_trgm'),
+        ),
+    ]
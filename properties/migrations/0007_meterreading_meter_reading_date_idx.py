@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('properties', '0006_property_property_address_trgm_unit_unit_number_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meterreading',
+            index=models.Index(fields=['reading_date', 'created_at'], name='meter_reading_date_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:55
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('invoices', '0006_invoice_invoice_number_idx'),
+        ('properties', '0007_meterreading_meter_reading_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuildingConsumption',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('meter_type', models.CharField(choices=[('water', 'Water'), ('gas', 'Gas'), ('electricity', 'Electricity'), ('heating', 'Heating')], max_length=20)),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('consumption', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Rēķina summa par ēku (€)', max_digits=10)),
+                ('method', models.CharField(choices=[('area', 'By Area'), ('submeter', 'By Unit Meters'), ('hybrid', 'Unit Meters + Difference by Area')], default='area', max_length=20)),
+                ('allocated_at', models.DateTimeField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='building_consumptions', to='properties.property')),
+            ],
+            options={
+                'ordering': ['-period_end', 'meter_type'],
+                'unique_together': {('property', 'meter_type', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UnitCostAllocation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('metered_consumption', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('consumption', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('building_consumption', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='properties.buildingconsumption')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company')),
+                ('invoice_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cost_allocations', to='invoices.invoiceitem')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_allocations', to='properties.unit')),
+            ],
+            options={
+                'unique_together': {('building_consumption', 'unit')},
+            },
+        ),
+    ]
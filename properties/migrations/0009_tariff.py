@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:59
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('properties', '0008_building_consumption'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tariff',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('meter_type', models.CharField(choices=[('water_cold', 'Cold Water'), ('water_hot', 'Hot Water'), ('gas', 'Gas'), ('electricity', 'Electricity'), ('heating', 'Heating')], max_length=20)),
+                ('price', models.DecimalField(decimal_places=2, help_text='Cena par vienu vienību (€)', max_digits=10)),
+                ('valid_from', models.DateField()),
+                ('valid_to', models.DateField(blank=True, help_text='Tukšs - spēkā līdz nākamajam tarifam', null=True)),
+                ('notes', models.CharField(blank=True, max_length=255)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company')),
+            ],
+            options={
+                'ordering': ['meter_type', '-valid_from'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('valid_to__isnull', True), ('valid_to__gte', models.F('valid_from')), _connector='OR'), name='tariff_valid_range')],
+                'unique_together': {('company', 'meter_type', 'valid_from')},
+            },
+        ),
+    ]
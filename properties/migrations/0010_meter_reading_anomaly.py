@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('properties', '0009_tariff'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meterreading',
+            name='anomaly',
+            field=models.CharField(blank=True, choices=[('decrease', 'Rādījums samazinājies'), ('spike', 'Neparasti liels patēriņš')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='meterreading',
+            name='anomaly_score',
+            field=models.FloatField(blank=True, help_text='Novirze no mediānas MAD vienībās', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='meterreading',
+            index=models.Index(condition=models.Q(models.Q(('anomaly', ''), _negated=True), ('is_verified', False)), fields=['company', 'reading_date'], name='meter_reading_anomaly_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_meter_reading_anomaly'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meterreading',
+            name='is_estimated',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:26
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('properties', '0011_meter_reading_estimate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='unitmeter',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('meter_number'), name='gin_trgm_ops'), name='meter_number_trgm'),
+        ),
+    ]
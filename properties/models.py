@@ -1,8 +1,21 @@
 from core.models import TenantModel
+from core.querysets import LabelQuerySet
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
+from django.db.models.functions import Upper
 from django.utils import timezone
 
+
+class UnitQuerySet(LabelQuerySet):
+    label_relations = ('property',)
+
+
+class MeterReadingQuerySet(LabelQuerySet):
+    label_relations = ('meter',)
+
+
 class Property(TenantModel):
     address = models.CharField(max_length=255)
     cadastral_number = models.CharField(max_length=100, blank=True)
@@ -31,9 +44,17 @@ class Property(TenantModel):
     has_building_electricity_meter = models.BooleanField(default=False)
     has_building_heating_meter = models.BooleanField(default=False)
 
+    # Pilnteksta meklēšana - aizpilda search.documents pēc saglabāšanas
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         verbose_name_plural = "Properties"
         unique_together = ['company', 'address']  # Katrai kompānijai adrese ir unikāla
+        indexes = [
+            GinIndex(fields=['search_vector'], name='property_search_vector_gin'),
+            # Adrešu autocomplete (pg_trgm); UPPER, jo tā Django veido icontains vaicājumu
+            GinIndex(OpClass(Upper('address'), name='gin_trgm_ops'), name='property_address_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.address} ({self.get_building_type_display()})"
@@ -78,22 +99,33 @@ class Unit(TenantModel):
     
     notes = models.TextField(blank=True)
 
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = UnitQuerySet.as_manager()
+
     class Meta:
         unique_together = ['property', 'unit_number']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='unit_search_vector_gin'),
+            GinIndex(OpClass(Upper('unit_number'), name='gin_trgm_ops'), name='unit_number_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.property.address} - Unit {self.unit_number}"
     
+METER_TYPE_CHOICES = [
+    ('water_cold', 'Cold Water'),
+    ('water_hot', 'Hot Water'),
+    ('gas', 'Gas'),
+    ('electricity', 'Electricity'),
+    ('heating', 'Heating')
+]
+
+
     # properties/models.py
 class UnitMeter(TenantModel):
     unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='meters')
-    meter_type = models.CharField(max_length=20, choices=[
-        ('water_cold', 'Cold Water'),
-        ('water_hot', 'Hot Water'),
-        ('gas', 'Gas'),
-        ('electricity', 'Electricity'),
-        ('heating', 'Heating')
-    ])
+    meter_type = models.CharField(max_length=20, choices=METER_TYPE_CHOICES)
     meter_number = models.CharField(max_length=100)
     status = models.CharField(max_length=20, choices=[
         ('active', 'Active'),
@@ -109,6 +141,10 @@ class UnitMeter(TenantModel):
 
     class Meta:
         unique_together = ['unit', 'meter_type', 'meter_number']
+        indexes = [
+            # Skaitītāju un rādījumu admin meklēšana (pg_trgm); UPPER, jo tā Django veido icontains vaicājumu
+            GinIndex(OpClass(Upper('meter_number'), name='gin_trgm_ops'), name='meter_number_trgm'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['unit', 'meter_type'],
@@ -157,9 +193,28 @@ class MeterReading(TenantModel):
     )
     verification_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
+    # Aprēķināts no skaitītāja vēstures (properties.estimates), ja īrnieks rādījumu neiesniedza
+    is_estimated = models.BooleanField(default=False)
+
+    class Anomalies(models.TextChoices):
+        DECREASE = 'decrease', 'Rādījums samazinājies'
+        SPIKE = 'spike', 'Neparasti liels patēriņš'
+
+    # Aizpilda properties.anomalies; neverificēti atzīmētie rādījumi veido pārbaudes rindu
+    anomaly = models.CharField(max_length=20, choices=Anomalies.choices, blank=True)
+    anomaly_score = models.FloatField(null=True, blank=True, help_text="Novirze no mediānas MAD vienībās")
+
+    objects = MeterReadingQuerySet.as_manager()
 
     class Meta:
         ordering = ['-reading_date', '-created_at']
+        indexes = [
+            # Noklusētā kārtošana un admin date_hierarchy
+            models.Index(fields=['reading_date', 'created_at'], name='meter_reading_date_idx'),
+            # Pārbaudes rinda - tikai neverificētie atzīmētie rādījumi
+            models.Index(fields=['company', 'reading_date'], name='meter_reading_anomaly_idx',
+                         condition=~models.Q(anomaly='') & models.Q(is_verified=False)),
+        ]
 
     def __str__(self):
         return f"{self.meter} - {self.reading} ({self.reading_date})"
@@ -167,4 +222,87 @@ class MeterReading(TenantModel):
     def save(self, *args, **kwargs):
         if self.is_verified and not self.verification_date:
             self.verification_date = timezone.now()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+# Ēkas skaitītāja tips -> telpu skaitītāju tipi, kas mēra tā paša resursa patēriņu
+BUILDING_METER_TYPES = {
+    'water': ['water_cold', 'water_hot'],
+    'gas': ['gas'],
+    'electricity': ['electricity'],
+    'heating': ['heating'],
+}
+
+
+class BuildingConsumption(TenantModel):
+    """Ēkas kopējā skaitītāja patēriņš un izmaksas periodā, kas tiek sadalītas pa telpām"""
+    class Methods(models.TextChoices):
+        AREA = 'area', 'By Area'
+        SUBMETER = 'submeter', 'By Unit Meters'
+        HYBRID = 'hybrid', 'Unit Meters + Difference by Area'
+
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='building_consumptions')
+    meter_type = models.CharField(max_length=20, choices=[
+        ('water', 'Water'),
+        ('gas', 'Gas'),
+        ('electricity', 'Electricity'),
+        ('heating', 'Heating')
+    ])
+    period_start = models.DateField()
+    period_end = models.DateField()
+    consumption = models.DecimalField(max_digits=12, decimal_places=2)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Rēķina summa par ēku (€)")
+    method = models.CharField(max_length=20, choices=Methods.choices, default=Methods.AREA)
+    allocated_at = models.DateTimeField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ['property', 'meter_type', 'period_start']
+        ordering = ['-period_end', 'meter_type']
+
+    def __str__(self):
+        return f"{self.property.address} - {self.get_meter_type_display()} ({self.period_start} - {self.period_end})"
+
+
+class UnitCostAllocation(TenantModel):
+    """Telpai piešķirtā ēkas patēriņa un izmaksu daļa; pēc iekļaušanas rēķinā piesaistīta pozīcijai"""
+    building_consumption = models.ForeignKey(BuildingConsumption, on_delete=models.CASCADE, related_name='allocations')
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='cost_allocations')
+    # Telpas skaitītāju patēriņš periodā (None - telpai nav skaitītāja vai rādījumu)
+    metered_consumption = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    consumption = models.DecimalField(max_digits=12, decimal_places=2)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    invoice_item = models.ForeignKey('invoices.InvoiceItem', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='cost_allocations')
+
+    class Meta:
+        unique_together = ['building_consumption', 'unit']
+
+    def __str__(self):
+        return f"{self.unit} - {self.amount} €"
+
+
+class Tariff(TenantModel):
+    """
+    Uzņēmuma tarifs skaitītāja tipam spēkā no valid_from līdz valid_to (ieskaitot).
+
+    Tarifs beidzas valid_to dienā vai dienu pirms nākamā tā paša tipa tarifa
+    sākuma. Rēķinos patēriņš tiek sadalīts pa tarifu periodiem (properties.tariffs).
+    """
+    meter_type = models.CharField(max_length=20, choices=METER_TYPE_CHOICES)
+    price = models.DecimalField(max_digits=10, decimal_places=2, help_text="Cena par vienu vienību (€)")
+    valid_from = models.DateField()
+    valid_to = models.DateField(null=True, blank=True, help_text="Tukšs - spēkā līdz nākamajam tarifam")
+    notes = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['meter_type', '-valid_from']
+        unique_together = ['company', 'meter_type', 'valid_from']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(valid_to__isnull=True) | models.Q(valid_to__gte=models.F('valid_from')),
+                name='tariff_valid_range',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_meter_type_display()} {self.price} € ({self.valid_from} - {self.valid_to or '...'})"
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Tariff
+from .tariffs import invalidate_tariffs
+
+
+@receiver([post_save, post_delete], sender=Tariff)
+def invalidate_tariff_cache(sender, instance, **kwargs):
+    invalidate_tariffs(instance.company_id)
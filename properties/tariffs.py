@@ -0,0 +1,194 @@
+"""
+Uzņēmuma tarifi ar spēkā esamības periodiem.
+
+Uzņēmuma tarifi tiek ielādēti vienreiz un kešoti; TariffIndex atrod
+periodus ar bisect, tāpēc skaitītāju partijas cenošana neprasa vaicājumus
+par katru skaitītāju. Patēriņš starp diviem rādījumiem tiek sadalīts pa
+tarifu periodiem proporcionāli dienām.
+"""
+import datetime
+from bisect import bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .allocation import distribute
+from .models import MeterReading, Tariff
+
+ZERO = Decimal('0')
+ONE_DAY = datetime.timedelta(days=1)
+
+# Cena, ja uzņēmumam nav tarifa un skaitītājam nav norādīts savs tarifs
+DEFAULT_TARIFFS = {
+    'water_cold': Decimal('1.20'),
+    'water_hot': Decimal('4.50'),
+    'gas': Decimal('0.65'),
+    'electricity': Decimal('0.15'),
+    'heating': Decimal('60.00'),
+}
+
+
+def _cache_key(company_id):
+    return f"tariffs:{company_id}"
+
+
+def invalidate_tariffs(company_id):
+    cache.delete(_cache_key(company_id))
+
+
+class TariffIndex:
+    """
+    Tarifu periodi pa skaitītāju tipiem, sakārtoti pēc sākuma datuma.
+
+    Periods beidzas valid_to dienā vai dienu pirms nākamā perioda sākuma,
+    tāpēc periodi nepārklājas un meklēšana ir viens bisect.
+    """
+
+    def __init__(self, rows):
+        by_type = defaultdict(list)
+        for meter_type, valid_from, valid_to, price in sorted(rows, key=lambda row: (row[0], row[1])):
+            by_type[meter_type].append([valid_from, valid_to, price])
+        for periods in by_type.values():
+            for current, following in zip(periods, periods[1:]):
+                cap = following[0] - ONE_DAY
+                current[1] = cap if current[1] is None else min(current[1], cap)
+        self._periods = {meter_type: [tuple(period) for period in periods] for meter_type, periods in by_type.items()}
+        self._starts = {meter_type: [period[0] for period in periods] for meter_type, periods in self._periods.items()}
+
+    def _find(self, meter_type, date):
+        """Perioda indekss, kurā ietilpst date, un indekss nākamajam periodam"""
+        starts = self._starts.get(meter_type, [])
+        i = bisect_right(starts, date) - 1
+        if i >= 0:
+            valid_to = self._periods[meter_type][i][1]
+            if valid_to is None or date <= valid_to:
+                return i, i + 1
+        return None, i + 1
+
+    def price_at(self, meter_type, date):
+        i, _ = self._find(meter_type, date)
+        return None if i is None else self._periods[meter_type][i][2]
+
+    def segments(self, meter_type, first_day, last_day, fallback):
+        """
+        Sadala dienas [first_day, last_day] pa tarifu periodiem: [(first, last, price)].
+
+        Dienām bez uzņēmuma tarifa tiek izmantota fallback cena.
+        """
+        periods = self._periods.get(meter_type, [])
+        segments = []
+        day = first_day
+        while day <= last_day:
+            i, following = self._find(meter_type, day)
+            if i is not None:
+                end, price = periods[i][1] or last_day, periods[i][2]
+            else:
+                end = periods[following][0] - ONE_DAY if following < len(periods) else last_day
+                price = fallback
+            end = min(end, last_day)
+            if segments and segments[-1][2] == price:
+                segments[-1] = (segments[-1][0], end, price)
+            else:
+                segments.append((day, end, price))
+            day = end + ONE_DAY
+        return segments
+
+
+def get_tariff_index(company_id):
+    """Uzņēmuma tarifu indekss; tarifi tiek kešoti līdz izmaiņām (properties.signals)"""
+    key = _cache_key(company_id)
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(Tariff.objects.filter(company_id=company_id).values_list(
+            'meter_type', 'valid_from', 'valid_to', 'price'
+        ))
+        cache.set(key, rows, settings.TARIFF_CACHE_TIMEOUT)
+    return TariffIndex(rows)
+
+
+def fallback_price(meter):
+    return meter.tariff or DEFAULT_TARIFFS.get(meter.meter_type, ZERO)
+
+
+def price_consumption(index, meter, start_date, end_date, consumption):
+    """
+    Sadala patēriņu starp rādījumiem (start_date, end_date] pa tarifu periodiem.
+
+    Atgriež [(first, last, quantity, price)]; daudzumi ir proporcionāli
+    dienām un to summa precīzi sakrīt ar patēriņu.
+    """
+    fallback = fallback_price(meter)
+    if end_date <= start_date:
+        price = index.price_at(meter.meter_type, end_date)
+        return [(start_date, end_date, consumption, fallback if price is None else price)]
+
+    segments = index.segments(meter.meter_type, start_date + ONE_DAY, end_date, fallback)
+    quantities = distribute(consumption, [Decimal((last - first).days + 1) for first, last, _ in segments])
+    priced = [(first, last, quantity, price) for (first, last, price), quantity in zip(segments, quantities)]
+    # Pirmais periods sākas ar iepriekšējā rādījuma datumu, kā rēķina aprakstā
+    first, last, quantity, price = priced[0]
+    priced[0] = (start_date, last, quantity, price)
+    return [segment for segment in priced if segment[2]]
+
+
+def latest_reading_pairs(meters):
+    """{meter_id: [(reading, reading_date, is_estimated), ...]} - pēdējie divi rādījumi visiem skaitītājiem vienā vaicājumā"""
+    readings = MeterReading.objects.filter(meter__in=meters).annotate(
+        position=Window(RowNumber(), partition_by=F('meter_id'),
+                        order_by=[F('reading_date').desc(), F('created_at').desc()]),
+    ).filter(position__lte=2).order_by('meter_id', 'position').values_list(
+        'meter_id', 'reading', 'reading_date', 'is_estimated'
+    )
+
+    pairs = defaultdict(list)
+    for meter_id, reading, reading_date, is_estimated in readings:
+        pairs[meter_id].append((reading, reading_date, is_estimated))
+    return pairs
+
+
+def meter_charges(company_id, meters):
+    """
+    Rēķina pozīcijas visu skaitītāju patēriņam starp pēdējiem diviem rādījumiem.
+
+    Viens vaicājums rādījumiem un (keša tukšumā) viens tarifiem neatkarīgi
+    no skaitītāju skaita. Ja aprēķinātais rādījums (properties.estimates)
+    bija lielāks par nākamo faktisko, starpība tiek atmaksāta ar korekcijas pozīciju.
+    """
+    meters = list(meters)
+    index = get_tariff_index(company_id)
+    pairs = latest_reading_pairs(meters)
+
+    items = []
+    for meter in meters:
+        readings = pairs.get(meter.pk, [])
+        if len(readings) < 2:
+            continue
+        (latest, latest_date, latest_estimated), (previous, previous_date, previous_estimated) = readings
+        consumption = latest - previous
+        if consumption < 0 and previous_estimated:
+            price = index.price_at(meter.meter_type, previous_date)
+            items.append({
+                'description': f"{meter.get_meter_type_display()} korekcija pēc aprēķinātā rādījuma: "
+                               f"{consumption} vienības ({previous_date.strftime('%d.%m.%Y')} - "
+                               f"{latest_date.strftime('%d.%m.%Y')})",
+                'quantity': consumption,
+                'unit_price': fallback_price(meter) if price is None else price,
+                'type': 'utility',
+            })
+            continue
+        if consumption <= 0:
+            continue
+        estimated = ", aprēķināts" if latest_estimated else ""
+        for first, last, quantity, price in price_consumption(index, meter, previous_date, latest_date, consumption):
+            items.append({
+                'description': f"{meter.get_meter_type_display()} patēriņš: {quantity} vienības "
+                               f"({first.strftime('%d.%m.%Y')} - {last.strftime('%d.%m.%Y')}{estimated})",
+                'quantity': quantity,
+                'unit_price': price,
+                'type': 'utility',
+            })
+    return items
@@ -1,3 +1,362 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.factories import create_company, seed_portfolio
+from core.testing import QueryBudgetTestCase
+from invoices.models import InvoiceItem
+from leases.models import Lease
+from properties.allocation import allocate, distribute
+from properties.anomalies import detect_anomalies, scan
+from properties.estimates import estimate_readings, month_period
+from properties.models import (BuildingConsumption, MeterReading, Property, Tariff, Unit, UnitCostAllocation,
+                               UnitMeter)
+from properties.tariffs import TariffIndex, get_tariff_index, meter_charges
+
+
+class PropertyQueryBudgetTests(QueryBudgetTestCase):
+    """Īpašuma un skaitītāju skatu vaicājumu skaits nedrīkst augt līdz ar datu apjomu"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=100, months=24, seed=1)
+        seed_portfolio(create_company(), properties=1, units_per_property=20, months=6, seed=2)
+        cls.property = Property.objects.filter(company=cls.company).first()
+
+    def setUp(self):
+        self.client.force_login(self.company.owner)
+
+    def test_property_detail(self):
+        url = reverse('properties:property_detail', args=[self.company.slug, self.property.id])
+        self.get_within_budget(self.client, url, 18)
+
+    def test_property_detail_filtered_page(self):
+        url = reverse('properties:property_detail', args=[self.company.slug, self.property.id])
+        self.get_within_budget(self.client, f"{url}?status=rented&page=3", 18)
+
+    def test_company_meter_readings(self):
+        url = reverse('properties:company_meter_readings', args=[self.company.slug])
+        self.get_within_budget(self.client, url, 11)
+
+    def test_company_meter_readings_by_property(self):
+        url = reverse('properties:company_meter_readings', args=[self.company.slug])
+        self.get_within_budget(self.client, f"{url}?property={self.property.id}&page=5", 12)
+
+
+class BuildingAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=3, months=1, meters_per_unit=0,
+                       occupancy=1, issues_per_property=0, seed=10)
+        cls.property = Property.objects.get(company=cls.company)
+        Property.objects.filter(pk=cls.property.pk).update(has_building_water_meter=True)
+        cls.units = list(Unit.objects.filter(property=cls.property).order_by('unit_number'))
+        for unit, area in zip(cls.units, [50, 30, 20]):
+            Unit.objects.filter(pk=unit.pk).update(area=area)
+
+        # Otrās telpas skaitītājs uzstādīts perioda vidū
+        for unit, readings in zip(cls.units, [[(1, 100), (31, 130)], [(15, 10), (31, 30)]]):
+            meter = UnitMeter.objects.create(company=cls.company, unit=unit, meter_type='water_cold',
+                                             meter_number=f"W-{unit.unit_number}")
+            for day, value in readings:
+                MeterReading.objects.create(company=cls.company, meter=meter, reading=value,
+                                            reading_date=datetime.date(2026, 1, day))
+
+    def setUp(self):
+        self.client.force_login(self.company.owner)
+
+    def add_consumption(self, method):
+        url = reverse('properties:building_consumption_add', args=[self.company.slug, self.property.id])
+        self.client.post(url, {'meter_type': 'water', 'period_start': '2026-01-01', 'period_end': '2026-01-31',
+                               'consumption': '100', 'amount': '250', 'method': method})
+        return BuildingConsumption.objects.get(property=self.property, method=method)
+
+    def allocated(self, record):
+        return [(a.consumption, a.amount) for a in record.allocations.order_by('unit__unit_number')]
+
+    def test_distribute_keeps_exact_total(self):
+        self.assertEqual(distribute(Decimal('100'), [1, 1, 1]), [Decimal('33.34'), Decimal('33.33'), Decimal('33.33')])
+        self.assertEqual(sum(distribute(Decimal('0.05'), [Decimal('0.7'), Decimal('0.2'), Decimal('0.1')])),
+                         Decimal('0.05'))
+
+    def test_hybrid_splits_difference_by_area(self):
+        record = self.add_consumption(BuildingConsumption.Methods.HYBRID)
+        self.assertEqual(self.allocated(record), [
+            (Decimal('55.00'), Decimal('137.50')),
+            (Decimal('35.00'), Decimal('87.50')),
+            (Decimal('10.00'), Decimal('25.00')),
+        ])
+
+    def test_area_and_submeter_methods(self):
+        record = self.add_consumption(BuildingConsumption.Methods.AREA)
+        self.assertEqual([amount for _, amount in self.allocated(record)],
+                         [Decimal('125.00'), Decimal('75.00'), Decimal('50.00')])
+        record.method = BuildingConsumption.Methods.SUBMETER
+        record.save()
+        allocate([record])
+        self.assertEqual([amount for _, amount in self.allocated(record)],
+                         [Decimal('150.00'), Decimal('100.00'), Decimal('0.00')])
+
+    def test_allocation_is_invoiced_once(self):
+        record = self.add_consumption(BuildingConsumption.Methods.AREA)
+        lease = Lease.objects.get(unit=self.units[0])
+        lease.start_date = datetime.date(2026, 1, 1)
+        lease.save()
+        url = reverse('invoices:invoice_create', args=[self.company.slug, lease.id])
+        items = self.client.get(url).context['items_to_include']
+        index = next(i for i, item in enumerate(items) if item.get('allocation_id'))
+
+        self.client.post(url, {'create_invoice': '1', 'selected_items': [str(index)], 'issue_date': '2026-02-01',
+                               'due_date': '2026-02-15', 'period_start': '2026-01-01', 'period_end': '2026-01-31'})
+        allocation = record.allocations.get(unit=self.units[0])
+        self.assertEqual((allocation.invoice_item.type, allocation.invoice_item.amount), ('utility', Decimal('125.00')))
+        self.assertFalse(any(item.get('allocation_id') for item in self.client.get(url).context['items_to_include']))
+        # Iekļautā sadale netiek pārrēķināta
+        self.assertEqual(allocate([record]), 0)
+
+    def test_allocation_posted_twice_is_billed_once(self):
+        record = self.add_consumption(BuildingConsumption.Methods.AREA)
+        allocation = record.allocations.get(unit=self.units[0])
+        lease = Lease.objects.get(unit=self.units[0])
+        url = reverse('invoices:invoice_create', args=[self.company.slug, lease.id])
+        data = {'issue_date': '2026-02-01', 'due_date': '2026-02-15', 'period_start': '2026-01-01',
+                'period_end': '2026-01-31', 'create_invoice': '1'}
+
+        # Otrs pieprasījums izvēlnes veidoja, pirms pirmais rēķins bija saglabāts
+        with mock.patch('invoices.views.pending_allocations',
+                        return_value=UnitCostAllocation.objects.filter(pk=allocation.pk)):
+            items = self.client.get(url).context['items_to_include']
+            index = next(i for i, item in enumerate(items) if item.get('allocation_id'))
+            for _ in range(2):
+                self.client.post(url, {**data, 'selected_items': [str(index)]})
+            response = self.client.post(url, {**data, 'selected_items': ['0', str(index)]})
+
+        items = InvoiceItem.objects.filter(invoice__lease=lease)
+        self.assertEqual(items.filter(description__contains='ēkas skaitītājs').count(), 1)
+        # Trešais rēķins izveidots tikai ar īres maksu
+        self.assertEqual(items.filter(description__startswith='Īres maksa par').count(), 1)
+        self.assertEqual(response.status_code, 302)
+
+
+class TariffTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=2, months=1, meters_per_unit=0,
+                       occupancy=1, issues_per_property=0, seed=11)
+        cls.units = list(Unit.objects.filter(company=cls.company).order_by('unit_number'))
+        cls.meters = []
+        for unit, readings in zip(cls.units, [[(1, 100), (31, 130)], [(11, 0), (31, 20)]]):
+            meter = UnitMeter.objects.create(company=cls.company, unit=unit, meter_type='water_cold',
+                                             meter_number=f"T-{unit.unit_number}", tariff=Decimal('2.00'))
+            for day, value in readings:
+                MeterReading.objects.create(company=cls.company, meter=meter, reading=value,
+                                            reading_date=datetime.date(2026, 1, day))
+            cls.meters.append(meter)
+        # Vecais tarifs bez beigu datuma - spēkā līdz nākamā sākumam
+        Tariff.objects.create(company=cls.company, meter_type='water_cold', price=Decimal('1.00'),
+                              valid_from=datetime.date(2025, 1, 1))
+        Tariff.objects.create(company=cls.company, meter_type='water_cold', price=Decimal('1.50'),
+                              valid_from=datetime.date(2026, 1, 21))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.company.owner)
+
+    def test_index_caps_open_periods(self):
+        day = datetime.date
+        index = TariffIndex([
+            ('gas', day(2026, 3, 1), None, Decimal('0.70')),
+            ('gas', day(2026, 1, 1), None, Decimal('0.60')),
+            ('gas', day(2026, 5, 1), day(2026, 5, 31), Decimal('0.80')),
+        ])
+        self.assertEqual(index.price_at('gas', day(2026, 2, 28)), Decimal('0.60'))
+        self.assertIsNone(index.price_at('gas', day(2026, 6, 1)))
+        self.assertEqual(index.segments('gas', day(2025, 12, 30), day(2026, 6, 2), Decimal('9')), [
+            (day(2025, 12, 30), day(2025, 12, 31), Decimal('9')),
+            (day(2026, 1, 1), day(2026, 2, 28), Decimal('0.60')),
+            (day(2026, 3, 1), day(2026, 4, 30), Decimal('0.70')),
+            (day(2026, 5, 1), day(2026, 5, 31), Decimal('0.80')),
+            (day(2026, 6, 1), day(2026, 6, 2), Decimal('9')),
+        ])
+
+    def test_batch_splits_consumption_across_tariffs(self):
+        with self.assertNumQueries(2):
+            items = meter_charges(self.company.id, self.meters)
+        self.assertEqual([(item['quantity'], item['unit_price']) for item in items], [
+            (Decimal('19.00'), Decimal('1.00')), (Decimal('11.00'), Decimal('1.50')),
+            (Decimal('9.00'), Decimal('1.00')), (Decimal('11.00'), Decimal('1.50')),
+        ])
+        self.assertIn('(01.01.2026 - 20.01.2026)', items[0]['description'])
+        # Tarifi tiek ņemti no keša
+        with self.assertNumQueries(1):
+            meter_charges(self.company.id, self.meters)
+
+    def test_tariff_changes_invalidate_cache(self):
+        self.assertEqual(get_tariff_index(self.company.id).price_at('water_cold', datetime.date(2026, 3, 1)),
+                         Decimal('1.50'))
+        self.client.post(reverse('properties:tariff_list', args=[self.company.slug]), {
+            'meter_type': 'water_cold', 'price': '1.80', 'valid_from': '2026-03-01',
+        })
+        self.assertEqual(get_tariff_index(self.company.id).price_at('water_cold', datetime.date(2026, 3, 1)),
+                         Decimal('1.80'))
+
+        tariff = Tariff.objects.get(company=self.company, valid_from=datetime.date(2026, 3, 1))
+        self.client.post(reverse('properties:tariff_delete', args=[self.company.slug, tariff.id]))
+        self.assertEqual(get_tariff_index(self.company.id).price_at('water_cold', datetime.date(2026, 3, 1)),
+                         Decimal('1.50'))
+
+    def test_duplicate_and_inverted_tariffs_rejected(self):
+        form = self.client.post(reverse('properties:tariff_list', args=[self.company.slug]), {
+            'meter_type': 'water_cold', 'price': '1.80', 'valid_from': '2026-01-21', 'valid_to': '2026-01-01',
+        }).context['form']
+        self.assertEqual(set(form.errors), {'valid_from', 'valid_to'})
+
+    def test_invoice_uses_tariff_periods(self):
+        lease = Lease.objects.get(unit=self.units[0])
+        url = reverse('invoices:invoice_create', args=[self.company.slug, lease.id])
+        items = [item for item in self.client.get(url).context['items_to_include'] if item.get('type') == 'utility']
+        self.assertEqual([(item['quantity'], item['unit_price']) for item in items],
+                         [(Decimal('19.00'), Decimal('1.00')), (Decimal('11.00'), Decimal('1.50'))])
+
+
+class MeterAnomalyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=1, months=1, meters_per_unit=0,
+                       occupancy=0, issues_per_property=0, seed=12)
+        cls.unit = Unit.objects.get(company=cls.company)
+        cls.meter = UnitMeter.objects.create(company=cls.company, unit=cls.unit, meter_type='water_cold',
+                                             meter_number='A-1')
+        # Stabils patēriņš ~10 mēnesī, kļūdaini ievadīts 10x rādījums un samazinājums
+        values = [100, 110, 121, 130, 140, 1500, 161, 150, 180]
+        MeterReading.objects.bulk_create(
+            MeterReading(company=cls.company, meter=cls.meter, reading=value, reading_date=datetime.date(2026, month, 1),
+                         is_verified=True)
+            for month, value in enumerate(values, start=1)
+        )
+        MeterReading.objects.filter(meter=cls.meter, reading__in=[1500, 150]).update(is_verified=False)
+
+    def setUp(self):
+        self.client.force_login(self.company.owner)
+
+    def flags(self):
+        return list(MeterReading.objects.filter(meter=self.meter).order_by('reading_date').values_list('anomaly', flat=True))
+
+    def test_scan_skips_unconfirmed_baseline(self):
+        day = datetime.date
+        series = [(Decimal(value), day(2026, month, 1), False) for month, value in
+                  enumerate([0, 10, 20, 30, 41, 400, 52, 45, 62], start=1)]
+        self.assertEqual([anomaly for anomaly, _ in scan(series)],
+                         ['', '', '', '', '', 'spike', '', 'decrease', ''])
+
+    def test_batch_flags_outliers_once(self):
+        self.assertEqual(detect_anomalies(self.company), 2)
+        self.assertEqual(self.flags(), ['', '', '', '', '', 'spike', '', 'decrease', ''])
+        # Nemainītas vērtības netiek saglabātas atkārtoti
+        with self.assertNumQueries(1):
+            detect_anomalies(self.company)
+
+    def test_manager_spike_goes_to_review_queue(self):
+        detect_anomalies(self.company)
+        url = reverse('properties:meter_reading_add',
+                      args=[self.company.slug, self.unit.property_id, self.unit.id, self.meter.id])
+        self.client.post(url, {'reading': '900', 'reading_date': '2026-10-01'})
+        reading = MeterReading.objects.get(meter=self.meter, reading=900)
+        self.assertEqual((reading.anomaly, reading.is_verified), ('spike', False))
+
+        queue_url = reverse('properties:company_meter_readings', args=[self.company.slug])
+        queue = self.client.get(queue_url, {'verification': 'flagged'}).context['readings']
+        self.assertEqual([r.reading for r in queue], [Decimal('150.00'), Decimal('1500.00'), Decimal('900.00')])
+
+        # Verificēta vērtība kļūst par bāzi, un nākamais rādījums vairs nav aizdomīgs
+        self.client.post(reverse('properties:verify_meter_reading', args=[self.company.slug, reading.id]))
+        self.client.post(url, {'reading': '910', 'reading_date': '2026-11-01'})
+        self.assertEqual(MeterReading.objects.get(meter=self.meter, reading=910).anomaly, '')
+        self.assertEqual(len(self.client.get(queue_url, {'verification': 'flagged'}).context['readings']), 2)
+
+
+class EstimatedReadingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=2, months=1, meters_per_unit=0,
+                       occupancy=1, issues_per_property=0, seed=13)
+        cls.unit, other_unit = Unit.objects.filter(company=cls.company).order_by('unit_number')
+        cls.meter = UnitMeter.objects.create(company=cls.company, unit=cls.unit, meter_type='water_cold',
+                                             meter_number='E-1', tariff=Decimal('2.00'))
+        # Janvārī patēriņš 1 vienība dienā, pārējos mēnešos 0.5
+        value = Decimal('100')
+        readings = [MeterReading(company=cls.company, meter=cls.meter, reading=value,
+                                 reading_date=datetime.date(2024, 12, 31))]
+        for month in range(1, 13):
+            first, last = month_period(datetime.date(2025, month, 1))
+            value += Decimal(last.day) * (1 if month == 1 else Decimal('0.5'))
+            readings.append(MeterReading(company=cls.company, meter=cls.meter, reading=value, reading_date=last))
+        # Skaitītājs bez vēstures netiek aprēķināts
+        new_meter = UnitMeter.objects.create(company=cls.company, unit=other_unit, meter_type='water_cold',
+                                             meter_number='E-2')
+        readings.append(MeterReading(company=cls.company, meter=new_meter, reading=5,
+                                     reading_date=datetime.date(2025, 12, 31)))
+        MeterReading.objects.bulk_create(readings)
+        cls.base = value
+
+    def setUp(self):
+        self.client.force_login(self.company.owner)
+
+    def estimate_january(self):
+        return estimate_readings(self.company, datetime.date(2026, 1, 1), datetime.date(2026, 1, 31))
+
+    def utility_items(self):
+        lease = Lease.objects.get(unit=self.unit)
+        url = reverse('invoices:invoice_create', args=[self.company.slug, lease.id])
+        return [(item['quantity'], item['unit_price'], item['description'])
+                for item in self.client.get(url).context['items_to_include'] if item.get('type') == 'utility']
+
+    def test_bulk_estimate_uses_seasonal_rate(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.estimate_january(), 1)
+        estimate = MeterReading.objects.get(is_estimated=True)
+        self.assertEqual((estimate.meter, estimate.reading, estimate.reading_date),
+                         (self.meter, self.base + 31, datetime.date(2026, 1, 31)))
+        # Periodā jau ir rādījums
+        self.assertEqual(self.estimate_january(), 0)
+
+        (quantity, price, description), = self.utility_items()
+        self.assertEqual((quantity, price), (Decimal('31.00'), Decimal('2.00')))
+        self.assertIn('aprēķināts', description)
+
+    def test_real_reading_reconciles_estimate(self):
+        self.estimate_january()
+        url = reverse('properties:meter_reading_add',
+                      args=[self.company.slug, self.unit.property_id, self.unit.id, self.meter.id])
+        # Faktiskais rādījums ir mazāks par aprēķināto - nākamajā rēķinā starpība tiek atmaksāta
+        self.client.post(url, {'reading': str(self.base + 20), 'reading_date': '2026-02-03'})
+        reading = MeterReading.objects.get(meter=self.meter, reading_date=datetime.date(2026, 2, 3))
+        self.assertEqual((reading.anomaly, reading.is_verified), ('', True))
+
+        (quantity, price, description), = self.utility_items()
+        self.assertEqual((quantity, price), (Decimal('-11.00'), Decimal('2.00')))
+        self.assertIn('korekcija', description)
+
+    def test_backdated_reading_replaces_estimate(self):
+        self.estimate_january()
+        url = reverse('properties:meter_reading_add',
+                      args=[self.company.slug, self.unit.property_id, self.unit.id, self.meter.id])
+        self.client.post(url, {'reading': str(self.base + 25), 'reading_date': '2026-01-28'})
+        self.assertFalse(MeterReading.objects.filter(meter=self.meter, is_estimated=True).exists())
 
-# Create your tests here.
+    def test_estimate_view_requires_finished_month(self):
+        url = reverse('properties:estimate_meter_readings', args=[self.company.slug])
+        self.client.post(url, {'period': timezone.localdate().strftime('%Y-%m')})
+        self.assertFalse(MeterReading.objects.filter(is_estimated=True).exists())
+        self.client.post(url, {'period': '2026-01'})
+        self.assertTrue(MeterReading.objects.filter(meter=self.meter, is_estimated=True).exists())
@@ -9,6 +9,9 @@ urlpatterns = [
     path('<uuid:pk>/', views.property_detail, name='property_detail'),
     path('<uuid:pk>/edit/', views.property_edit, name='property_edit'),
     path('<uuid:pk>/delete/', views.property_delete, name='property_delete'),
+    path('<uuid:pk>/export/', views.property_export, name='property_export'),
+    path('<uuid:pk>/building-consumption/add/', views.building_consumption_add, name='building_consumption_add'),
+    path('<uuid:property_pk>/building-consumption/<uuid:pk>/', views.building_consumption_detail, name='building_consumption_detail'),
     path('<uuid:pk>/units/create/', views.unit_create, name='unit_create'),
     path('<uuid:property_pk>/units/<uuid:pk>/', views.unit_detail, name='unit_detail'),
     path('<uuid:property_pk>/units/<uuid:unit_pk>/edit/', views.unit_edit, name='unit_edit'),
@@ -20,6 +23,9 @@ urlpatterns = [
     path('<uuid:property_pk>/units/<uuid:pk>/meters/<uuid:meter_pk>/delete/', views.unit_meter_delete, name='unit_meter_delete'),
     path('<uuid:property_pk>/units/<uuid:pk>/meters/<uuid:meter_pk>/readings/add/', views.meter_reading_add, name='meter_reading_add'),
     path('<uuid:property_pk>/units/<uuid:pk>/meters/<uuid:meter_pk>/readings/<uuid:reading_pk>/delete/', views.meter_reading_delete, name='meter_reading_delete'),
+    path('tariffs/', views.tariff_list, name='tariff_list'),
+    path('tariffs/<uuid:pk>/delete/', views.tariff_delete, name='tariff_delete'),
     path('meters/readings/', views.company_meter_readings, name='company_meter_readings'),
     path('meters/readings/<uuid:pk>/verify/', views.verify_meter_reading, name='verify_meter_reading'),
+    path('meters/readings/estimate/', views.estimate_meter_readings, name='estimate_meter_readings'),
 ]
\ No newline at end of file
@@ -2,13 +2,20 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.urls import reverse
+from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
+from django.db.models import F
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from .models import Property, Unit, UnitMeter, MeterReading
-from .forms import PropertyForm, UnitForm, UnitMeterForm, MeterReadingForm
+from .allocation import allocate
+from .anomalies import detect_anomalies, flag_reading
+from .estimates import estimate_readings, month_period, reconcile_estimates
+from .models import BUILDING_METER_TYPES, BuildingConsumption, Property, Tariff, Unit, UnitMeter, MeterReading
+from .forms import BuildingConsumptionForm, PropertyForm, TariffForm, UnitForm, UnitMeterForm, MeterReadingForm
 from core.decorators import tenant_required
+from search.autocomplete import selected_choice
+from core.exports import export_response, property_export_entries
 from tenant_portal.models import TenantInvitation
 from utils.utils import send_lease_invitation_email
 from leases.forms import LeaseCreateForm
@@ -187,6 +194,8 @@ def property_detail(request, company_slug, pk):
         'total_area': total_area,
         'average_area': average_area,
         'available_floors': available_floors,
+        'has_building_meters': any(getattr(property, f'has_building_{meter_type}_meter') for meter_type in BUILDING_METER_TYPES),
+        'building_consumptions': property.building_consumptions.all()[:6],
         'filters': {
             'floor': floor,
             'unit_type': unit_type,
@@ -261,6 +270,80 @@ def property_delete(request, company_slug, pk):
     })
 
 
+@login_required
+@tenant_required
+def property_export(request, company_slug, pk):
+    """Lejupielādē visus īpašuma dokumentus un problēmu attēlus vienā zip arhīvā"""
+    property = get_object_or_404(Property, id=pk, company=request.tenant)
+    
+    # Pārbaudam vai lietotājam ir tiesības
+    if not (request.user == request.tenant.owner or request.user.company_memberships.filter(
+            company=request.tenant, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību eksportēt šī īpašuma dokumentus.")
+        return redirect('properties:property_detail', company_slug=company_slug, pk=pk)
+    
+    return export_response(property_export_entries(property), f"property_{property.id}.zip")
+
+
+@login_required
+@tenant_required
+def building_consumption_add(request, company_slug, pk):
+    """Ēkas skaitītāja patēriņa ievade un sadale pa telpām"""
+    company = request.tenant
+    property = get_object_or_404(Property, id=pk, company=company)
+
+    # Pārbaudam tiesības
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību sadalīt ēkas izmaksas.")
+        return redirect('properties:property_detail', company_slug=company_slug, pk=pk)
+
+    if request.method == 'POST':
+        form = BuildingConsumptionForm(request.POST, property=property)
+        if form.is_valid():
+            record = form.save(commit=False)
+            record.property = property
+            record.company = company
+            record.save()
+            allocate([record])
+            messages.success(request, 'Ēkas patēriņš sadalīts pa telpām.')
+            return redirect('properties:building_consumption_detail', company_slug=company_slug,
+                            property_pk=pk, pk=record.pk)
+    else:
+        form = BuildingConsumptionForm(property=property)
+
+    return render(request, 'properties/building_consumption_form.html', {
+        'form': form,
+        'property': property,
+        'company': company,
+        'active_page': 'properties'
+    })
+
+
+@login_required
+@tenant_required
+def building_consumption_detail(request, company_slug, property_pk, pk):
+    """Ēkas patēriņa sadalījums pa telpām"""
+    company = request.tenant
+    property = get_object_or_404(Property, id=property_pk, company=company)
+    record = get_object_or_404(BuildingConsumption, id=pk, property=property, company=company)
+
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību skatīt ēkas izmaksu sadalījumu.")
+        return redirect('properties:property_detail', company_slug=company_slug, pk=property_pk)
+
+    allocations = record.allocations.select_related('unit', 'invoice_item__invoice').order_by('unit__unit_number')
+
+    return render(request, 'properties/building_consumption_detail.html', {
+        'record': record,
+        'allocations': allocations,
+        'property': property,
+        'company': company,
+        'active_page': 'properties'
+    })
+
+
 @login_required
 @tenant_required
 def unit_create(request, company_slug, pk):
@@ -677,16 +760,21 @@ def meter_reading_add(request, company_slug, property_pk, pk, meter_pk):
             reading.meter = meter
             reading.submitted_by = request.user
             reading.company = company  # Piesaistām tenant
+            flag_reading(reading)
             
-            # Ja ievada property manager vai owner, automātiski verificējam
-            if is_admin_or_manager:
+            # Ja ievada property manager vai owner, automātiski verificējam; aizdomīgi rādījumi paliek pārbaudei
+            if is_admin_or_manager and not reading.anomaly:
                 reading.is_verified = True
                 reading.verified_by = request.user
                 reading.verification_date = timezone.now()
             
             reading.save()
+            reconcile_estimates(reading)
             
-            messages.success(request, 'Rādījums veiksmīgi pievienots.')
+            if reading.anomaly:
+                messages.warning(request, f"Rādījums pievienots, bet atzīmēts pārbaudei: {reading.get_anomaly_display()}.")
+            else:
+                messages.success(request, 'Rādījums veiksmīgi pievienots.')
             
             # Atkarībā no lietotāja lomas, novirzām uz dažādām lapām
             if is_tenant:
@@ -725,6 +813,8 @@ def meter_reading_delete(request, company_slug, property_pk, pk, meter_pk, readi
 
     if request.method == 'POST':
         reading.delete()
+        # Nākamie rādījumi tiek pārvērtēti pret atlikušo vēsturi
+        detect_anomalies(company, meters=[meter])
         messages.success(request, 'Rādījums veiksmīgi dzēsts.')
         return redirect('properties:unit_meter_detail', 
                        company_slug=company_slug, property_pk=property_pk, pk=pk, meter_pk=meter_pk)
@@ -764,49 +854,57 @@ def company_meter_readings(request, company_slug):
     
     # Filtrēšana
     property_id = request.GET.get('property')
+    unit_id = request.GET.get('unit')
     verification = request.GET.get('verification')
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     
     if property_id:
         readings = readings.filter(meter__unit__property_id=property_id)
-        # Get units for selected property
-        units = Unit.objects.filter(property_id=property_id, company=company)
-        unit_id = request.GET.get('unit')
-        if unit_id:
-            readings = readings.filter(meter__unit_id=unit_id)
+    if unit_id:
+        readings = readings.filter(meter__unit_id=unit_id)
     
     if verification:
         if verification == 'verified':
             readings = readings.filter(is_verified=True)
         elif verification == 'unverified':
             readings = readings.filter(is_verified=False)
+        elif verification == 'flagged':
+            # Pārbaudes rinda - vispirms samazinājumi, tad lielākās novirzes
+            readings = readings.filter(is_verified=False).exclude(anomaly='').order_by(
+                F('anomaly_score').desc(nulls_first=True), '-reading_date'
+            )
     
     if date_from:
         readings = readings.filter(reading_date__gte=date_from)
     if date_to:
         readings = readings.filter(reading_date__lte=date_to)
     
-    # Get properties for filter
-    properties = Property.objects.filter(company=company)
-    
     # Pagination
     paginator = Paginator(readings, 20)
     page = request.GET.get('page')
     readings = paginator.get_page(page)
     
+    # Filtros tiek ielādēti tikai izvēlētie ieraksti; pārējos piedāvā autocomplete
+    property_choice = selected_choice(Property.objects.filter(company=company), property_id, lambda p: p.address)
+    unit_choice = selected_choice(
+        Unit.objects.filter(company=company).select_related('property'), unit_id,
+        lambda u: u.unit_number if property_choice else f"{u.property.address} - {u.unit_number}"
+    )
+    
     return render(request, 'properties/company_meter_readings.html', {
         'readings': readings,
         'company': company,
-        'properties': properties,
-        'units': units if 'units' in locals() else None,
+        'property_choice': property_choice,
+        'unit_choice': unit_choice,
         'filters': {
             'property_id': property_id,
-            'unit_id': unit_id if 'unit_id' in locals() else None,
+            'unit_id': unit_id,
             'verification': verification,
             'date_from': date_from,
             'date_to': date_to
         },
+        'estimate_period': (timezone.localdate().replace(day=1) - timedelta(days=1)).strftime('%Y-%m'),
         'active_page': 'meters'  # Izmantojam 'meters' lai aktivizētu skaitītāju sadaļu sidebarā
     })
 
@@ -831,7 +929,85 @@ def verify_meter_reading(request, company_slug, pk):
         reading.verified_by = request.user
         reading.verification_date = timezone.now()
         reading.save()
+        if reading.anomaly:
+            # Verificēts rādījums kļūst par bāzi skaitītāja nākamajiem rādījumiem
+            detect_anomalies(company, meters=[reading.meter_id])
         
         messages.success(request, 'Skaitītāja rādījums veiksmīgi verificēts.')
     
-    return redirect('properties:company_meter_readings', company_slug=company_slug)
\ No newline at end of file
+    return redirect('properties:company_meter_readings', company_slug=company_slug)
+
+
+@login_required
+@tenant_required
+def tariff_list(request, company_slug):
+    """Uzņēmuma skaitītāju tarifi ar spēkā esamības periodiem"""
+    company = request.tenant
+
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību pārvaldīt tarifus.")
+        return redirect('companies_tenant:company_detail', company_slug=company_slug)
+
+    if request.method == 'POST':
+        form = TariffForm(request.POST, company=company)
+        if form.is_valid():
+            tariff = form.save(commit=False)
+            tariff.company = company
+            tariff.save()
+            messages.success(request, 'Tarifs veiksmīgi pievienots.')
+            return redirect('properties:tariff_list', company_slug=company_slug)
+    else:
+        form = TariffForm(company=company)
+
+    return render(request, 'properties/tariff_list.html', {
+        'form': form,
+        'tariffs': Tariff.objects.filter(company=company),
+        'company': company,
+        'active_page': 'meter_readings'
+    })
+
+
+@login_required
+@tenant_required
+@require_POST
+def tariff_delete(request, company_slug, pk):
+    company = request.tenant
+
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību pārvaldīt tarifus.")
+        return redirect('companies_tenant:company_detail', company_slug=company_slug)
+
+    tariff = get_object_or_404(Tariff, id=pk, company=company)
+    tariff.delete()
+    messages.success(request, 'Tarifs dzēsts.')
+    return redirect('properties:tariff_list', company_slug=company_slug)
+
+
+@login_required
+@tenant_required
+@require_POST
+def estimate_meter_readings(request, company_slug):
+    """Aprēķina rādījumus visiem aktīvajiem skaitītājiem, kuriem mēnesī nav iesniegts rādījums"""
+    company = request.tenant
+
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, 'Jums nav tiesību aprēķināt rādījumus.')
+        return redirect('properties:company_meter_readings', company_slug=company_slug)
+
+    try:
+        period_start, period_end = month_period(datetime.strptime(request.POST.get('period', ''), '%Y-%m').date())
+    except ValueError:
+        messages.error(request, "Nederīgs periods.")
+        return redirect('properties:company_meter_readings', company_slug=company_slug)
+
+    if period_end >= timezone.localdate():
+        messages.error(request, "Rādījumus var aprēķināt tikai beigušamies mēnesim.")
+        return redirect('properties:company_meter_readings', company_slug=company_slug)
+
+    created = estimate_readings(company, period_start, period_end)
+    messages.success(request, f"Aprēķināti {created} trūkstošie rādījumi par {period_start.strftime('%m.%Y')}.")
+    url = reverse('properties:company_meter_readings', kwargs={'company_slug': company_slug})
+    return redirect(f"{url}?date_from={period_end.isoformat()}&date_to={period_end.isoformat()}")
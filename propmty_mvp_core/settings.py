@@ -15,6 +15,9 @@ from dotenv import load_dotenv
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# .env jāielādē pirms jebkura os.getenv izsaukuma zemāk
+load_dotenv()
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -37,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'storages',
     'core',
     'users',
@@ -47,11 +51,14 @@ INSTALLED_APPS = [
     'tenant_portal',
     'inspections',
     'invoices',
+    'reports',
+    'search',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -62,21 +69,57 @@ MIDDLEWARE = [
     'core.middleware.SubscriptionCheckMiddleware',
 ]
 
+# Vaicājumu un latentuma mērīšana (core.middleware.InstrumentationMiddleware)
+INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'False') == 'True'
+INSTRUMENTATION_SAMPLE_RATE = float(os.getenv('INSTRUMENTATION_SAMPLE_RATE', 1.0))
+INSTRUMENTATION_QUERY_BUDGET = int(os.getenv('INSTRUMENTATION_QUERY_BUDGET', 30))
+INSTRUMENTATION_LOG_REQUESTS = os.getenv('INSTRUMENTATION_LOG_REQUESTS', 'False') == 'True'
+# Renderēšanas laiks pa šabloniem un {% include %} (darbojas kopā ar INSTRUMENTATION_ENABLED)
+TEMPLATE_PROFILING = os.getenv('TEMPLATE_PROFILING', 'False') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 AUTH_USER_MODEL = 'users.User'
 
 ROOT_URLCONF = 'propmty_mvp_core.urls'
 
+# Kompilētu šablonu kešošana; ieslēgta vienmēr (arī ar DEBUG). Šablonu izstrādei
+# var izslēgt ar TEMPLATE_CACHE=False - tad izmaiņas redzamas bez restarta
+TEMPLATE_CACHE = os.getenv('TEMPLATE_CACHE', 'True') == 'True'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATE_CACHE:
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.chrome',
             ],
         },
     },
@@ -84,6 +127,31 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'propmty_mvp_core.wsgi.application'
 
+# Kešatmiņa - ar vairākiem procesiem jāizmanto kopīgs Redis, citādi katram
+# procesam ir sava LocMem kešatmiņa un invalidācija nesasniedz pārējos
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Navbar un sidebar fragmentu kešošanas laiks sekundēs
+CHROME_CACHE_TIMEOUT = int(os.getenv('CHROME_CACHE_TIMEOUT', 3600))
+
+# Filtru autocomplete rezultātu kešošanas laiks sekundēs (search.autocomplete)
+AUTOCOMPLETE_CACHE_TIMEOUT = int(os.getenv('AUTOCOMPLETE_CACHE_TIMEOUT', 300))
+
+# Uzņēmuma tarifu keša laiks sekundēs; izmaiņas kešu notīra uzreiz (properties.tariffs)
+TARIFF_CACHE_TIMEOUT = int(os.getenv('TARIFF_CACHE_TIMEOUT', 3600))
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -95,7 +163,12 @@ WSGI_APPLICATION = 'propmty_mvp_core.wsgi.application'
 #     }
 # }
 
-load_dotenv()
+# Savienojumi ar datubāzi (noklusējumā - jauns savienojums katram pieprasījumam):
+# - ASGI (async skati): DB_POOL=True ieslēdz psycopg savienojumu pūlu. Pastāvīgus
+#   savienojumus ar ASGI neizmanto - katrs pieprasījums darbojas savā pavedienā,
+#   tāpēc savienojumi uzkrājas, nevis tiek izmantoti atkārtoti
+# - tikai WSGI: DB_CONN_MAX_AGE sekundes ieslēdz pastāvīgus savienojumus ar veselības pārbaudi
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
 
 DATABASES = {
     'default': {
@@ -104,10 +177,20 @@ DATABASES = {
         'USER': os.getenv("DB_USER"),
         'PASSWORD': os.getenv("DB_PASSWORD"),
         'HOST': os.getenv("DB_HOST"),
-        'OPTIONS': {'sslmode': 'require'},
+        'PORT': os.getenv("DB_PORT", ''),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'OPTIONS': {'sslmode': os.getenv('DB_SSLMODE', 'require')},
     }
 }
 
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+        'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -191,6 +274,16 @@ MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/'
 MEDIA_ROOT = ''  # Šis nav nepieciešams, kad izmantojam S3
 
 
+# Rēķinu PDF fonts - noklusējuma Helvetica neatbalsta latviešu burtus
+INVOICE_PDF_FONT = os.getenv('INVOICE_PDF_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+INVOICE_PDF_FONT_BOLD = os.getenv('INVOICE_PDF_FONT_BOLD', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
+
+# Atskaites - atvērto periodu kešošanas laiks sekundēs un dienas pēc perioda
+# beigām, kad periods tiek uzskatīts par slēgtu un rezultāts vairs netiek pārrēķināts
+REPORTS_CACHE_TIMEOUT = int(os.getenv('REPORTS_CACHE_TIMEOUT', 300))
+REPORTS_FINAL_AFTER_DAYS = int(os.getenv('REPORTS_FINAL_AFTER_DAYS', 45))
+
+
 # Static files konfigurācija - izmantojam WhiteNoise
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]
@@ -18,9 +18,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.views import instrumentation_stats
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('_instrumentation/', instrumentation_stats, name='instrumentation_stats'),
     path('', include('users.urls')),
     path('tenant/', include('tenant_portal.urls')),
     path('companies/', include('companies.public_urls')),  # Publiskie company skati (list, create)
@@ -29,5 +31,7 @@ urlpatterns = [
     path('<slug:company_slug>/leases/', include('leases.urls')),
     path('<slug:company_slug>/inspections/', include('inspections.urls')),
     path('<slug:company_slug>/invoices/', include('invoices.urls')),
+    path('<slug:company_slug>/reports/', include('reports.urls')),
+    path('<slug:company_slug>/search/', include('search.urls')),
 
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,31 @@
+from django.contrib import admin
+from core.admin import TenantModelAdmin
+from .models import IssueDailyStats, ReportSnapshot, OccupancySnapshot
+
+
+@admin.register(ReportSnapshot)
+class ReportSnapshotAdmin(TenantModelAdmin):
+    list_display = ('company', 'period', 'is_final', 'updated_at')
+    list_select_related = ('company',)
+    list_filter = ('is_final',)
+    search_fields = ('company__name',)
+    date_hierarchy = 'period'
+
+
+@admin.register(OccupancySnapshot)
+class OccupancySnapshotAdmin(TenantModelAdmin):
+    list_display = ('property', 'date', 'total_units', 'rented_units', 'available_units')
+    list_select_related = ('property',)
+    search_fields = ('property__address',)
+    autocomplete_fields = ('company', 'property')
+    date_hierarchy = 'date'
+
+
+@admin.register(IssueDailyStats)
+class IssueDailyStatsAdmin(TenantModelAdmin):
+    list_display = ('property', 'date', 'priority', 'opened', 'resolved', 'maintenance_cost')
+    list_select_related = ('property',)
+    list_filter = ('priority',)
+    search_fields = ('property__address',)
+    autocomplete_fields = ('company', 'property')
+    date_hierarchy = 'date'
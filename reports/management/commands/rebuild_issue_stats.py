@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from companies.models import Company
+from reports.sla import rebuild_issue_stats
+
+
+class Command(BaseCommand):
+    help = 'Pārrēķina problēmu SLA dienas kopsavilkumu no vēstures (pirmā aizpilde vai pēc importa)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='Tikai norādītā uzņēmuma slug')
+
+    def handle(self, *args, **options):
+        companies = None
+        if options['company']:
+            companies = Company.objects.filter(slug=options['company'])
+            if not companies.exists():
+                raise CommandError(f"Uzņēmums '{options['company']}' nav atrasts")
+
+        count = rebuild_issue_stats(companies)
+        self.stdout.write(self.style.SUCCESS(f"Saglabātas {count} SLA kopsavilkuma rindas"))
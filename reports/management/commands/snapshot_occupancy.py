@@ -0,0 +1,44 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from companies.models import Company
+from reports.occupancy import backfill_snapshots, take_snapshot
+
+
+def _parse_date(value):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Nederīgs datums '{value}', jābūt formātā YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'Saglabā ikdienas telpu noslodzes momentuzņēmumu (palaist reizi dienā)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='Tikai norādītā uzņēmuma slug')
+        parser.add_argument('--date', help='Momentuzņēmuma datums (noklusējums: šodiena)')
+        parser.add_argument('--backfill-from', help='Aizpildīt vēsturi no līgumiem sākot ar datumu YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        companies = None
+        if options['company']:
+            companies = Company.objects.filter(slug=options['company'])
+            if not companies.exists():
+                raise CommandError(f"Uzņēmums '{options['company']}' nav atrasts")
+
+        date = _parse_date(options['date']) if options['date'] else timezone.localdate()
+
+        if options['backfill_from']:
+            start = _parse_date(options['backfill_from'])
+            # Vēsture beidzas dienu pirms šodienas momentuzņēmuma
+            end = date - datetime.timedelta(days=1)
+            if start > end:
+                raise CommandError("Sākuma datumam jābūt pirms momentuzņēmuma datuma")
+            created = backfill_snapshots(start, end, companies)
+            self.stdout.write(f"Vēsture {start} - {end}: izveidoti {created} ieraksti")
+
+        count = take_snapshot(date, companies)
+        self.stdout.write(self.style.SUCCESS(f"{date}: saglabāti {count} īpašumu momentuzņēmumi"))
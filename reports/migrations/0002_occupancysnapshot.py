@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:13
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('properties', '0004_unitmeter_tariff'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancySnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('total_units', models.IntegerField(default=0)),
+                ('rented_units', models.IntegerField(default=0)),
+                ('available_units', models.IntegerField(default=0)),
+                ('maintenance_units', models.IntegerField(default=0)),
+                ('reserved_units', models.IntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_snapshots', to='properties.property')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['company', 'date'], name='reports_occ_company_4b0924_idx')],
+                'unique_together': {('property', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:50
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_alter_company_logo'),
+        ('properties', '0007_meterreading_meter_reading_date_idx'),
+        ('reports', '0002_occupancysnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueDailyStats',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('priority', models.CharField(max_length=20)),
+                ('opened', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('resolve_minutes', models.JSONField(default=list)),
+                ('maintenance_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='companies.company')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_daily_stats', to='properties.property')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['company', 'date'], name='reports_iss_company_3f2ef9_idx')],
+                'unique_together': {('property', 'date', 'priority')},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from core.models import TenantModel
+
+
+class ReportSnapshot(TenantModel):
+    """Slēgta perioda atskaites rezultāts, kas vairs netiek pārrēķināts"""
+    period = models.DateField()  # Mēneša pirmā diena
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    is_final = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('company', 'period')
+        ordering = ['-period']
+
+    def __str__(self):
+        return f"{self.company.name} - {self.period:%Y-%m}"
+
+
+class OccupancySnapshot(TenantModel):
+    """Īpašuma telpu statusu skaits vienā dienā"""
+    property = models.ForeignKey('properties.Property', on_delete=models.CASCADE, related_name='occupancy_snapshots')
+    date = models.DateField()
+    total_units = models.IntegerField(default=0)
+    rented_units = models.IntegerField(default=0)
+    available_units = models.IntegerField(default=0)
+    maintenance_units = models.IntegerField(default=0)
+    reserved_units = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('property', 'date')
+        indexes = [
+            models.Index(fields=['company', 'date']),
+        ]
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.property.address} - {self.date}"
+
+
+class IssueDailyStats(TenantModel):
+    """
+    Problēmu SLA dienas kopsavilkums īpašumam un prioritātei.
+
+    Tiek atjaunināts inkrementāli, mainoties problēmu statusam (reports.sla),
+    tāpēc SLA atskaites nolasa šīs rindas, nevis visu problēmu vēsturi.
+    """
+    property = models.ForeignKey('properties.Property', on_delete=models.CASCADE, related_name='issue_daily_stats')
+    date = models.DateField()
+    priority = models.CharField(max_length=20)
+    opened = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    # Katras šajā dienā atrisinātās problēmas ilgums minūtēs - mediānai un p90 par jebkuru periodu
+    resolve_minutes = models.JSONField(default=list)
+    maintenance_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('property', 'date', 'priority')
+        indexes = [
+            models.Index(fields=['company', 'date']),
+        ]
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.property.address} - {self.date} ({self.priority})"
@@ -0,0 +1,151 @@
+import datetime
+from collections import defaultdict
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth, TruncYear
+from django.utils import timezone
+
+from leases.models import Lease
+from properties.models import Unit
+from .models import OccupancySnapshot
+
+SNAPSHOT_FIELDS = ['total_units', 'rented_units', 'available_units', 'maintenance_units', 'reserved_units']
+
+GRANULARITIES = {
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+
+def take_snapshot(date=None, companies=None):
+    """
+    Saglabā telpu statusu skaitu pa īpašumiem uz norādīto dienu.
+
+    Viens agregāts vaicājums visām telpām un viens bulk ieraksts.
+    Atkārtoti izsaucot tajā pašā dienā, dati tiek pārrakstīti.
+    """
+    date = date or timezone.localdate()
+    units = Unit.objects.all()
+    if companies is not None:
+        units = units.filter(company__in=companies)
+
+    counts = units.values('company_id', 'property_id').annotate(
+        total_units=Count('id'),
+        rented_units=Count('id', filter=Q(status='rented')),
+        available_units=Count('id', filter=Q(status='available')),
+        maintenance_units=Count('id', filter=Q(status='maintenance')),
+        reserved_units=Count('id', filter=Q(status='reserved')),
+    ).order_by()
+
+    snapshots = [OccupancySnapshot(date=date, **row) for row in counts]
+    OccupancySnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['property', 'date'],
+        update_fields=SNAPSHOT_FIELDS + ['updated_at'],
+    )
+    return len(snapshots)
+
+
+def _merge_ranges(ranges):
+    """Apvieno pārklājošos datumu intervālus"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + datetime.timedelta(days=1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def backfill_snapshots(start, end, companies=None):
+    """
+    Aizpilda vēsturiskos momentuzņēmumus no līgumu datumu intervāliem.
+
+    Telpa skaitās izīrēta, ja tai dienā ir spēkā līgums (izņemot melnrakstus).
+    Remonta un rezervācijas statusi vēsturē nav zināmi, tāpēc pārējās telpas
+    skaitās brīvas. Esošie momentuzņēmumi netiek pārrakstīti.
+    Atgriež jaunizveidoto ierakstu skaitu.
+    """
+    units = Unit.objects.all()
+    leases = Lease.objects.filter(start_date__lte=end, end_date__gte=start).exclude(status='draft')
+    existing = OccupancySnapshot.objects.filter(date__gte=start, date__lte=end)
+    if companies is not None:
+        units = units.filter(company__in=companies)
+        leases = leases.filter(company__in=companies)
+        existing = existing.filter(company__in=companies)
+    # ignore_conflicts gadījumā bulk_create atgriež arī izlaistās rindas
+    before = existing.count()
+
+    properties = {
+        row['property_id']: row
+        for row in units.values('company_id', 'property_id').annotate(total_units=Count('id')).order_by()
+    }
+
+    unit_ranges = defaultdict(list)
+    for lease in leases.values('unit_id', 'unit__property_id', 'start_date', 'end_date'):
+        key = (lease['unit__property_id'], lease['unit_id'])
+        unit_ranges[key].append((max(lease['start_date'], start), min(lease['end_date'], end)))
+
+    # Izīrēto telpu skaita izmaiņas pa dienām katram īpašumam
+    days = (end - start).days + 1
+    deltas = defaultdict(lambda: [0] * (days + 1))
+    for (property_id, _), ranges in unit_ranges.items():
+        for range_start, range_end in _merge_ranges(ranges):
+            deltas[property_id][(range_start - start).days] += 1
+            deltas[property_id][(range_end - start).days + 1] -= 1
+
+    batch = []
+    for property_id, row in properties.items():
+        delta = deltas.get(property_id)
+        rented = 0
+        for offset in range(days):
+            if delta:
+                rented += delta[offset]
+            batch.append(OccupancySnapshot(
+                company_id=row['company_id'],
+                property_id=property_id,
+                date=start + datetime.timedelta(days=offset),
+                total_units=row['total_units'],
+                rented_units=min(rented, row['total_units']),
+                available_units=max(row['total_units'] - rented, 0),
+            ))
+            if len(batch) >= 1000:
+                OccupancySnapshot.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+    if batch:
+        OccupancySnapshot.objects.bulk_create(batch, ignore_conflicts=True)
+    return existing.count() - before
+
+
+def vacancy_series(company, start, end, granularity='month', property=None, by_property=False):
+    """
+    Noslodzes un brīvo telpu īpatsvars pa mēnešiem vai gadiem.
+
+    Aprēķināts no telpu-dienām, tāpēc daļēji aizpildīti periodi un
+    īpašumi ar dažādu telpu skaitu tiek svērti pareizi.
+    """
+    trunc = GRANULARITIES[granularity]
+    snapshots = OccupancySnapshot.objects.filter(company=company, date__gte=start, date__lte=end)
+    if property is not None:
+        snapshots = snapshots.filter(property=property)
+
+    group_by = ['period']
+    if by_property:
+        group_by += ['property_id', 'property__address']
+
+    rows = snapshots.annotate(period=trunc('date')).values(*group_by).annotate(
+        unit_days=Sum('total_units'),
+        occupied_days=Sum('rented_units'),
+        maintenance_days=Sum('maintenance_units'),
+        reserved_days=Sum('reserved_units'),
+    ).order_by(*group_by)
+
+    series = []
+    for row in rows:
+        unit_days = row['unit_days'] or 0
+        occupancy = row['occupied_days'] / unit_days if unit_days else 0
+        row['occupancy_rate'] = round(occupancy * 100, 1)
+        row['vacancy_rate'] = round((1 - occupancy) * 100, 1) if unit_days else 0
+        series.append(row)
+    return series
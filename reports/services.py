@@ -0,0 +1,274 @@
+import calendar
+import datetime
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from invoices.models import Invoice, InvoiceItem
+from inspections.models import Maintenance
+from leases.models import Lease
+from .models import ReportSnapshot
+
+# Jāpalielina, mainot atskaites struktūru, lai kešs tiktu pārrēķināts
+REPORT_VERSION = 1
+
+AGING_BUCKETS = [
+    ('current', 'Nav termiņš'),
+    ('days_1_30', '1-30 dienas'),
+    ('days_31_60', '31-60 dienas'),
+    ('days_61_90', '61-90 dienas'),
+    ('days_90_plus', '90+ dienas'),
+]
+
+ZERO = Decimal('0.00')
+
+MONEY_FIELDS = ('rent', 'billed', 'paid', 'outstanding', 'maintenance_cost')
+
+
+def month_bounds(period):
+    """Atgriež mēneša pirmo un pēdējo dienu"""
+    start = period.replace(day=1)
+    end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    return start, end
+
+
+def is_period_final(period_end, today=None):
+    """Periods ir slēgts, ja kopš tā beigām pagājis REPORTS_FINAL_AFTER_DAYS dienu"""
+    today = today or timezone.localdate()
+    return period_end + datetime.timedelta(days=settings.REPORTS_FINAL_AFTER_DAYS) < today
+
+
+def _property_row(rows, property_id, address):
+    if property_id not in rows:
+        rows[property_id] = {
+            'id': property_id,
+            'address': address,
+            'leases': 0,
+            'rent': ZERO,
+            'billed': ZERO,
+            'paid': ZERO,
+            'outstanding': ZERO,
+            'maintenance_cost': ZERO,
+            'maintenance_count': 0,
+            'aging': {key: ZERO for key, _ in AGING_BUCKETS},
+        }
+    return rows[property_id]
+
+
+def rent_roll(company, start, end):
+    """Periodā spēkā esošie līgumi"""
+    return Lease.objects.filter(
+        company=company,
+        start_date__lte=end,
+        end_date__gte=start,
+    ).exclude(status='draft').values(
+        'id', 'start_date', 'end_date', 'rent_amount', 'status',
+        property_id=F('unit__property_id'),
+        address=F('unit__property__address'),
+        unit_number=F('unit__unit_number'),
+        tenant_first_name=F('tenant__first_name'),
+        tenant_last_name=F('tenant__last_name'),
+    ).order_by('unit__property__address', 'unit__unit_number')
+
+
+def billed_invoices(company, start, end):
+    """Periodam izrakstītie rēķini (bez melnrakstiem un atceltajiem)"""
+    return Invoice.objects.filter(
+        company=company,
+        period_start__gte=start,
+        period_start__lte=end,
+    ).exclude(status__in=['draft', 'cancelled'])
+
+
+def billed_vs_paid(company, start, end):
+    """Izrakstītā un apmaksātā summa pa īpašumiem"""
+    return billed_invoices(company, start, end).values(
+        property_id=F('lease__unit__property_id'),
+        address=F('lease__unit__property__address'),
+    ).annotate(
+        billed=Sum('total_amount'),
+        paid=Sum('total_amount', filter=Q(status='paid')),
+    ).order_by()
+
+
+def billed_by_type(company, start, end):
+    """Izrakstītā summa pa rēķina pozīciju veidiem"""
+    return InvoiceItem.objects.filter(
+        invoice__in=billed_invoices(company, start, end),
+    ).values('type').annotate(
+        amount=Sum('amount'),
+        tax=Sum('tax_amount'),
+    ).order_by('type')
+
+
+def aging(company, as_of):
+    """
+    Neapmaksāto rēķinu sadalījums pēc kavējuma dienām uz datumu as_of.
+
+    Rēķins, kas apmaksāts pēc as_of, tiek uzskatīts par neapmaksātu,
+    tāpēc slēgta perioda rezultāts nemainās.
+    """
+    def due_between(oldest_days, newest_days):
+        newest = as_of - datetime.timedelta(days=newest_days)
+        if oldest_days is None:
+            return Q(due_date__lte=newest)
+        oldest = as_of - datetime.timedelta(days=oldest_days)
+        return Q(due_date__gte=oldest, due_date__lte=newest)
+
+    bucket_filters = {
+        'current': Q(due_date__gte=as_of),
+        'days_1_30': due_between(30, 1),
+        'days_31_60': due_between(60, 31),
+        'days_61_90': due_between(90, 61),
+        'days_90_plus': due_between(None, 91),
+    }
+    return Invoice.objects.filter(
+        company=company,
+        issue_date__lte=as_of,
+    ).exclude(
+        status__in=['draft', 'cancelled'],
+    ).filter(
+        ~Q(status='paid') | Q(paid_date__date__gt=as_of),
+    ).values(
+        property_id=F('lease__unit__property_id'),
+        address=F('lease__unit__property__address'),
+    ).annotate(
+        **{key: Sum('total_amount', filter=condition) for key, condition in bucket_filters.items()}
+    ).order_by()
+
+
+def maintenance_costs(company, start, end):
+    """Periodā pabeigto remontdarbu izmaksas pa īpašumiem"""
+    return Maintenance.objects.filter(
+        company=company,
+        status='completed',
+        completed_date__date__gte=start,
+        completed_date__date__lte=end,
+    ).values(
+        property_id=F('issue__unit__property_id'),
+        address=F('issue__unit__property__address'),
+    ).annotate(
+        cost=Sum('cost'),
+        count=Count('id'),
+    ).order_by()
+
+
+def build_report(company, period, today=None):
+    """Aprēķina uzņēmuma finanšu atskaiti vienam mēnesim"""
+    start, end = month_bounds(period)
+    today = today or timezone.localdate()
+    as_of = min(end, today)
+    properties = {}
+
+    leases = list(rent_roll(company, start, end))
+    for lease in leases:
+        row = _property_row(properties, lease['property_id'], lease['address'])
+        row['leases'] += 1
+        row['rent'] += lease['rent_amount']
+
+    for item in billed_vs_paid(company, start, end):
+        row = _property_row(properties, item['property_id'], item['address'])
+        row['billed'] = item['billed'] or ZERO
+        row['paid'] = item['paid'] or ZERO
+        row['outstanding'] = row['billed'] - row['paid']
+
+    for item in aging(company, as_of):
+        row = _property_row(properties, item['property_id'], item['address'])
+        row['aging'] = {key: item[key] or ZERO for key, _ in AGING_BUCKETS}
+
+    for item in maintenance_costs(company, start, end):
+        row = _property_row(properties, item['property_id'], item['address'])
+        row['maintenance_cost'] = item['cost'] or ZERO
+        row['maintenance_count'] = item['count']
+
+    rows = sorted(properties.values(), key=lambda row: row['address'].lower())
+    totals = {
+        key: sum((row[key] for row in rows), 0)
+        for key in ('leases', 'rent', 'billed', 'paid', 'outstanding', 'maintenance_cost', 'maintenance_count')
+    }
+    totals['aging'] = {key: sum((row['aging'][key] for row in rows), ZERO) for key, _ in AGING_BUCKETS}
+
+    type_labels = dict(InvoiceItem._meta.get_field('type').choices)
+    report = {
+        'version': REPORT_VERSION,
+        'period': start,
+        'period_end': end,
+        'as_of': as_of,
+        'computed_at': timezone.now(),
+        'properties': rows,
+        'totals': totals,
+        'rent_roll': leases,
+        'billed_by_type': [
+            {**item, 'label': type_labels.get(item['type'], item['type'])}
+            for item in billed_by_type(company, start, end)
+        ],
+    }
+    # Vienāds formāts kešam un ReportSnapshot.data
+    return json.loads(json.dumps(report, cls=DjangoJSONEncoder))
+
+
+def _decimals(row, keys):
+    for key in keys:
+        if row.get(key) is not None:
+            row[key] = Decimal(str(row[key]))
+
+
+def _restore(data):
+    """
+    Atjauno summas un datumus pēc JSON formāta.
+
+    DjangoJSONEncoder Decimal un datumus saglabā kā virknes, tāpēc gan
+    kešotā, gan ReportSnapshot.data atskaite pēc nolasīšanas tiek pārvērsta atpakaļ.
+    """
+    for key in ('period', 'period_end', 'as_of'):
+        data[key] = datetime.date.fromisoformat(data[key])
+    data['computed_at'] = parse_datetime(data['computed_at'])
+    for row in data['properties'] + [data['totals']]:
+        _decimals(row, MONEY_FIELDS)
+        _decimals(row['aging'], [key for key, _ in AGING_BUCKETS])
+    for lease in data['rent_roll']:
+        lease['start_date'] = datetime.date.fromisoformat(lease['start_date'])
+        lease['end_date'] = datetime.date.fromisoformat(lease['end_date'])
+        _decimals(lease, ['rent_amount'])
+    for item in data['billed_by_type']:
+        _decimals(item, ['amount', 'tax'])
+    return data
+
+
+def _cache_key(company, start):
+    return f"reports:{company.id}:{start:%Y-%m}:v{REPORT_VERSION}"
+
+
+def get_company_report(company, period):
+    """
+    Atgriež mēneša atskaiti no kešatmiņas vai aprēķina to.
+
+    Atvērtie periodi tiek kešoti uz REPORTS_CACHE_TIMEOUT sekundēm.
+    Slēgtie periodi tiek saglabāti ReportSnapshot tabulā un vairs netiek pārrēķināti.
+    Summas atgrieztas kā Decimal, datumi kā date neatkarīgi no avota.
+    """
+    start, end = month_bounds(period)
+
+    if is_period_final(end):
+        snapshot = ReportSnapshot.objects.filter(company=company, period=start, is_final=True).first()
+        if snapshot and snapshot.data.get('version') == REPORT_VERSION:
+            return _restore(snapshot.data)
+        data = build_report(company, start)
+        ReportSnapshot.objects.update_or_create(
+            company=company, period=start,
+            defaults={'data': data, 'is_final': True},
+        )
+        return _restore(data)
+
+    key = _cache_key(company, start)
+    data = cache.get(key)
+    if data is None:
+        data = build_report(company, start)
+        cache.set(key, data, settings.REPORTS_CACHE_TIMEOUT)
+    return _restore(data)
@@ -0,0 +1,216 @@
+"""
+Problēmu SLA dienas kopsavilkums (IssueDailyStats).
+
+Skati, kas maina problēmu un remontdarbu statusu, izsauc record_* funkcijas,
+kas pieskaita izmaiņas attiecīgās dienas rindai. rebuild_issue_stats
+pārrēķina rindas no vēstures - pirmajai aizpildei un pēc bulk importa.
+"""
+import math
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from inspections.models import RESOLVED_STATUSES, Issue, Maintenance
+from .models import IssueDailyStats
+
+PRIORITIES = ['critical', 'high', 'medium', 'low']
+PRIORITY_LABELS = dict(Issue._meta.get_field('priority').choices)
+DELTA_FIELDS = ['opened', 'resolved', 'resolve_minutes', 'maintenance_cost', 'updated_at']
+ZERO = Decimal('0')
+BATCH_SIZE = 1000
+
+
+def _new_delta():
+    return {'opened': 0, 'resolve_minutes': [], 'removed_minutes': [], 'maintenance_cost': ZERO}
+
+
+def _key(issue, moment):
+    """Rindas atslēga (company_id, property_id, date, priority); problēmai jābūt ielādētai ar unit"""
+    return issue.company_id, issue.unit.property_id, timezone.localdate(moment), issue.priority
+
+
+def _resolve_minutes(created_at, resolved_date):
+    return max(0, round((resolved_date - created_at).total_seconds() / 60))
+
+
+def apply_deltas(deltas):
+    """
+    Pieskaita izmaiņas dienas rindām: {(company_id, property_id, date, priority): delta}.
+
+    Trūkstošās rindas tiek izveidotas, esošās nobloķētas vienmēr vienā
+    secībā, tāpēc vienlaicīgi atjauninājumi nepazaudē vērtības un neveido
+    deadlock. Neatkarīgi no izmaiņu skaita - trīs vaicājumi.
+    """
+    if not deltas:
+        return
+    keys = sorted(deltas)
+    with transaction.atomic():
+        IssueDailyStats.objects.bulk_create([
+            IssueDailyStats(company_id=company_id, property_id=property_id, date=date, priority=priority)
+            for company_id, property_id, date, priority in keys
+        ], ignore_conflicts=True)
+
+        condition = Q()
+        for _, property_id, date, priority in keys:
+            condition |= Q(property_id=property_id, date=date, priority=priority)
+        rows = list(IssueDailyStats.objects.select_for_update().filter(condition).order_by(
+            'property_id', 'date', 'priority'
+        ))
+
+        now = timezone.now()
+        for row in rows:
+            delta = deltas[(row.company_id, row.property_id, row.date, row.priority)]
+            minutes = row.resolve_minutes + delta['resolve_minutes']
+            for value in delta['removed_minutes']:
+                if value in minutes:
+                    minutes.remove(value)
+            row.opened += delta['opened']
+            row.resolved += len(minutes) - len(row.resolve_minutes)
+            row.resolve_minutes = sorted(minutes)
+            row.maintenance_cost += delta['maintenance_cost']
+            row.updated_at = now
+        IssueDailyStats.objects.bulk_update(rows, DELTA_FIELDS)
+
+
+def record_issues_opened(issues):
+    deltas = defaultdict(_new_delta)
+    for issue in issues:
+        deltas[_key(issue, issue.created_at)]['opened'] += 1
+    apply_deltas(deltas)
+
+
+def record_issues_resolved(issues, previous=None):
+    """
+    Pieskaita atrisinātās problēmas resolved_date dienai; jāizsauc vienreiz, pārejot uz resolved/closed.
+
+    Atkārtoti atrisinātām problēmām previous ({issue.pk: iepriekšējais resolved_date})
+    norāda iepriekšējo ieguldījumu, kas tiek atņemts - kā rebuild_issue_stats,
+    problēma tiek skaitīta tikai pēdējā atrisināšanas dienā.
+    """
+    previous = previous or {}
+    deltas = defaultdict(_new_delta)
+    for issue in issues:
+        minutes = _resolve_minutes(issue.created_at, issue.resolved_date)
+        deltas[_key(issue, issue.resolved_date)]['resolve_minutes'].append(minutes)
+        if previous.get(issue.pk):
+            minutes = _resolve_minutes(issue.created_at, previous[issue.pk])
+            deltas[_key(issue, previous[issue.pk])]['removed_minutes'].append(minutes)
+    apply_deltas(deltas)
+
+
+def record_maintenance_completed(records):
+    """Pieskaita pabeigto remontdarbu izmaksas problēmas prioritātei; records ielādēti ar issue__unit"""
+    deltas = defaultdict(_new_delta)
+    for maintenance in records:
+        if maintenance.cost:
+            deltas[_key(maintenance.issue, maintenance.completed_date)]['maintenance_cost'] += maintenance.cost
+    apply_deltas(deltas)
+
+
+def rebuild_issue_stats(companies=None):
+    """
+    Pārrēķina dienas kopsavilkumu no problēmu un remontdarbu vēstures.
+
+    Esošās uzņēmumu rindas tiek aizstātas. Atgriež izveidoto rindu skaitu.
+    """
+    issues = Issue.objects.all()
+    maintenance = Maintenance.objects.filter(status='completed', completed_date__isnull=False, cost__isnull=False)
+    stats = IssueDailyStats.objects.all()
+    if companies is not None:
+        issues = issues.filter(company__in=companies)
+        maintenance = maintenance.filter(company__in=companies)
+        stats = stats.filter(company__in=companies)
+
+    deltas = defaultdict(_new_delta)
+    opened = issues.values(
+        'company_id', 'priority', property_id=F('unit__property_id'), date=TruncDate('created_at'),
+    ).annotate(count=Count('id')).order_by()
+    for row in opened:
+        deltas[(row['company_id'], row['property_id'], row['date'], row['priority'])]['opened'] = row['count']
+
+    resolved = issues.filter(status__in=RESOLVED_STATUSES, resolved_date__isnull=False).values_list(
+        'company_id', 'unit__property_id', 'priority', 'created_at', 'resolved_date',
+    )
+    for company_id, property_id, priority, created_at, resolved_date in resolved.iterator(chunk_size=BATCH_SIZE):
+        key = (company_id, property_id, timezone.localdate(resolved_date), priority)
+        deltas[key]['resolve_minutes'].append(_resolve_minutes(created_at, resolved_date))
+
+    costs = maintenance.values(
+        'company_id', priority=F('issue__priority'), property_id=F('issue__unit__property_id'),
+        date=TruncDate('completed_date'),
+    ).annotate(cost=Sum('cost')).order_by()
+    for row in costs:
+        deltas[(row['company_id'], row['property_id'], row['date'], row['priority'])]['maintenance_cost'] = row['cost']
+
+    rows = [
+        IssueDailyStats(
+            company_id=company_id, property_id=property_id, date=date, priority=priority,
+            opened=delta['opened'], resolved=len(delta['resolve_minutes']),
+            resolve_minutes=sorted(delta['resolve_minutes']), maintenance_cost=delta['maintenance_cost'],
+        )
+        for (company_id, property_id, date, priority), delta in deltas.items()
+    ]
+    with transaction.atomic():
+        stats.delete()
+        IssueDailyStats.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def _percentile(values, fraction):
+    """Nearest-rank procentile sakārtotam sarakstam"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def _hours(minutes):
+    return None if minutes is None else round(minutes / 60, 1)
+
+
+def _new_group(label):
+    return {'label': label, 'opened': 0, 'minutes': [], 'maintenance_cost': ZERO}
+
+
+def _finish(group):
+    minutes = sorted(group.pop('minutes'))
+    group['resolved'] = len(minutes)
+    group['median_hours'] = _hours(_percentile(minutes, 0.5))
+    group['p90_hours'] = _hours(_percentile(minutes, 0.9))
+    return group
+
+
+def sla_summary(company, start, end, property_id=None):
+    """
+    SLA rādītāji periodā [start, end]: kopā, pa prioritātēm un pa īpašumiem.
+
+    Nolasa tikai dienas kopsavilkuma rindas; mediāna un p90 tiek aprēķināti
+    no apvienotajiem atrisināšanas ilgumiem, tāpēc ir precīzi jebkuram periodam.
+    """
+    rows = IssueDailyStats.objects.filter(company=company, date__gte=start, date__lte=end)
+    if property_id:
+        rows = rows.filter(property_id=property_id)
+    rows = rows.values_list('property_id', 'property__address', 'priority', 'opened', 'resolve_minutes',
+                            'maintenance_cost')
+
+    total = _new_group('Kopā')
+    by_priority, by_property = {}, {}
+    for row_property_id, address, priority, opened, minutes, cost in rows:
+        groups = (
+            total,
+            by_priority.setdefault(priority, _new_group(PRIORITY_LABELS.get(priority, priority))),
+            by_property.setdefault(row_property_id, _new_group(address)),
+        )
+        for group in groups:
+            group['opened'] += opened
+            group['minutes'].extend(minutes)
+            group['maintenance_cost'] += cost
+
+    return {
+        'total': _finish(total),
+        'priorities': [_finish(by_priority[priority]) for priority in PRIORITIES if priority in by_priority],
+        'properties': sorted((_finish(group) for group in by_property.values()), key=lambda group: group['label']),
+    }
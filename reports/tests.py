@@ -0,0 +1,261 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import capfirst
+
+from core.factories import add_member, create_company, create_user, seed_portfolio
+from inspections.models import Issue, Maintenance
+from invoices.models import Invoice, InvoiceItem
+from leases.models import Lease
+from properties.models import Unit
+
+from .models import IssueDailyStats, OccupancySnapshot, ReportSnapshot
+from .occupancy import vacancy_series
+from .services import _restore, build_report, get_company_report
+from .sla import rebuild_issue_stats, record_issues_opened, sla_summary
+
+
+class IssueSlaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=2, months=1, occupancy=1,
+                       issues_per_property=0, seed=8)
+        cls.manager = add_member(cls.company)
+        cls.unit = Unit.objects.filter(company=cls.company).select_related('property').first()
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def report_issue(self, priority, hours_ago):
+        issue = Issue.objects.create(company=self.company, unit=self.unit, reported_by=self.manager,
+                                     issue_type='plumbing', priority=priority, status='reported',
+                                     description='Tek krāns')
+        Issue.objects.filter(pk=issue.pk).update(created_at=timezone.now() - datetime.timedelta(hours=hours_ago))
+        issue.refresh_from_db()
+        record_issues_opened([issue])
+        return issue
+
+    def set_status(self, issue, status):
+        self.client.post(reverse('inspections:update_issue_status', args=[self.company.slug, issue.id]),
+                         {'status': status})
+
+    def rows(self):
+        return sorted(IssueDailyStats.objects.filter(company=self.company).values_list(
+            'property_id', 'date', 'priority', 'opened', 'resolved', 'resolve_minutes', 'maintenance_cost',
+        ))
+
+    def test_status_changes_update_rollup_once(self):
+        issue = self.report_issue('high', hours_ago=3)
+        Maintenance.objects.create(company=self.company, issue=issue, status='scheduled', cost=Decimal('45.50'),
+                                   scheduled_date=timezone.now(), description='Nomainīt blīvi')
+
+        self.set_status(issue, 'resolved')
+        self.set_status(issue, 'closed')
+
+        stats = IssueDailyStats.objects.get(property=self.unit.property, priority='high')
+        self.assertEqual((stats.opened, stats.resolved, stats.resolve_minutes, stats.maintenance_cost),
+                         (1, 1, [180], Decimal('45.50')))
+
+    def test_reopened_issue_is_counted_once(self):
+        issue = self.report_issue('high', hours_ago=3)
+        self.set_status(issue, 'resolved')
+
+        # Jauns remonta darbs atkārtoti atver atrisinātu problēmu
+        self.client.post(reverse('inspections:assign_maintenance', args=[self.company.slug, issue.id]), {
+            'assigned_to': self.manager.id, 'scheduled_date': '2026-01-10T10:00', 'description': 'Atkārtoti tek',
+        })
+        issue.refresh_from_db()
+        self.assertEqual(issue.status, 'assigned')
+        self.set_status(issue, 'resolved')
+
+        stats = IssueDailyStats.objects.get(property=self.unit.property, priority='high')
+        self.assertEqual((stats.opened, stats.resolved, stats.resolve_minutes), (1, 1, [180]))
+        incremental = self.rows()
+        rebuild_issue_stats([self.company])
+        self.assertEqual(self.rows(), incremental)
+
+    def test_incremental_rows_match_rebuild(self):
+        for priority, hours in [('high', 1), ('high', 2), ('high', 10), ('low', 30)]:
+            self.set_status(self.report_issue(priority, hours), 'resolved')
+        self.report_issue('low', 5)
+
+        incremental = self.rows()
+        rebuild_issue_stats([self.company])
+        self.assertEqual(self.rows(), incremental)
+
+        today = timezone.localdate()
+        summary = sla_summary(self.company, today - datetime.timedelta(days=2), today)
+        self.assertEqual([(row['label'], row['opened'], row['resolved'], row['median_hours'], row['p90_hours'])
+                          for row in summary['priorities']],
+                         [('High', 3, 3, 2.0, 10.0), ('Low', 2, 1, 30.0, 30.0)])
+        self.assertEqual(summary['total']['resolved'], 4)
+
+    def test_report_reads_rollup(self):
+        self.set_status(self.report_issue('critical', 4), 'resolved')
+        url = reverse('reports:issue_sla_report', args=[self.company.slug])
+
+        with self.assertNumQueries(1):
+            summary = sla_summary(self.company, timezone.localdate(), timezone.localdate())
+        self.assertEqual(summary['total']['median_hours'], 4.0)
+
+        self.assertContains(self.client.get(url), capfirst(self.unit.property.address))
+        data = self.client.get(url, {'format': 'json', 'property': self.unit.property_id}).json()
+        self.assertEqual(data['priorities'][0]['p90_hours'], 4.0)
+
+
+class OccupancyBackfillTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=4, months=1, meters_per_unit=0,
+                       occupancy=0, issues_per_property=0, seed=30)
+        cls.units = list(Unit.objects.filter(company=cls.company).order_by('id'))
+        leases = [
+            # Pārklājošies līgumi vienai telpai skaitās vienu reizi
+            (cls.units[0], datetime.date(2025, 1, 1), datetime.date(2025, 1, 31), 'expired'),
+            (cls.units[0], datetime.date(2025, 1, 20), datetime.date(2025, 3, 31), 'active'),
+            (cls.units[1], datetime.date(2025, 1, 16), datetime.date(2025, 2, 14), 'terminated'),
+            # Melnraksti vēsturē netiek ņemti vērā
+            (cls.units[2], datetime.date(2025, 2, 1), datetime.date(2025, 2, 28), 'draft'),
+        ]
+        for unit, start_date, end_date, status in leases:
+            Lease.objects.create(company=cls.company, unit=unit, tenant=create_user('tenant'),
+                                 start_date=start_date, end_date=end_date, status=status,
+                                 rent_amount=Decimal('400'), security_deposit=Decimal('400'))
+
+    def backfill(self):
+        out = StringIO()
+        call_command('snapshot_occupancy', company=self.company.slug, backfill_from='2025-01-01',
+                     date='2025-03-01', stdout=out)
+        return out.getvalue()
+
+    def counts(self, day):
+        snapshot = OccupancySnapshot.objects.get(company=self.company, date=day)
+        return snapshot.total_units, snapshot.rented_units, snapshot.available_units
+
+    def test_backfill_counts_rented_units_per_day(self):
+        self.assertIn('izveidoti 59 ieraksti', self.backfill())
+
+        history = OccupancySnapshot.objects.filter(company=self.company, date__lt=datetime.date(2025, 3, 1))
+        self.assertEqual(history.count(), 59)
+        self.assertEqual(self.counts(datetime.date(2025, 1, 15)), (4, 1, 3))
+        self.assertEqual(self.counts(datetime.date(2025, 1, 16)), (4, 2, 2))
+        self.assertEqual(self.counts(datetime.date(2025, 2, 14)), (4, 2, 2))
+        self.assertEqual(self.counts(datetime.date(2025, 2, 15)), (4, 1, 3))
+        self.assertTrue(OccupancySnapshot.objects.filter(company=self.company, date=datetime.date(2025, 3, 1)).exists())
+
+        # Atkārtota aizpilde esošos ierakstus nepārraksta
+        OccupancySnapshot.objects.filter(company=self.company, date=datetime.date(2025, 1, 15)).update(rented_units=4)
+        self.assertIn('izveidoti 0 ieraksti', self.backfill())
+        self.assertEqual(self.counts(datetime.date(2025, 1, 15))[1], 4)
+
+    def test_vacancy_series_weights_unit_days(self):
+        self.backfill()
+
+        series = vacancy_series(self.company, datetime.date(2025, 1, 1), datetime.date(2025, 2, 28))
+        # Janvāris: 31 + 16 izīrētas telpu-dienas no 124; februāris: 28 + 14 no 112
+        self.assertEqual([(row['unit_days'], row['occupied_days'], row['occupancy_rate'], row['vacancy_rate'])
+                          for row in series],
+                         [(124, 47, 37.9, 62.1), (112, 42, 37.5, 62.5)])
+
+        yearly = vacancy_series(self.company, datetime.date(2025, 1, 1), datetime.date(2025, 2, 28), granularity='year')
+        self.assertEqual((yearly[0]['occupied_days'], yearly[0]['vacancy_rate']), (89, 62.3))
+
+
+class CompanyReportTests(TestCase):
+    period = datetime.date(2025, 3, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=1, months=1, meters_per_unit=0,
+                       occupancy=1, issues_per_property=0, seed=29)
+        Invoice.objects.filter(company=cls.company).delete()
+        cls.lease_a, cls.lease_b = Lease.objects.filter(company=cls.company).order_by('unit__property__address')
+        for lease, rent in [(cls.lease_a, 400), (cls.lease_b, 600)]:
+            Lease.objects.filter(pk=lease.pk).update(start_date=datetime.date(2025, 1, 1),
+                                                     end_date=datetime.date(2025, 12, 31), rent_amount=rent)
+
+        def invoice(lease, number, total, status, paid_date=None):
+            invoice = Invoice.objects.create(
+                company=cls.company, lease=lease, number=number, total_amount=total, status=status,
+                issue_date=datetime.date(2025, 3, 1), period_start=datetime.date(2025, 3, 1),
+                period_end=datetime.date(2025, 3, 31), due_date=datetime.date(2025, 3, 15), paid_date=paid_date,
+            )
+            item_type = 'utility' if total < 100 else 'rent'
+            InvoiceItem.objects.bulk_create([InvoiceItem(company=cls.company, invoice=invoice, description=number,
+                                                         amount=total, unit_price=total, type=item_type)])
+            return invoice
+
+        paid = timezone.make_aware(datetime.datetime(2025, 3, 10))
+        invoice(cls.lease_a, 'A-1', Decimal('400.00'), 'paid', paid)
+        invoice(cls.lease_a, 'A-2', Decimal('50.00'), 'overdue')
+        # Apmaksāts pēc perioda beigām - uz 31.03. vēl neapmaksāts
+        invoice(cls.lease_b, 'B-1', Decimal('600.00'), 'paid', timezone.make_aware(datetime.datetime(2025, 4, 5)))
+        invoice(cls.lease_b, 'B-2', Decimal('999.00'), 'draft')
+
+        issue = Issue.objects.create(company=cls.company, unit=cls.lease_a.unit, reported_by=cls.company.owner,
+                                     issue_type='plumbing', priority='low', status='resolved', description='Tek krāns')
+        Maintenance.objects.create(company=cls.company, issue=issue, status='completed', cost=Decimal('75.50'),
+                                   scheduled_date=paid, completed_date=timezone.make_aware(datetime.datetime(2025, 3, 20)),
+                                   description='Nomainīt blīvi')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_monthly_aggregates(self):
+        report = get_company_report(self.company, self.period)
+
+        self.assertEqual(report['as_of'], datetime.date(2025, 3, 31))
+        rows = [(row['leases'], row['rent'], row['billed'], row['paid'], row['outstanding'],
+                 row['maintenance_cost'], row['aging']['days_1_30']) for row in report['properties']]
+        self.assertEqual(rows, [
+            (1, Decimal('400'), Decimal('450'), Decimal('400'), Decimal('50'), Decimal('75.50'), Decimal('50')),
+            (1, Decimal('600'), Decimal('600'), Decimal('600'), Decimal('0'), Decimal('0'), Decimal('600')),
+        ])
+        totals = report['totals']
+        self.assertIsInstance(totals['billed'], Decimal)
+        self.assertEqual((totals['rent'], totals['billed'], totals['outstanding'], totals['aging']['days_1_30']),
+                         (Decimal('1000'), Decimal('1050'), Decimal('50'), Decimal('650')))
+        self.assertEqual([(item['type'], item['amount']) for item in report['billed_by_type']],
+                         [('rent', Decimal('1000')), ('utility', Decimal('50'))])
+        self.assertEqual([lease['rent_amount'] for lease in report['rent_roll']], [Decimal('400'), Decimal('600')])
+
+    def test_closed_period_is_finalised(self):
+        report = get_company_report(self.company, self.period)
+        snapshot = ReportSnapshot.objects.get(company=self.company, period=self.period)
+        self.assertTrue(snapshot.is_final)
+
+        # Slēgts periods netiek pārrēķināts
+        Invoice.objects.filter(company=self.company, number='A-2').update(total_amount=Decimal('80.00'))
+        with self.assertNumQueries(1):
+            self.assertEqual(get_company_report(self.company, self.period), report)
+
+        ReportSnapshot.objects.filter(pk=snapshot.pk).update(data={**snapshot.data, 'version': 0})
+        self.assertEqual(get_company_report(self.company, self.period)['totals']['billed'], Decimal('1080'))
+
+    def test_cached_report_matches_uncached(self):
+        final = get_company_report(self.company, self.period)
+        with override_settings(REPORTS_FINAL_AFTER_DAYS=100000):
+            get_company_report(self.company, self.period)
+            with self.assertNumQueries(0):
+                cached = get_company_report(self.company, self.period)
+        uncached = _restore(build_report(self.company, self.period))
+
+        for report in (final, cached, uncached):
+            report.pop('computed_at')
+        self.assertEqual(cached, uncached)
+        self.assertEqual(final, uncached)
+
+    def test_overview_renders_restored_report(self):
+        self.client.force_login(self.company.owner)
+        response = self.client.get(reverse('reports:report_overview', args=[self.company.slug]), {'period': '2025-03'})
+        self.assertContains(response, '31.03.2025')
+        self.assertContains(response, '01.01.2025 - 31.12.2025')
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'reports'
+urlpatterns = [
+    path('', views.report_overview, name='report_overview'),
+    path('occupancy/', views.occupancy_report, name='occupancy_report'),
+    path('sla/', views.issue_sla_report, name='issue_sla_report'),
+]
@@ -0,0 +1,163 @@
+import datetime
+
+from django.http import JsonResponse
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.utils import timezone
+from core.decorators import tenant_required
+from properties.models import Property
+from search.autocomplete import selected_choice
+from .occupancy import GRANULARITIES, vacancy_series
+from .services import AGING_BUCKETS, get_company_report
+from .sla import sla_summary
+
+SLA_PERIODS = [30, 90, 365]
+
+
+def _report_access_denied(request, company):
+    """Atgriež redirect, ja lietotājs nedrīkst skatīt atskaites"""
+    if not (request.user == company.owner or request.user.company_memberships.filter(
+            company=company, role__in=['ADMIN', 'MANAGER']).exists()):
+        messages.error(request, "Jums nav tiesību skatīt atskaites.")
+        return redirect('companies_tenant:company_detail', company_slug=company.slug)
+
+    if not getattr(request, 'can_use_reports', False):
+        messages.error(request, "Atskaites nav pieejamas jūsu abonementa plānā.")
+        return redirect('companies_tenant:company_detail', company_slug=company.slug)
+    return None
+
+
+@login_required
+@tenant_required
+def report_overview(request, company_slug):
+    """Uzņēmuma finanšu atskaite par izvēlēto mēnesi"""
+    company = request.tenant
+
+    denied = _report_access_denied(request, company)
+    if denied:
+        return denied
+
+    today = timezone.localdate()
+    period_param = request.GET.get('period')
+    try:
+        period = datetime.datetime.strptime(period_param, '%Y-%m').date() if period_param else today.replace(day=1)
+    except ValueError:
+        messages.error(request, "Nederīgs periods.")
+        period = today.replace(day=1)
+
+    report = get_company_report(company, period)
+
+    return render(request, 'reports/report_overview.html', {
+        'company': company,
+        'report': report,
+        'period': period,
+        'as_of': report['as_of'],
+        'computed_at': report['computed_at'],
+        'aging_buckets': AGING_BUCKETS,
+        'active_page': 'reports',
+    })
+
+
+@login_required
+@tenant_required
+def occupancy_report(request, company_slug):
+    """Telpu noslodzes un brīvo telpu īpatsvara dinamika"""
+    company = request.tenant
+
+    denied = _report_access_denied(request, company)
+    if denied:
+        return denied
+
+    granularity = request.GET.get('granularity')
+    if granularity not in GRANULARITIES:
+        granularity = 'month'
+
+    today = timezone.localdate()
+    if granularity == 'year':
+        start = today.replace(year=today.year - 4, month=1, day=1)
+    else:
+        start = today.replace(year=today.year - 1, day=1)
+
+    properties = Property.objects.filter(company=company).only('id', 'address').order_by('address')
+    selected_property = None
+    property_id = request.GET.get('property')
+    if property_id:
+        selected_property = next((p for p in properties if str(p.id) == property_id), None)
+
+    series = vacancy_series(company, start, today, granularity, property=selected_property)
+    property_series = vacancy_series(company, start, today, granularity, by_property=True)
+
+    period_format = 'Y' if granularity == 'year' else 'm.Y'
+    periods = [row['period'] for row in series]
+    by_property = {}
+    for row in property_series:
+        item = by_property.setdefault(row['property_id'], {
+            'address': row['property__address'],
+            'rates': {},
+        })
+        item['rates'][row['period']] = row['vacancy_rate']
+    property_rows = [
+        {'address': item['address'], 'rates': [item['rates'].get(period) for period in periods]}
+        for item in by_property.values()
+    ]
+
+    return render(request, 'reports/occupancy_report.html', {
+        'company': company,
+        'series': series,
+        'property_rows': property_rows,
+        'periods': periods,
+        'period_format': period_format,
+        'chart_data': {
+            'labels': [period.strftime('%Y' if granularity == 'year' else '%m.%Y') for period in periods],
+            'vacancy': [row['vacancy_rate'] for row in series],
+            'occupancy': [row['occupancy_rate'] for row in series],
+        },
+        'granularity': granularity,
+        'properties': properties,
+        'selected_property': selected_property,
+        'active_page': 'reports',
+    })
+
+
+@login_required
+@tenant_required
+def issue_sla_report(request, company_slug):
+    """Problēmu atrisināšanas laiki un remontu izmaksas no SLA dienas kopsavilkuma"""
+    company = request.tenant
+
+    denied = _report_access_denied(request, company)
+    if denied:
+        return denied
+
+    try:
+        days = int(request.GET.get('days', SLA_PERIODS[0]))
+    except ValueError:
+        days = SLA_PERIODS[0]
+    if days not in SLA_PERIODS:
+        days = SLA_PERIODS[0]
+
+    end = timezone.localdate()
+    start = end - datetime.timedelta(days=days - 1)
+    property_choice = selected_choice(
+        Property.objects.filter(company=company), request.GET.get('property'), lambda p: p.address
+    )
+    summary = sla_summary(company, start, end, property_id=property_choice['id'] if property_choice else None)
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'start': start, 'end': end, **summary})
+
+    return render(request, 'reports/issue_sla_report.html', {
+        'company': company,
+        'summary': summary,
+        'sections': [
+            ('Pa prioritātēm', 'Prioritāte', summary['priorities']),
+            ('Pa īpašumiem', 'Īpašums', summary['properties']),
+        ],
+        'start': start,
+        'end': end,
+        'days': days,
+        'periods': SLA_PERIODS,
+        'property_choice': property_choice,
+        'active_page': 'reports',
+    })
@@ -0,0 +1,16 @@
+from .documents import is_supported
+from .services import build_query
+
+
+class SearchVectorAdminMixin:
+    """
+    Admin meklēšana (arī autocomplete laukos) pa search_vector GIN indeksu.
+
+    Citās datubāzēs tiek izmantoti parastie search_fields.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        query = build_query(search_term)
+        if query is None or not is_supported(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(search_vector=query), False
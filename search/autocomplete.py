@@ -0,0 +1,155 @@
+"""
+Filtru autocomplete: īpašumu adreses, telpu numuri, īrnieku un izpildītāju vārdi.
+
+Vaicājumi izmanto pg_trgm GIN indeksus (icontains un trigram_word_similar).
+Rezultāti tiek kešoti pa uzņēmumiem; kešs tiek invalidēts, palielinot
+uzņēmuma versiju, kad mainās īpašumi, telpas, līgumi, dalībnieki vai
+lietotāju vārdi.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+from django.db.models.functions import Concat, Length, Upper
+
+from inspections.models import maintenance_assignees
+from leases.models import Lease
+from properties.models import Property, Unit
+from users.models import User
+
+from .documents import is_supported
+
+AUTOCOMPLETE_LIMIT = 10
+
+
+def _version_key(company_id):
+    return f"autocomplete:version:{company_id}"
+
+
+def get_autocomplete_version(company_id):
+    version = cache.get(_version_key(company_id))
+    if version is None:
+        cache.add(_version_key(company_id), 1, None)
+        version = cache.get(_version_key(company_id), 1)
+    return version
+
+
+def bump_autocomplete_version(company_id):
+    key = _version_key(company_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def _cached(company, kind, params, compute):
+    raw = '|'.join(str(value) for value in params).lower()
+    key = "autocomplete:{}:{}:{}:{}".format(
+        company.id, get_autocomplete_version(company.id), kind, hashlib.md5(raw.encode('utf-8')).hexdigest()
+    )
+    results = cache.get(key)
+    if results is None:
+        results = compute()
+        cache.set(key, results, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
+
+
+def _matches(field, term):
+    """
+    Apakšvirkne vai līdzīgs vārds (drukas kļūdas).
+
+    icontains tiek kompilēts kā UPPER(lauks) LIKE UPPER(...), tāpēc arī
+    līdzības nosacījums izmanto UPPER(lauks) - abus atbalsta viens indekss.
+    """
+    condition = Q(**{f"{field}__icontains": term})
+    if is_supported():
+        condition |= TrigramWordSimilar(Upper(field), term.upper())
+    return condition
+
+
+def _similarity_ordering(queryset, query, expression):
+    """Pievieno līdzības anotāciju; atgriež querysetu un kārtošanas prefiksu"""
+    if query and is_supported():
+        return queryset.annotate(similarity=TrigramWordSimilarity(query, expression)), ['-similarity']
+    return queryset, []
+
+
+def _unit_label(unit, with_address):
+    return f"{unit['property__address']} - {unit['unit_number']}" if with_address else unit['unit_number']
+
+
+def autocomplete_properties(company, query, limit=AUTOCOMPLETE_LIMIT):
+    def compute():
+        properties = Property.objects.filter(company=company)
+        if query:
+            properties = properties.filter(_matches('address', query))
+        properties, ordering = _similarity_ordering(properties, query, 'address')
+        properties = properties.order_by(*ordering, 'address').values('id', 'address')[:limit]
+        return [{'id': str(prop['id']), 'label': prop['address']} for prop in properties]
+
+    return _cached(company, 'properties', [query, limit], compute)
+
+
+def autocomplete_units(company, query, property_id=None, limit=AUTOCOMPLETE_LIMIT):
+    def compute():
+        units = Unit.objects.filter(company=company)
+        if property_id:
+            units = units.filter(property_id=property_id)
+        ordering = []
+        if query:
+            # Telpu numuri ir īsi, tāpēc prefiksa sakritība ir svarīgāka par līdzību
+            units = units.filter(unit_number__icontains=query).annotate(
+                prefix=Case(When(unit_number__istartswith=query, then=Value(0)), default=Value(1),
+                            output_field=IntegerField())
+            )
+            ordering = ['prefix']
+        units = units.order_by(*ordering, Length('unit_number'), 'unit_number', 'property__address')
+        units = units.values('id', 'unit_number', 'property__address')[:limit]
+        return [{'id': str(unit['id']), 'label': _unit_label(unit, not property_id)} for unit in units]
+
+    try:
+        return _cached(company, 'units', [query, property_id, limit], compute)
+    except ValidationError:
+        return []
+
+
+def user_label(user):
+    return f"{user.first_name} {user.last_name} ({user.email})"
+
+
+def _search_users(users, query, limit):
+    # Katram vārdam jāsakrīt ar vārdu, uzvārdu vai e-pastu: "jān ozol"
+    for term in query.split():
+        users = users.filter(_matches('first_name', term) | _matches('last_name', term) | Q(email__icontains=term))
+    users, ordering = _similarity_ordering(users, query, Concat('first_name', Value(' '), 'last_name'))
+    users = users.order_by(*ordering, 'last_name', 'first_name').only('id', 'first_name', 'last_name', 'email')
+    return [{'id': str(user.id), 'label': user_label(user)} for user in users[:limit]]
+
+
+def autocomplete_tenants(company, query, limit=AUTOCOMPLETE_LIMIT):
+    def compute():
+        tenants = User.objects.filter(Exists(Lease.objects.filter(company=company, tenant=OuterRef('pk'))))
+        return _search_users(tenants, query, limit)
+
+    return _cached(company, 'tenants', [query, limit], compute)
+
+
+def autocomplete_assignees(company, query, limit=AUTOCOMPLETE_LIMIT):
+    """Remonta darbu izpildītāji - uzņēmuma tehniķi un menedžeri"""
+    return _cached(company, 'assignees', [query, limit],
+                   lambda: _search_users(maintenance_assignees(company), query, limit))
+
+
+def selected_choice(queryset, pk, label):
+    """Izvēlētā filtra vērtība {'id', 'label'} vai None - lai lapā nav jāielādē viss saraksts"""
+    if not pk:
+        return None
+    try:
+        obj = queryset.filter(pk=pk).first()
+    except ValidationError:
+        return None
+    return {'id': str(obj.pk), 'label': label(obj)} if obj else None
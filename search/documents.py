@@ -0,0 +1,177 @@
+"""
+Meklējamie modeļi un to search_vector saturs.
+
+Katram modelim ir SearchVectorField ar GIN indeksu. Vektors tiek veidots
+datubāzē ar vienu UPDATE ... SET search_vector = (SELECT ...), tāpēc tajā
+var iekļaut arī saistīto modeļu laukus (piem., īrnieka vārdu rēķinam).
+"""
+from django.contrib.postgres.search import SearchVector
+from django.db import connections
+from django.db.models import F, Func, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils.text import Truncator
+
+from inspections.models import Issue
+from invoices.models import Invoice
+from leases.models import Lease
+from properties.models import Property, Unit
+
+# Latviešu valodai PostgreSQL nav vārdnīcas, tāpēc vārdi netiek locīti
+SEARCH_CONFIG = 'simple'
+
+# Pieturzīmes, kas tiek aizstātas ar atstarpēm gan dokumentā, gan vaicājumā,
+# lai "2025-01-0001" un "janis.ozols@x.lv" būtu atrodami pa daļām
+PUNCTUATION = r'[-/.,@_#:;()]+'
+
+
+def is_supported(using='default'):
+    """Pilnteksta meklēšana ir pieejama tikai PostgreSQL"""
+    return connections[using].vendor == 'postgresql'
+
+
+def _searchable_text(field):
+    return Func(
+        Coalesce(F(field), Value('')), Value(PUNCTUATION), Value(' '), Value('g'),
+        function='REGEXP_REPLACE', output_field=TextField(),
+    )
+
+
+class SearchDocument:
+    """Meklējama modeļa apraksts: lauki ar svariem (A-D) un rezultāta attēlošana"""
+    kind = None
+    label = None
+    model = None
+    fields = []
+    select_related = []
+    filters = {}
+
+    def vector(self):
+        vector = None
+        for field, weight in self.fields:
+            part = SearchVector(_searchable_text(field), weight=weight, config=SEARCH_CONFIG)
+            vector = part if vector is None else vector + part
+        return vector
+
+    def reindex(self, queryset=None):
+        """Pārrēķina search_vector norādītajām rindām ar vienu UPDATE"""
+        if queryset is None:
+            queryset = self.model.objects.all()
+        if not is_supported(queryset.db):
+            return 0
+        document = self.model.objects.filter(pk=OuterRef('pk')).annotate(
+            document=self.vector()
+        ).values('document')[:1]
+        return queryset.update(search_vector=Subquery(document))
+
+    def queryset(self, company):
+        return self.model.objects.filter(company=company, **self.filters).select_related(
+            *self.select_related
+        ).defer('search_vector')
+
+    def title(self, obj):
+        raise NotImplementedError
+
+    def subtitle(self, obj):
+        return ''
+
+    def url(self, obj):
+        raise NotImplementedError
+
+
+class PropertyDocument(SearchDocument):
+    kind = 'property'
+    label = 'Īpašums'
+    model = Property
+    fields = [('address', 'A'), ('cadastral_number', 'A')]
+    select_related = ['company']
+
+    def title(self, obj):
+        return obj.address
+
+    def subtitle(self, obj):
+        return obj.get_building_type_display()
+
+    def url(self, obj):
+        return reverse('properties:property_detail', args=[obj.company.slug, obj.pk])
+
+
+class UnitDocument(SearchDocument):
+    kind = 'unit'
+    label = 'Telpa'
+    model = Unit
+    fields = [('unit_number', 'A'), ('property__address', 'B')]
+    select_related = ['property', 'company']
+
+    def title(self, obj):
+        return f"{obj.property.address} - {obj.unit_number}"
+
+    def subtitle(self, obj):
+        return obj.get_status_display()
+
+    def url(self, obj):
+        return reverse('properties:unit_detail', args=[obj.company.slug, obj.property_id, obj.pk])
+
+
+class TenantDocument(SearchDocument):
+    """Īrnieki tiek meklēti caur līgumiem, jo lietotāji nav piesaistīti uzņēmumam"""
+    kind = 'tenant'
+    label = 'Īrnieks'
+    model = Lease
+    fields = [
+        ('tenant__first_name', 'A'), ('tenant__last_name', 'A'), ('tenant__email', 'B'),
+        ('unit__unit_number', 'C'), ('unit__property__address', 'C'),
+    ]
+    select_related = ['tenant', 'unit', 'unit__property', 'company']
+    filters = {'tenant__isnull': False}
+
+    def title(self, obj):
+        return obj.tenant.get_full_name() or obj.tenant.email
+
+    def subtitle(self, obj):
+        return f"{obj.tenant.email}, {obj.unit.property.address} - {obj.unit.unit_number} ({obj.get_status_display()})"
+
+    def url(self, obj):
+        return reverse('leases:lease_detail', args=[obj.company.slug, obj.pk])
+
+
+class InvoiceDocument(SearchDocument):
+    kind = 'invoice'
+    label = 'Rēķins'
+    model = Invoice
+    fields = [('number', 'A'), ('lease__tenant__first_name', 'B'), ('lease__tenant__last_name', 'B')]
+    select_related = ['lease__tenant', 'company']
+
+    def title(self, obj):
+        return f"Rēķins Nr. {obj.number}"
+
+    def subtitle(self, obj):
+        tenant = obj.lease.tenant
+        name = tenant.get_full_name() if tenant else ''
+        return f"{name} {obj.total_amount} EUR ({obj.get_status_display()})".strip()
+
+    def url(self, obj):
+        return reverse('invoices:invoice_detail', args=[obj.company.slug, obj.pk])
+
+
+class IssueDocument(SearchDocument):
+    kind = 'issue'
+    label = 'Problēma'
+    model = Issue
+    fields = [('description', 'B'), ('unit__unit_number', 'C'), ('unit__property__address', 'C')]
+    select_related = ['unit', 'unit__property', 'company']
+
+    def title(self, obj):
+        return Truncator(obj.description).chars(80)
+
+    def subtitle(self, obj):
+        return f"{obj.unit.property.address} - {obj.unit.unit_number} ({obj.get_status_display()})"
+
+    def url(self, obj):
+        return reverse('inspections:issue_detail', args=[obj.company.slug, obj.pk])
+
+
+DOCUMENTS = {
+    document.kind: document
+    for document in [PropertyDocument(), UnitDocument(), TenantDocument(), InvoiceDocument(), IssueDocument()]
+}
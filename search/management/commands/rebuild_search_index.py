@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from companies.models import Company
+from search.documents import DOCUMENTS, is_supported
+
+
+class Command(BaseCommand):
+    help = 'Pārrēķina pilnteksta meklēšanas vektorus (pēc migrācijām un bulk_create importiem)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='Tikai norādītā uzņēmuma slug')
+        parser.add_argument('--type', choices=list(DOCUMENTS), action='append', dest='kinds',
+                            help='Tikai norādītie tipi (var norādīt vairākas reizes)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rindu skaits vienā UPDATE, lai neturētu garas slēdzenes')
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError("Pilnteksta meklēšana ir pieejama tikai ar PostgreSQL")
+
+        company = None
+        if options['company']:
+            company = Company.objects.filter(slug=options['company']).first()
+            if not company:
+                raise CommandError(f"Uzņēmums '{options['company']}' nav atrasts")
+
+        for kind in options['kinds'] or DOCUMENTS:
+            document = DOCUMENTS[kind]
+            queryset = document.model.objects.order_by('pk')
+            if company:
+                queryset = queryset.filter(company=company)
+
+            start = time.perf_counter()
+            updated = 0
+            ids = list(queryset.values_list('pk', flat=True))
+            for i in range(0, len(ids), options['batch_size']):
+                updated += document.reindex(document.model.objects.filter(pk__in=ids[i:i + options['batch_size']]))
+            self.stdout.write(f"{document.label}: {updated} ieraksti, {time.perf_counter() - start:.1f} s")
+
+        self.stdout.write(self.style.SUCCESS("Meklēšanas indekss atjaunināts"))
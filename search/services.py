@@ -0,0 +1,66 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+from .documents import DOCUMENTS, SEARCH_CONFIG, is_supported
+
+MAX_TERMS = 8
+
+
+class SearchResult:
+    def __init__(self, document, obj):
+        self.kind = document.kind
+        self.label = document.label
+        self.rank = obj.rank
+        self.title = document.title(obj)
+        self.subtitle = document.subtitle(obj)
+        self.url = document.url(obj)
+
+    def as_dict(self):
+        return {
+            'type': self.kind,
+            'label': self.label,
+            'title': self.title,
+            'subtitle': self.subtitle,
+            'url': self.url,
+            'rank': round(self.rank, 4),
+        }
+
+
+def build_query(text):
+    """
+    Pārvērš lietotāja ievadi prefiksu tsquery: "brīv 12" -> brīv:* & 12:*
+
+    Tiek paturēti tikai burti un cipari, tāpēc tsquery operatori un
+    pieturzīmes no ievades nenonāk vaicājumā. Atgriež None, ja ievadē nav
+    neviena meklējama vārda.
+    """
+    terms = re.findall(r'\w+', text or '')[:MAX_TERMS]
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f"{term}:*" for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_company(company, text, kinds=None, limit=10):
+    """
+    Meklē uzņēmuma īpašumos, telpās, īrniekos, rēķinos un problēmās.
+
+    Katram tipam tiek izpildīts viens vaicājums pa GIN indeksu; rezultāti
+    tiek apvienoti un sakārtoti pēc ts_rank.
+    """
+    query = build_query(text)
+    if query is None or not is_supported():
+        return []
+
+    results = []
+    for kind, document in DOCUMENTS.items():
+        if kinds and kind not in kinds:
+            continue
+        matches = document.queryset(company).filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank')[:limit]
+        results.extend(SearchResult(document, obj) for obj in matches)
+
+    results.sort(key=lambda result: result.rank, reverse=True)
+    return results
@@ -0,0 +1,80 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from companies.models import CompanyMember
+from inspections.models import Issue
+from invoices.models import Invoice
+from leases.models import Lease
+from properties.models import Property, Unit
+from users.models import User
+
+from .autocomplete import bump_autocomplete_version
+from .documents import DOCUMENTS
+
+# Lietotāja lauki, kas nonāk līgumu un rēķinu meklēšanas vektorā
+USER_SEARCH_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+def _reindex(kind, **filters):
+    document = DOCUMENTS[kind]
+    document.reindex(document.model.objects.filter(**filters))
+
+
+@receiver(post_save, sender=Property)
+def reindex_property(sender, instance, **kwargs):
+    # Adrese ir arī telpu, līgumu un problēmu vektoros
+    _reindex('property', pk=instance.pk)
+    _reindex('unit', property=instance)
+    _reindex('tenant', unit__property=instance)
+    _reindex('issue', unit__property=instance)
+
+
+@receiver(post_save, sender=Unit)
+def reindex_unit(sender, instance, **kwargs):
+    _reindex('unit', pk=instance.pk)
+    _reindex('tenant', unit=instance)
+    _reindex('issue', unit=instance)
+
+
+@receiver(post_save, sender=Lease)
+def reindex_lease(sender, instance, created, **kwargs):
+    _reindex('tenant', pk=instance.pk)
+    if not created:
+        # Līgumam var piesaistīt citu īrnieku - rēķinos ir īrnieka vārds
+        _reindex('invoice', lease=instance)
+
+
+@receiver([post_save, post_delete], sender=Property)
+@receiver([post_save, post_delete], sender=Unit)
+@receiver([post_save, post_delete], sender=Lease)
+@receiver([post_save, post_delete], sender=CompanyMember)
+def invalidate_autocomplete(sender, instance, **kwargs):
+    bump_autocomplete_version(instance.company_id)
+
+
+@receiver(post_save, sender=Invoice)
+def reindex_invoice(sender, instance, update_fields=None, **kwargs):
+    if update_fields and 'number' not in update_fields:
+        return
+    _reindex('invoice', pk=instance.pk)
+
+
+@receiver(post_save, sender=Issue)
+def reindex_issue(sender, instance, update_fields=None, **kwargs):
+    if update_fields and 'description' not in update_fields:
+        return
+    _reindex('issue', pk=instance.pk)
+
+
+@receiver(post_save, sender=User)
+def reindex_user(sender, instance, created, update_fields=None, **kwargs):
+    # Piem., last_login atjaunināšana pie katras pieteikšanās neskar meklēšanu
+    if created or (update_fields and not USER_SEARCH_FIELDS & set(update_fields)):
+        return
+    _reindex('tenant', tenant=instance)
+    _reindex('invoice', lease__tenant=instance)
+    # Īrnieku un izpildītāju vārdi ir autocomplete rezultātos
+    company_ids = set(Lease.objects.filter(tenant=instance).values_list('company_id', flat=True))
+    company_ids.update(instance.company_memberships.values_list('company_id', flat=True))
+    for company_id in company_ids:
+        bump_autocomplete_version(company_id)
@@ -0,0 +1,145 @@
+from unittest import skipUnless
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.factories import add_member, create_company, create_user, seed_portfolio
+from inspections.models import Issue
+from invoices.models import Invoice
+from leases.models import Lease
+from properties.models import Property, Unit
+
+from .autocomplete import autocomplete_properties, autocomplete_units
+from .services import build_query, search_company
+
+
+class BuildQueryTests(SimpleTestCase):
+    def test_terms_become_prefix_query(self):
+        self.assertEqual(build_query('Brīvības 2025-01'),
+                         SearchQuery('Brīvības:* & 2025:* & 01:*', search_type='raw', config='simple'))
+
+    def test_tsquery_operators_are_dropped(self):
+        self.assertEqual(build_query("x' | !(y):*"), SearchQuery('x:* & y:*', search_type='raw', config='simple'))
+        self.assertIsNone(build_query(' &|! '))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Pilnteksta meklēšana ir pieejama tikai PostgreSQL')
+class CompanySearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=20, months=2, occupancy=1,
+                       issues_per_property=2, seed=1)
+        cls.lease = Lease.objects.filter(company=cls.company).select_related('tenant', 'unit__property').first()
+        cls.other = create_company()
+        seed_portfolio(cls.other, properties=1, units_per_property=5, months=1, seed=2)
+
+    def test_vectors_follow_saves(self):
+        tenant = self.lease.tenant
+        tenant.first_name = 'Ērika'
+        tenant.save()
+        results = search_company(self.company, 'ērik')
+        self.assertIn(reverse('leases:lease_detail', args=[self.company.slug, self.lease.id]),
+                      [r.url for r in results if r.kind == 'tenant'])
+        self.assertTrue(any(r.kind == 'invoice' for r in results))
+
+        prop = self.lease.unit.property
+        prop.address = 'Meža prospekts 7'
+        prop.save()
+        kinds = {r.kind for r in search_company(self.company, 'meža prosp')}
+        self.assertTrue({'property', 'unit', 'tenant'} <= kinds)
+
+    def test_invoice_number_and_issue_description(self):
+        invoice = Invoice.objects.filter(lease=self.lease).first()
+        results = search_company(self.company, invoice.number, kinds=['invoice'])
+        self.assertEqual(results[0].title, f"Rēķins Nr. {invoice.number}")
+
+        issue = Issue.objects.create(company=self.company, unit=self.lease.unit, reported_by=self.lease.tenant,
+                                     issue_type='plumbing', priority='high', status='reported',
+                                     description='Virtuvē tek jaucējkrāns')
+        results = search_company(self.company, 'jaucējkr', kinds=['issue'])
+        self.assertEqual([r.url for r in results], [reverse('inspections:issue_detail', args=[self.company.slug, issue.id])])
+
+    def test_results_are_scoped_to_company(self):
+        address = Property.objects.filter(company=self.other).values_list('address', flat=True).first()
+        for result in search_company(self.company, address):
+            self.assertIn(self.company.slug, result.url)
+
+    def test_search_endpoint(self):
+        manager = add_member(self.company)
+        self.client.force_login(manager)
+        url = reverse('search:company_search', args=[self.company.slug])
+        response = self.client.get(url, {'q': self.lease.tenant.last_name, 'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['type'], 'tenant')
+
+        self.client.force_login(create_user('tenant'))
+        response = self.client.get(url, {'q': 'x'})
+        self.assertEqual(response.status_code, 404)
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=15, months=1, occupancy=1, seed=3)
+        cls.lease = Lease.objects.filter(company=cls.company).select_related('tenant', 'unit__property').first()
+        cls.other = create_company()
+        seed_portfolio(cls.other, properties=1, units_per_property=5, months=1, occupancy=1, seed=4)
+        cls.manager = add_member(cls.company)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def url(self, kind):
+        return reverse('search:autocomplete', args=[self.company.slug, kind])
+
+    def test_results_are_limited_and_scoped(self):
+        response = self.client.get(self.url('units'), {'limit': 50})
+        results = response.json()['results']
+        self.assertEqual(len(results), 10)
+        ids = {str(pk) for pk in Unit.objects.filter(company=self.company).values_list('id', flat=True)}
+        self.assertTrue({r['id'] for r in results} <= ids)
+
+        prop = self.lease.unit.property
+        response = self.client.get(self.url('units'), {'property': prop.id, 'q': self.lease.unit.unit_number})
+        self.assertEqual(response.json()['results'][0],
+                         {'id': str(self.lease.unit.id), 'label': self.lease.unit.unit_number})
+
+    def test_tenants_match_name_terms(self):
+        tenant = self.lease.tenant
+        response = self.client.get(self.url('tenants'), {'q': f"{tenant.first_name[:3]} {tenant.last_name}"})
+        self.assertIn(str(tenant.id), [r['id'] for r in response.json()['results']])
+
+        other_tenant = Lease.objects.filter(company=self.other).first().tenant
+        response = self.client.get(self.url('tenants'), {'q': other_tenant.email})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_cache_is_invalidated_on_save(self):
+        prop = self.lease.unit.property
+        self.assertEqual(autocomplete_properties(self.company, 'Meža prosp'), [])
+        prop.address = 'Meža prospekts 7'
+        prop.save()
+        self.assertEqual(autocomplete_properties(self.company, 'Meža prosp'),
+                         [{'id': str(prop.id), 'label': 'Meža prospekts 7'}])
+        self.assertEqual(autocomplete_units(self.company, 'x', property_id='nav-uuid'), [])
+
+    def test_filtered_lists_render_selected_choices(self):
+        prop = self.lease.unit.property
+        response = self.client.get(reverse('leases:lease_list', args=[self.company.slug]),
+                                   {'property': prop.id, 'tenant': self.lease.tenant.id})
+        self.assertEqual(response.context['property_choice'], {'id': str(prop.id), 'label': prop.address})
+        self.assertEqual(response.context['tenant_choice']['id'], str(self.lease.tenant.id))
+        self.assertEqual(list(response.context['page_obj']), [self.lease])
+
+        response = self.client.get(reverse('inspections:company_issues', args=[self.company.slug]),
+                                   {'unit': self.lease.unit.id})
+        self.assertEqual(response.context['unit_choice']['label'],
+                         f"{prop.address} - {self.lease.unit.unit_number}")
+
+    def test_tenant_users_are_rejected(self):
+        self.client.force_login(self.lease.tenant)
+        response = self.client.get(self.url('properties'))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'search'
+urlpatterns = [
+    path('', views.company_search, name='company_search'),
+    path('autocomplete/<str:kind>/', views.autocomplete, name='autocomplete'),
+]
@@ -0,0 +1,72 @@
+from django.shortcuts import render, redirect
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from core.decorators import tenant_required
+from .documents import DOCUMENTS, is_supported
+from .autocomplete import (
+    AUTOCOMPLETE_LIMIT, autocomplete_assignees, autocomplete_properties, autocomplete_tenants, autocomplete_units,
+)
+from .services import search_company
+
+
+@login_required
+@tenant_required
+def company_search(request, company_slug):
+    """Pilnteksta meklēšana uzņēmuma datos; ar ?format=json atgriež JSON"""
+    company = request.tenant
+
+    # Pārbaudām vai lietotājam ir tiesības
+    if not (request.is_company_owner or request.is_company_admin or request.is_company_manager):
+        messages.error(request, "Jums nav tiesību meklēt uzņēmuma datos.")
+        return redirect('companies_tenant:company_detail', company_slug=company_slug)
+
+    query = request.GET.get('q', '').strip()
+    kinds = [kind for kind in request.GET.getlist('type') if kind in DOCUMENTS]
+    results = search_company(company, query, kinds=kinds) if query else []
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'query': query,
+            'results': [result.as_dict() for result in results],
+        })
+
+    return render(request, 'search/search_results.html', {
+        'company': company,
+        'query': query,
+        'results': results,
+        'kinds': kinds,
+        'documents': DOCUMENTS.values(),
+        'search_supported': is_supported(),
+        'active_page': 'search',
+    })
+
+
+@login_required
+@tenant_required
+def autocomplete(request, company_slug, kind):
+    """Filtru autocomplete JSON: ?q=teksts&limit=10 (telpām arī &property=<id>)"""
+    company = request.tenant
+
+    if not (request.is_company_owner or request.is_company_admin or request.is_company_manager):
+        return JsonResponse({'error': 'Nav tiesību'}, status=403)
+
+    query = request.GET.get('q', '').strip()[:100]
+    try:
+        limit = min(max(int(request.GET.get('limit', AUTOCOMPLETE_LIMIT)), 1), AUTOCOMPLETE_LIMIT)
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+
+    if kind == 'properties':
+        results = autocomplete_properties(company, query, limit=limit)
+    elif kind == 'units':
+        results = autocomplete_units(company, query, property_id=request.GET.get('property') or None, limit=limit)
+    elif kind == 'tenants':
+        # Īrnieku sarakstu rādām tikai pēc ievades
+        results = autocomplete_tenants(company, query, limit=limit) if query else []
+    elif kind == 'assignees':
+        results = autocomplete_assignees(company, query, limit=limit)
+    else:
+        return JsonResponse({'error': 'Nezināms tips'}, status=404)
+
+    return JsonResponse({'results': results})
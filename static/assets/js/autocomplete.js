@@ -0,0 +1,109 @@
+// Filtru autocomplete (templates/partials/autocomplete_input.html)
+(function () {
+    'use strict';
+
+    function debounce(fn, wait) {
+        let timer = null;
+        return function () {
+            clearTimeout(timer);
+            timer = setTimeout(fn, wait);
+        };
+    }
+
+    function init(container) {
+        const text = container.querySelector('[data-autocomplete-text]');
+        const hidden = container.querySelector('input[type="hidden"]');
+        const list = container.querySelector('[data-autocomplete-results]');
+        const form = container.closest('form');
+        const dependsOn = container.dataset.dependsOn;
+        let controller = null;
+
+        function close() {
+            list.classList.add('d-none');
+            list.innerHTML = '';
+        }
+
+        function setValue(id, label) {
+            text.value = label;
+            if (hidden.value !== id) {
+                hidden.value = id;
+                hidden.dispatchEvent(new Event('change', { bubbles: true }));
+            }
+        }
+
+        function params() {
+            const result = new URLSearchParams({ q: text.value.trim() });
+            if (dependsOn && form) {
+                const field = form.querySelector(`input[type="hidden"][name="${dependsOn}"]`);
+                if (field && field.value) {
+                    result.set(dependsOn, field.value);
+                }
+            }
+            return result;
+        }
+
+        function render(results) {
+            list.innerHTML = '';
+            if (!results.length) {
+                close();
+                return;
+            }
+            results.forEach(function (result) {
+                const item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'list-group-item list-group-item-action';
+                item.textContent = result.label;
+                // Fokuss paliek teksta laukā, un Bootstrap dropdown netiek aizvērts
+                item.addEventListener('mousedown', function (event) { event.preventDefault(); });
+                item.addEventListener('click', function (event) {
+                    event.stopPropagation();
+                    setValue(result.id, result.label);
+                    close();
+                });
+                list.appendChild(item);
+            });
+            list.classList.remove('d-none');
+        }
+
+        const lookup = debounce(function () {
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            fetch(`${container.dataset.url}?${params()}`, {
+                signal: controller.signal,
+                headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            })
+                .then(function (response) { return response.ok ? response.json() : { results: [] }; })
+                .then(function (data) { render(data.results); })
+                .catch(function () {});
+        }, 250);
+
+        text.addEventListener('input', function () {
+            // Izvēle ir derīga tikai no saraksta; notīrīts teksts nozīmē "Visi"
+            if (hidden.value) {
+                hidden.value = '';
+                hidden.dispatchEvent(new Event('change', { bubbles: true }));
+            }
+            lookup();
+        });
+        text.addEventListener('focus', lookup);
+        text.addEventListener('blur', close);
+        text.addEventListener('keydown', function (event) {
+            if (event.key === 'Escape') {
+                close();
+            }
+        });
+
+        if (dependsOn && form) {
+            const field = form.querySelector(`input[type="hidden"][name="${dependsOn}"]`);
+            if (field) {
+                field.addEventListener('change', function () { setValue('', ''); });
+            }
+        }
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-autocomplete]').forEach(init);
+    });
+})();
@@ -1,6 +1,19 @@
 from django.contrib import admin
 from .models import SubscriptionPlan, CompanySubscription
 
-# Register your models here.
-admin.site.register(SubscriptionPlan)
-admin.site.register(CompanySubscription)
\ No newline at end of file
+
+@admin.register(SubscriptionPlan)
+class SubscriptionPlanAdmin(admin.ModelAdmin):
+    list_display = ('name', 'code', 'price', 'billing_period', 'max_properties', 'max_units', 'is_active')
+    list_filter = ('billing_period', 'is_active')
+    search_fields = ('name', 'code')
+
+
+@admin.register(CompanySubscription)
+class CompanySubscriptionAdmin(admin.ModelAdmin):
+    list_display = ('company', 'plan', 'status', 'start_date', 'end_date', 'next_payment_date')
+    list_select_related = ('company', 'plan')
+    list_filter = ('status', 'plan')
+    search_fields = ('company__name',)
+    autocomplete_fields = ('company', 'plan')
+    show_full_result_count = False
@@ -1,3 +1,12 @@
 from django.contrib import admin
+from core.admin import TenantModelAdmin
+from .models import TenantInvitation
 
-# Register your models here.
+
+@admin.register(TenantInvitation)
+class TenantInvitationAdmin(TenantModelAdmin):
+    list_display = ('email', 'lease', 'status', 'expires_at', 'created_at')
+    list_select_related = ('lease__unit__property', 'lease__tenant')
+    list_filter = ('status',)
+    search_fields = ('email',)
+    autocomplete_fields = ('company', 'lease')
@@ -1,3 +1,97 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+
+from core.factories import create_company, seed_portfolio
+from core.testing import QueryBudgetTestCase
+from inspections.models import Issue
+from invoices.models import Invoice
+from leases.models import Lease
+from properties.models import MeterReading, UnitMeter
+from reports.models import IssueDailyStats
+
+
+class TenantDashboardQueryBudgetTests(QueryBudgetTestCase):
+    """Īrnieka paneļa vaicājumu skaits nedrīkst būt atkarīgs no skaitītāju un rādījumu skaita"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=2, units_per_property=100, months=24,
+                       meters_per_unit=5, seed=1)
+        cls.lease = Lease.objects.filter(company=cls.company).select_related('tenant').first()
+
+    def setUp(self):
+        self.client.force_login(self.lease.tenant)
+
+    def test_tenant_dashboard(self):
+        self.assertEqual(UnitMeter.objects.filter(unit=self.lease.unit_id).count(), 5)
+        self.get_within_budget(self.client, reverse('tenant_portal:dashboard'), 10)
+
+
+class TenantPortalAsyncViewTests(TestCase):
+    """Asinhronie īrnieka portāla skati caur ASGI klientu"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        seed_portfolio(cls.company, properties=1, units_per_property=2, months=2,
+                       meters_per_unit=1, occupancy=1, issues_per_property=0, seed=1)
+        cls.lease = Lease.objects.filter(company=cls.company).select_related('tenant').first()
+        cls.meter = UnitMeter.objects.get(unit=cls.lease.unit_id)
+
+    def setUp(self):
+        self.async_client.force_login(self.lease.tenant)
+
+    async def test_submit_reading(self):
+        url = reverse('tenant_portal:submit_reading', args=[self.lease.id, self.meter.id])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.async_client.post(url, {
+            'reading': '999999', 'reading_date': datetime.date.today().isoformat(), 'notes': '',
+        })
+        self.assertRedirects(response, reverse('tenant_portal:meter_readings'), fetch_redirect_response=False)
+        self.assertTrue(await MeterReading.objects.filter(
+            meter=self.meter, reading=Decimal('999999'), submitted_by=self.lease.tenant,
+        ).aexists())
+
+    async def test_submit_reading_rolls_back_on_reconcile_error(self):
+        url = reverse('tenant_portal:submit_reading', args=[self.lease.id, self.meter.id])
+        with mock.patch('tenant_portal.views.reconcile_estimates', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                await self.async_client.post(url, {
+                    'reading': '999999', 'reading_date': datetime.date.today().isoformat(), 'notes': '',
+                })
+        self.assertFalse(await MeterReading.objects.filter(meter=self.meter, reading=Decimal('999999')).aexists())
+
+    async def test_report_issue(self):
+        url = reverse('tenant_portal:report_issue', args=[self.lease.id])
+        response = await self.async_client.post(url, {
+            'issue_type': 'plumbing', 'priority': 'high', 'description': 'Tek krāns',
+        })
+        self.assertRedirects(response, reverse('tenant_portal:tenant_issues'), fetch_redirect_response=False)
+        issue = await Issue.objects.aget(unit=self.lease.unit_id, reported_by=self.lease.tenant)
+        self.assertEqual(issue.status, 'reported')
+        self.assertTrue(await IssueDailyStats.objects.filter(company=self.company, priority='high', opened=1).aexists())
+
+    async def test_report_issue_rolls_back_on_rollup_error(self):
+        url = reverse('tenant_portal:report_issue', args=[self.lease.id])
+        with mock.patch('tenant_portal.views.record_issues_opened', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                await self.async_client.post(url, {
+                    'issue_type': 'plumbing', 'priority': 'high', 'description': 'Tek krāns',
+                })
+        self.assertFalse(await Issue.objects.filter(unit=self.lease.unit_id).aexists())
+
+    async def test_invoice_detail_only_for_own_invoices(self):
+        invoice = await Invoice.objects.filter(lease=self.lease).afirst()
+        response = await self.async_client.get(reverse('tenant_portal:tenant_invoice_detail', args=[invoice.id]))
+        self.assertEqual(response.status_code, 200)
 
-# Create your tests here.
+        other = await Invoice.objects.filter(company=self.company).exclude(lease=self.lease).afirst()
+        response = await self.async_client.get(reverse('tenant_portal:tenant_invoice_detail', args=[other.id]))
+        self.assertEqual(response.status_code, 404)
@@ -8,6 +8,7 @@ urlpatterns = [
     path('invitation/<uuid:token>/register/', views.tenant_register, name='tenant_register'),
     path('invoices/', views.tenant_invoices, name='tenant_invoices'),
     path('invoices/<uuid:invoice_id>/', views.tenant_invoice_detail, name='tenant_invoice_detail'),
+    path('invoices/<uuid:invoice_id>/pdf/', views.tenant_invoice_pdf, name='tenant_invoice_pdf'),
     path('issues/', views.tenant_issues, name='tenant_issues'),
     path('issues/report/<uuid:lease_id>/', views.report_issue, name='report_issue'),
     path('issues/<uuid:issue_id>/', views.tenant_issue_detail, name='tenant_issue_detail'),
@@ -1,14 +1,23 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.http import HttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from .models import TenantInvitation
 from .forms import TenantRegistrationForm, IssueReportForm
 from inspections.models import Issue, IssueImage
+from properties.anomalies import flag_reading
+from properties.estimates import reconcile_estimates
 from properties.forms import MeterReadingForm
-from properties.models import UnitMeter
+from properties.models import UnitMeter, MeterReading
 from invoices.models import Invoice
+from invoices.pdf import InvoicePdfError, aget_invoice_pdf, invoice_pdf_filename
+from core.aio import arender, asave_files
 from leases.models import Lease
+from reports.sla import record_issues_opened
 
 
 def lease_invitation(request, token):
@@ -152,19 +161,25 @@ def tenant_dashboard(request):
     
     # Iegūstam skaitītājus no visiem īrētajiem īpašumiem
     unit_ids = [lease.unit.id for lease in active_leases]
-    meters = UnitMeter.objects.filter(
+    last_reading_id = MeterReading.objects.filter(
+        meter=OuterRef('pk')
+    ).order_by('-reading_date', '-created_at').values('id')[:1]
+    meters = list(UnitMeter.objects.filter(
         unit_id__in=unit_ids,
         status='active'
     ).select_related(
         'unit',
         'unit__property'
-    ).prefetch_related(
-        'readings'
-    ).order_by('meter_type')
+    ).annotate(
+        last_reading_id=Subquery(last_reading_id)
+    ).order_by('meter_type'))
     
-    # Katram skaitītājam pievienojam pēdējo rādījumu
+    # Katram skaitītājam pievienojam pēdējo rādījumu ar vienu vaicājumu
+    last_readings = MeterReading.objects.in_bulk(
+        [meter.last_reading_id for meter in meters if meter.last_reading_id]
+    )
     for meter in meters:
-        meter.last_reading = meter.readings.order_by('-reading_date').first()
+        meter.last_reading = last_readings.get(meter.last_reading_id)
     
     # Iegūstam neapmaksātos rēķinus
     unpaid_invoices = Invoice.objects.filter(
@@ -256,37 +271,51 @@ def tenant_meter_readings(request):
         'active_page': 'tenant_meter_readings',
     })
 
+def _save_reading(reading):
+    """Saglabā rādījumu ar anomāliju atzīmi un aizstāj aprēķinātos rādījumus vienā transakcijā"""
+    with transaction.atomic():
+        # Aizdomīgi rādījumi nonāk pārvaldnieka pārbaudes rindā
+        flag_reading(reading)
+        reading.save()
+        # Faktiskais rādījums aizstāj vēlākus aprēķinātos rādījumus
+        reconcile_estimates(reading)
+
 @login_required
-def submit_reading(request, lease_id, meter_id):
+async def submit_reading(request, lease_id, meter_id):
     """Ļauj īrniekam iesniegt skaitītāja rādījumu"""
+    user = await request.auser()
     # Pārbaudam vai lietotājs ir īrnieks
-    if request.user.role != 'tenant':
+    if user.role != 'tenant':
         messages.error(request, 'Jums nav piekļuves īrnieka skaitītāju panelim.')
         return redirect('users:home')
     
     # Pārbaudam vai līgums pieder lietotājam
-    lease = get_object_or_404(request.user.leases.filter(status='active'), id=lease_id)
-    meter = get_object_or_404(UnitMeter, id=meter_id, unit=lease.unit, status='active')
+    lease = await aget_object_or_404(
+        user.leases.filter(status='active').select_related('unit', 'unit__property', 'company'),
+        id=lease_id
+    )
+    meter = await aget_object_or_404(UnitMeter, id=meter_id, unit=lease.unit, status='active')
     
     # Iegūstam pēdējo rādījumu
-    last_reading = meter.readings.order_by('-reading_date').first()
+    last_reading = await meter.readings.order_by('-reading_date').afirst()
     
+    # Forma pārbauda rādījumu secību ar DB vaicājumiem, tāpēc tiek veidota un validēta pavedienā
     if request.method == 'POST':
-        form = MeterReadingForm(request.POST, meter=meter)
-        if form.is_valid():
+        form = await sync_to_async(MeterReadingForm)(request.POST, meter=meter)
+        if await sync_to_async(form.is_valid)():
             reading = form.save(commit=False)
             reading.meter = meter
-            reading.submitted_by = request.user
+            reading.submitted_by = user
             reading.company = lease.company
-            reading.save()
+            await sync_to_async(_save_reading)(reading)
             
             messages.success(request, f"{meter.get_meter_type_display()} skaitītāja rādījums veiksmīgi iesniegts.")
             return redirect('tenant_portal:meter_readings')
     else:
         # Uzstādam šodienas datumu kā sākotnējo
-        form = MeterReadingForm(meter=meter)
+        form = await sync_to_async(MeterReadingForm)(meter=meter)
     
-    return render(request, 'tenant_portal/submit_reading.html', {
+    return await arender(request, 'tenant_portal/submit_reading.html', {
         'form': form,
         'lease': lease,
         'meter': meter,
@@ -354,46 +383,54 @@ def tenant_issues(request):
         'active_page': 'tenant_issues',
     })
 
+def _create_issue(issue, images):
+    """Saglabā problēmu, tās attēlus un SLA kopsavilkumu vienā transakcijā"""
+    with transaction.atomic():
+        issue.save()
+        IssueImage.objects.bulk_create(images)
+        record_issues_opened([issue])
+
 @login_required
-def report_issue(request, lease_id):
+async def report_issue(request, lease_id):
     """Ļauj īrniekam ziņot par problēmu"""
+    user = await request.auser()
     # Pārbaudam vai lietotājs ir īrnieks
-    if request.user.role != 'tenant':
+    if user.role != 'tenant':
         messages.error(request, 'Jums nav piekļuves īrnieka problēmu panelim.')
         return redirect('users:home')
     
     # Pārbaudam vai īres līgums pieder lietotājam
-    lease = get_object_or_404(request.user.leases.filter(status='active'), id=lease_id)
+    lease = await aget_object_or_404(
+        user.leases.filter(status='active').select_related('unit', 'unit__property', 'company'),
+        id=lease_id
+    )
     unit = lease.unit
     company = lease.company
     
     if request.method == 'POST':
-        form = IssueReportForm(request.POST, request.FILES)
-        if form.is_valid():
-            # Saglabājam problēmu
+        form = await sync_to_async(IssueReportForm)(request.POST, request.FILES)
+        if await sync_to_async(form.is_valid)():
             issue = form.save(commit=False)
             issue.unit = unit
             issue.company = company
-            issue.reported_by = request.user
+            issue.reported_by = user
             issue.status = 'reported'
-            issue.save()
-            
-            # Saglabājam attēlus, ja tādi ir
-            for image in request.FILES.getlist('images'):
-                issue_image = IssueImage.objects.create(
-                    image=image,
-                    issue=issue,
-                    company=company,
-                    uploaded_by=request.user
-                )
-                issue.images.add(issue_image)
+
+            # UUID atslēga ir zināma pirms saglabāšanas, tāpēc attēli tiek augšupielādēti
+            # storage paralēli un ārpus transakcijas
+            files = request.FILES.getlist('images')
+            images = [IssueImage(issue=issue, company=company, uploaded_by=user) for _ in files]
+            await asave_files(
+                (issue_image.image, image.name, image) for issue_image, image in zip(images, files)
+            )
+            await sync_to_async(_create_issue)(issue, images)
             
             messages.success(request, 'Problēma veiksmīgi pieteikta.')
             return redirect('tenant_portal:tenant_issues')
     else:
-        form = IssueReportForm()
+        form = await sync_to_async(IssueReportForm)()
     
-    return render(request, 'tenant_portal/report_issue.html', {
+    return await arender(request, 'tenant_portal/report_issue.html', {
         'form': form,
         'lease': lease,
         'unit': unit,
@@ -455,23 +492,47 @@ def tenant_invoices(request):
     })
 
 @login_required
-def tenant_invoice_detail(request, invoice_id):
+async def tenant_invoice_detail(request, invoice_id):
     """Parāda detalizētu īrnieka rēķina informāciju"""
+    user = await request.auser()
     # Pārbaudam vai lietotājs ir īrnieks
-    if request.user.role != 'tenant':
+    if user.role != 'tenant':
         messages.error(request, 'Jums nav piekļuves īrnieka rēķinu panelim.')
         return redirect('users:home')
     
     # Atrodam rēķinu
-    invoice = get_object_or_404(Invoice.objects.select_related(
+    invoice = await aget_object_or_404(Invoice.objects.select_related(
         'lease', 'lease__unit', 'lease__unit__property', 'company'
-    ), id=invoice_id, lease__tenant=request.user)
+    ), id=invoice_id, lease__tenant=user)
     
     # Iegūstam rēķina pozīcijas
-    items = invoice.items.all()
+    items = [item async for item in invoice.items.all()]
     
-    return render(request, 'tenant_portal/tenant_invoice_detail.html', {
+    return await arender(request, 'tenant_portal/tenant_invoice_detail.html', {
         'invoice': invoice,
         'items': items,
         'active_page': 'tenant_invoices'
-    })
\ No newline at end of file
+    })
+
+@login_required
+async def tenant_invoice_pdf(request, invoice_id):
+    """Lejupielādē īrnieka rēķinu PDF formātā"""
+    user = await request.auser()
+    # Pārbaudam vai lietotājs ir īrnieks
+    if user.role != 'tenant':
+        messages.error(request, 'Jums nav piekļuves īrnieka rēķinu panelim.')
+        return redirect('users:home')
+    
+    invoice = await aget_object_or_404(Invoice.objects.select_related(
+        'lease', 'lease__unit', 'lease__unit__property', 'lease__tenant', 'company'
+    ), id=invoice_id, lease__tenant=user)
+    
+    try:
+        pdf = await aget_invoice_pdf(invoice)
+    except InvoicePdfError as e:
+        messages.error(request, str(e))
+        return redirect('tenant_portal:tenant_invoice_detail', invoice_id=invoice_id)
+    
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{invoice_pdf_filename(invoice)}"'
+    return response
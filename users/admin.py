@@ -1,4 +1,19 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from core.admin import EstimatedCountPaginator
 from .models import User
-# Register your models here.
-admin.site.register(User)
\ No newline at end of file
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    fieldsets = BaseUserAdmin.fieldsets + (
+        ('Papildu informācija', {'fields': ('role', 'phone', 'personal_code', 'profile_image')}),
+    )
+    list_display = ('username', 'email', 'first_name', 'last_name', 'role', 'is_active', 'date_joined')
+    list_filter = ('role', 'is_staff', 'is_active')
+    # Vārds, uzvārds un e-pasts izmanto pg_trgm indeksus (users 0006)
+    search_fields = ('email', 'first_name', 'last_name', 'username__exact')
+    ordering = ('-date_joined',)
+    date_hierarchy = 'date_joined'
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
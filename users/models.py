@@ -1,4 +1,6 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from django.db import models
 from core.storage import ProfileImageStorage
 import uuid
@@ -37,4 +39,10 @@ class User(AbstractUser):
         return str(self.first_name + ' ' + self.last_name + ' (' + self.role + ')')
     
     class Meta:
-        db_table = 'users'
\ No newline at end of file
+        db_table = 'users'
+        # Īrnieku autocomplete (pg_trgm); UPPER, jo tā Django veido icontains vaicājumu
+        indexes = [
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='user_first_name_trgm'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='user_last_name_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm'),
+        ]
\ No newline at end of file
@@ -52,19 +52,9 @@ def send_company_invitation_email(invitation):
         html_message=html_message
     )
 
-def send_invoice_email(invoice, tenant, company, view_url):
-    """
-    Nosūta e-pastu īrniekam par jaunu vai kavētu rēķinu.
-    
-    Args:
-        invoice: Invoice objekts
-        tenant: User objekts (īrnieks)
-        company: Company objekts
-        view_url: URL uz rēķina skatu īrnieka portālā
-    """
+def _build_invoice_email(invoice, tenant, company, items, view_url):
+    """Sagatavo rēķina e-pastu bez PDF pielikuma"""
     from django.core.mail import EmailMultiAlternatives
-    from django.template.loader import render_to_string
-    from django.conf import settings
     
     subject = f"Rēķins Nr.{invoice.number} no {company.name}"
     
@@ -73,7 +63,7 @@ def send_invoice_email(invoice, tenant, company, view_url):
         'invoice': invoice,
         'tenant': tenant,
         'company': company,
-        'items': invoice.items.all(),
+        'items': items,
         'view_url': view_url
     }
     
@@ -89,12 +79,45 @@ def send_invoice_email(invoice, tenant, company, view_url):
         to=[tenant.email]
     )
     email.attach_alternative(html_content, "text/html")
+    return email
+
+def send_invoice_email(invoice, tenant, company, view_url):
+    """
+    Nosūta e-pastu īrniekam par jaunu vai kavētu rēķinu.
+    
+    Args:
+        invoice: Invoice objekts
+        tenant: User objekts (īrnieks)
+        company: Company objekts
+        view_url: URL uz rēķina skatu īrnieka portālā
+    """
+    from invoices.pdf import get_invoice_pdf, invoice_pdf_filename
+    
+    items = list(invoice.items.order_by('created_at'))
+    email = _build_invoice_email(invoice, tenant, company, items, view_url)
+    
+    # Pievienojam kešoto PDF - tas tiek renderēts tikai, ja rēķins ir mainījies
+    email.attach(invoice_pdf_filename(invoice), get_invoice_pdf(invoice, items), 'application/pdf')
     
     # Nosūtām e-pastu
     email.send()
     
     return True
 
+async def asend_invoice_email(invoice, tenant, company, view_url):
+    """send_invoice_email asinhronajiem skatiem - PDF un SMTP nebloķē notikumu cilpu"""
+    from asgiref.sync import sync_to_async
+    
+    from core.aio import asend_message
+    from invoices.pdf import aget_invoice_pdf, invoice_pdf_filename
+    
+    items = [item async for item in invoice.items.order_by('created_at')]
+    email = await sync_to_async(_build_invoice_email)(invoice, tenant, company, items, view_url)
+    email.attach(invoice_pdf_filename(invoice), await aget_invoice_pdf(invoice, items), 'application/pdf')
+    await asend_message(email)
+    
+    return True
+
 def get_previous_month():
     today = date.today()
 